@@ -5,14 +5,21 @@ Used in Module 04: Creating ML APIs with FastAPI
 This is a production-ready example of serving ML models via REST API.
 
 Run with: uvicorn fastapi_app:app --reload
+
+Batch endpoints score the whole batch with one predict_proba call:
+- POST /batch-predict         - JSON list of {"features": [...]} objects
+- POST /batch-predict/matrix  - JSON {"instances": [[...], ...]}
+- POST /batch-predict/binary  - Raw little-endian float32 rows
+  (application/octet-stream) or a NumPy .npy array (application/x-npy)
 """
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, validator
 import joblib
 import numpy as np
 from typing import List, Dict, Any
+import io
 import logging
 from prometheus_client import Counter, Histogram, generate_latest
 from fastapi.responses import Response
@@ -26,6 +33,25 @@ logger = logging.getLogger(__name__)
 PREDICTION_COUNTER = Counter('predictions_total', 'Total number of predictions made')
 PREDICTION_LATENCY = Histogram('prediction_latency_seconds', 'Prediction latency in seconds')
 ERROR_COUNTER = Counter('prediction_errors_total', 'Total number of prediction errors')
+BATCH_LATENCY = Histogram(
+    'batch_prediction_latency_seconds',
+    'Batch prediction latency in seconds, per batch',
+    ['format'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+BATCH_SIZE = Histogram(
+    'batch_prediction_size',
+    'Number of samples per batch prediction',
+    ['format'],
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000)
+)
+
+# Input shape and batch limits
+N_FEATURES = 20
+MAX_BATCH_SIZE = 100
+MAX_MATRIX_BATCH_SIZE = 10000
+# scikit-learn forests score float32: values are validated after this cast
+MODEL_DTYPE = np.float32
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -41,15 +67,15 @@ model = None
 # Request schema
 class PredictionRequest(BaseModel):
     """Schema for prediction requests"""
-    features: List[float] = Field(..., min_items=20, max_items=20)
+    features: List[float] = Field(..., min_items=N_FEATURES, max_items=N_FEATURES)
 
     @validator('features')
     def validate_features(cls, v):
-        """Validate that features are valid numbers"""
-        if not all(isinstance(x, (int, float)) for x in v):
-            raise ValueError('All features must be numeric')
-        if any(np.isnan(x) or np.isinf(x) for x in v):
-            raise ValueError('Features cannot contain NaN or infinite values')
+        """Validate that features are valid numbers (already coerced to float)"""
+        with np.errstate(over='ignore'):
+            finite = np.isfinite(np.asarray(v, dtype=MODEL_DTYPE)).all()
+        if not finite:
+            raise ValueError('Features cannot contain NaN, infinite or out of range values')
         return v
 
     class Config:
@@ -60,6 +86,28 @@ class PredictionRequest(BaseModel):
         }
 
 
+class MatrixPredictionRequest(BaseModel):
+    """Schema for batch requests as one feature matrix"""
+    # Replaced by the validated matrix, which is what gets scored
+    instances: List[List[float]] = Field(..., min_items=1, max_items=MAX_MATRIX_BATCH_SIZE)
+
+    @validator('instances')
+    def validate_instances(cls, v):
+        """Validate the whole matrix at once"""
+        try:
+            X = np.asarray(v, dtype=np.float64)
+        except ValueError:
+            raise ValueError(f'Every instance must have {N_FEATURES} features')
+        return validate_matrix(X)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "instances": [[0.5] * 20, [-1.0] * 20]
+            }
+        }
+
+
 # Response schema
 class PredictionResponse(BaseModel):
     """Schema for prediction responses"""
@@ -76,6 +124,102 @@ class HealthResponse(BaseModel):
     version: str
 
 
+def validate_matrix(X: np.ndarray, max_rows: int = MAX_MATRIX_BATCH_SIZE) -> np.ndarray:
+    """
+    Check a batch feature matrix with vectorized NumPy operations
+
+    Values are checked after the cast to MODEL_DTYPE, so values beyond the
+    float32 range (e.g. 1e300) are rejected here instead of failing inside
+    predict_proba.
+
+    Returns:
+        The matrix as MODEL_DTYPE, to pass to score_matrix
+
+    Raises:
+        ValueError: If the shape is wrong or any value is NaN, infinite or
+            out of range
+    """
+    if X.ndim != 2 or X.shape[1] != N_FEATURES:
+        raise ValueError(f'Expected rows of {N_FEATURES} features, got shape {X.shape}')
+    if not 1 <= X.shape[0] <= max_rows:
+        raise ValueError(f'Batch size must be between 1 and {max_rows}, got {X.shape[0]}')
+    with np.errstate(over='ignore'):
+        X = np.asarray(X, dtype=MODEL_DTYPE)
+    finite_rows = np.isfinite(X).all(axis=1)
+    if not finite_rows.all():
+        bad_rows = np.flatnonzero(~finite_rows)
+        raise ValueError(
+            f'Features cannot contain NaN, infinite or out of range values '
+            f'(rows {bad_rows[:10].tolist()})'
+        )
+    return X
+
+
+def decode_binary_batch(body: bytes, content_type: str) -> np.ndarray:
+    """
+    Decode a binary batch request body into a feature matrix
+
+    Args:
+        body: Request body
+        content_type: application/x-npy for a .npy array, otherwise raw
+            little-endian float32 values, N_FEATURES per row
+
+    Returns:
+        Matrix of shape (n_samples, N_FEATURES)
+    """
+    if content_type == 'application/x-npy':
+        try:
+            X = np.load(io.BytesIO(body), allow_pickle=False)
+        except (ValueError, EOFError, OSError):
+            raise ValueError('Body is not a valid .npy array')
+        if X.dtype.kind not in 'iuf':
+            raise ValueError(f'Expected a numeric array, got dtype {X.dtype}')
+        return X
+
+    row_bytes = N_FEATURES * 4
+    if not body or len(body) % row_bytes:
+        raise ValueError(f'Body must be a whole number of rows of {N_FEATURES} float32 values')
+    return np.frombuffer(body, dtype='<f4').reshape(-1, N_FEATURES)
+
+
+def score_matrix(X: np.ndarray, batch_format: str) -> Dict[str, Any]:
+    """
+    Score a validated feature matrix with a single predict_proba call
+
+    Labels are the most probable class, which is what model.predict returns.
+
+    Args:
+        X: Matrix of shape (n_samples, N_FEATURES)
+        batch_format: Request format label for the batch metrics
+
+    Returns:
+        Predictions with their positive-class probability, and the count
+    """
+    with BATCH_LATENCY.labels(format=batch_format).time():
+        probabilities = model.predict_proba(X)
+        labels = model.classes_[probabilities.argmax(axis=1)]
+
+    BATCH_SIZE.labels(format=batch_format).observe(len(X))
+    PREDICTION_COUNTER.inc(len(X))
+    logger.info(f"Batch prediction completed for {len(X)} samples ({batch_format})")
+
+    results = [
+        {"prediction": int(label), "probability": probability}
+        for label, probability in zip(labels.tolist(), probabilities[:, 1].tolist())
+    ]
+    return {"predictions": results, "count": len(results)}
+
+
+def require_model():
+    """Raise 503 if the model is not loaded yet"""
+    if model is None:
+        ERROR_COUNTER.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model not loaded"
+        )
+
+
 @app.on_event("startup")
 async def load_model():
     """Load model on application startup"""
@@ -106,6 +250,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "predict": "/predict",
+            "batch_predict": "/batch-predict, /batch-predict/matrix, /batch-predict/binary",
             "metrics": "/metrics",
             "docs": "/docs"
         }
@@ -130,12 +275,7 @@ async def predict(request: PredictionRequest):
     - **features**: List of 20 numeric features
     - Returns prediction (0 or 1), probability, and metadata
     """
-    if model is None:
-        ERROR_COUNTER.inc()
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Model not loaded"
-        )
+    require_model()
 
     try:
         # Track prediction count
@@ -183,37 +323,74 @@ async def batch_predict(requests: List[PredictionRequest]):
     """
     Make batch predictions for multiple samples
 
-    Useful for batch inference scenarios
+    Useful for batch inference scenarios. All samples are scored together;
+    use /batch-predict/matrix or /batch-predict/binary for larger batches.
     """
-    if model is None:
-        ERROR_COUNTER.inc()
+    require_model()
+
+    if len(requests) > MAX_BATCH_SIZE:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Model not loaded"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds maximum of {MAX_BATCH_SIZE}"
         )
 
-    if len(requests) > 100:
+    try:
+        X = np.array([req.features for req in requests], dtype=MODEL_DTYPE)
+        return score_matrix(X, "json")
+
+    except Exception as e:
+        ERROR_COUNTER.inc()
+        logger.error(f"Batch prediction failed: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Batch size exceeds maximum of 100"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
         )
 
+
+@app.post("/batch-predict/matrix", tags=["Predictions"])
+async def batch_predict_matrix(request: MatrixPredictionRequest):
+    """
+    Make batch predictions for a feature matrix
+
+    - **instances**: Up to 10,000 rows of 20 numeric features
+    - The matrix is validated and scored in one vectorized call
+    """
+    require_model()
+
     try:
-        results = []
-        for req in requests:
-            features_array = np.array(req.features).reshape(1, -1)
-            prediction = int(model.predict(features_array)[0])
-            probability = float(model.predict_proba(features_array)[0][1])
+        return score_matrix(request.instances, "matrix")
 
-            results.append({
-                "prediction": prediction,
-                "probability": probability
-            })
+    except Exception as e:
+        ERROR_COUNTER.inc()
+        logger.error(f"Batch prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
+@app.post("/batch-predict/binary", tags=["Predictions"])
+async def batch_predict_binary(request: Request):
+    """
+    Make batch predictions from a binary feature matrix
 
-        PREDICTION_COUNTER.inc(len(requests))
-        logger.info(f"Batch prediction completed for {len(requests)} samples")
+    Skips JSON parsing entirely. Send either:
+    - `application/octet-stream`: little-endian float32 values, 20 per row
+      (80 bytes per sample), e.g. `X.astype('<f4').tobytes()`
+    - `application/x-npy`: a 2-D array saved with `np.save`
 
-        return {"predictions": results, "count": len(results)}
+    Returns the same JSON as /batch-predict.
+    """
+    require_model()
+
+    content_type = request.headers.get("content-type", "application/octet-stream").split(";")[0].strip()
+    try:
+        X = validate_matrix(decode_binary_batch(await request.body(), content_type))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        return score_matrix(X, "binary")
 
     except Exception as e:
         ERROR_COUNTER.inc()
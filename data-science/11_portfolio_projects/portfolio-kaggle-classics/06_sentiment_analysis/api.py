@@ -11,17 +11,32 @@ Endpoints:
     POST /predict          - Predict sentiment for a single review
     POST /predict/batch    - Predict sentiment for multiple reviews
     GET  /model/info       - Get model information and statistics
+    GET  /model/terms/{t}  - Weight of one vocabulary term in the model
+    GET  /health           - Liveness, readiness and startup timings
+    GET  /health/live      - Liveness probe (200 while the process runs)
+    GET  /health/ready     - Readiness probe (503 until models are warm)
 """
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Any, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, constr, validator
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from html.entities import html5
+import threading
+import multiprocessing
+import time
+import hashlib
+import json
+import os
 import pickle
 import re
 from pathlib import Path
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from nltk.tokenize import word_tokenize, NLTKWordTokenizer
 from nltk.stem import WordNetLemmatizer
 from bs4 import BeautifulSoup
 import numpy as np
@@ -41,6 +56,87 @@ vectorizer = None
 preprocessing_config = None
 stop_words = None
 lemmatizer = None
+lemma_table = None
+
+# Model introspection, built once by load_models
+model_metadata = None
+model_metadata_json = None
+term_index = None
+
+# Batch processing limits (override with environment variables)
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '10000'))
+# Larger batches are streamed as NDJSON, one chunk of results at a time
+STREAM_THRESHOLD = 100
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', '500'))
+# Batches at least this large are preprocessed in worker processes
+PARALLEL_THRESHOLD = int(os.environ.get('PARALLEL_THRESHOLD', '200'))
+PREPROCESS_WORKERS = int(os.environ.get('PREPROCESS_WORKERS', str(os.cpu_count() or 1)))
+
+# Preprocessing worker pool, created on first use
+preprocess_pool = None
+preprocess_pool_lock = threading.Lock()
+
+# Normalizer caches (override with environment variables)
+LEMMA_CACHE_SIZE = int(os.environ.get('LEMMA_CACHE_SIZE', '100000'))
+LEMMA_TABLE_PATH = Path(os.environ.get('LEMMA_TABLE_PATH', 'models/lemma_table.json'))
+
+# NLTK data is read from this directory first and never downloaded at
+# startup; fill it at build time with --prepare-nltk-data
+NLTK_DATA_DIR = Path(os.environ.get('NLTK_DATA_DIR', 'models/nltk_data'))
+nltk.data.path.insert(0, str(NLTK_DATA_DIR))
+# Stopwords and WordNet are used for serving (WordNet only without a lemma
+# table); punkt is used by preprocess_text_reference
+NLTK_PACKAGES = ['stopwords', 'wordnet', 'omw-1.4', 'punkt', 'punkt_tab']
+
+# Synthetic reviews run through the API before it reports ready
+# (set STARTUP_WARMUP=0 to skip)
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP', '1') != '0'
+WARMUP_REVIEWS = [
+    "This movie was absolutely fantastic! The acting was superb.<br /><br />Loved it.",
+    "Terrible waste of time &amp; money. I couldn't wait for it to end...",
+    "The plot wasn't great, but the performances were <i>amazing</i> (8/10).",
+    "Boring, predictable and far too long. See www.example.com instead."
+]
+
+# Startup progress reported by /health
+startup_state: Dict[str, Any] = {'ready': False, 'error': None, 'timings': {}}
+
+# Plain formatting tags, which never carry text for BeautifulSoup's
+# get_text(), and named entities like &amp; are handled without a parser.
+# Any other tag, comment, numeric or unknown entity goes to BeautifulSoup.
+SIMPLE_TAGS = r'br|p|i|b|u|s|em|strong|div|span|hr|h[1-6]'
+MARKUP_PATTERN = re.compile(
+    rf'(?P<tag><(?:{SIMPLE_TAGS}) ?/?>|</(?:{SIMPLE_TAGS}) ?>)'
+    r'|&(?P<entity>[a-zA-Z][-.a-zA-Z0-9]*);'
+    r'|(?P<other><[a-zA-Z/!?]|&[a-zA-Z#])',
+    re.IGNORECASE | re.ASCII
+)
+
+# Entity names without the semicolon, first spelling wins (as BeautifulSoup)
+HTML_ENTITIES: Dict[str, str] = {}
+for _name, _character in sorted(html5.items()):
+    HTML_ENTITIES.setdefault(_name[:-1] if _name.endswith(';') else _name, _character)
+
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+WORDNET_VERSION_PATTERN = re.compile(r'Word[nN]et (\d+\+?|\d+\.\d+) Copyright')
+NON_LETTER_PATTERN = re.compile(r'[^a-z\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+WORD_PATTERN = re.compile(r'[a-z]+')
+
+# Tokenizer word_tokenize applies after splitting sentences
+treebank_tokenizer = NLTKWordTokenizer()
+
+# Preprocessing used when the model has no saved config
+DEFAULT_PREPROCESSING_CONFIG = {
+    'use_stemming': False,
+    'use_lemmatization': True,
+    'remove_stopwords': True
+}
+
+# Terms listed per direction in /model/info
+TOP_TERMS = int(os.environ.get('TOP_TERMS', '20'))
+# Set TERM_INDEX=0 to skip the /model/terms index on very large vocabularies
+TERM_INDEX_ENABLED = os.environ.get('TERM_INDEX', '1') != '0'
 
 # Model metadata
 MODEL_INFO = {
@@ -52,6 +148,14 @@ MODEL_INFO = {
 }
 
 
+class TermIndex(NamedTuple):
+    """Coefficient, IDF and rank of every vocabulary term"""
+    columns: Dict[str, int]
+    weights: np.ndarray
+    idf: Optional[np.ndarray]
+    ranks: np.ndarray
+
+
 class ReviewRequest(BaseModel):
     """Request model for single review prediction"""
     text: str = Field(
@@ -71,11 +175,16 @@ class ReviewRequest(BaseModel):
 
 class BatchReviewRequest(BaseModel):
     """Request model for batch prediction"""
-    reviews: List[str] = Field(
+    # Reviews are capped at the /predict maximum; short reviews stay valid
+    reviews: List[constr(max_length=10000)] = Field(
         ...,
         min_items=1,
-        max_items=100,
-        description="List of movie reviews to analyze (max 100)",
+        max_items=MAX_BATCH_SIZE,
+        description=(
+            f"List of movie reviews (up to 10,000 characters each) to analyze "
+            f"(max {MAX_BATCH_SIZE}); "
+            f"batches over {STREAM_THRESHOLD} are streamed as NDJSON"
+        ),
         example=[
             "Great movie! Highly recommended.",
             "Terrible waste of time. Very disappointed."
@@ -110,13 +219,111 @@ class BatchSentimentResponse(BaseModel):
     )
 
 
-def load_models():
+def load_pickle(path: Path, name: str) -> Tuple[Any, str]:
+    """
+    Unpickle one artifact.
+
+    Args:
+        path: Pickle file
+        name: Artifact name for messages
+
+    Returns:
+        Unpickled object and SHA-256 of the file
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"{name} file not found: {path}")
+
+    data = path.read_bytes()
+    artifact = pickle.loads(data)
+    print(f"✓ Loaded {name.lower()} from {path}")
+    return artifact, hashlib.sha256(data).hexdigest()
+
+
+def find_nltk_resource(resource: str):
+    """
+    Check that NLTK data is installed, without downloading it.
+
+    Corpora may be installed as a directory or left zipped (e.g.
+    corpora/wordnet.zip), which NLTK's corpus loaders also accept.
+
+    Args:
+        resource: NLTK resource path (e.g. 'corpora/stopwords')
+
+    Returns:
+        NLTK path pointer to the resource directory
+    """
+    directory, _, name = resource.rpartition('/')
+    for candidate in (f'{directory}/{name}.zip/{name}/', resource):
+        try:
+            return nltk.data.find(candidate)
+        except LookupError:
+            pass
+    raise LookupError(
+        f"NLTK resource {resource} not found.\n"
+        f"Prepare it at build time: python api.py --prepare-nltk-data {NLTK_DATA_DIR}"
+    )
+
+
+def load_stop_words() -> set:
+    """
+    Load English stopwords from the local NLTK data.
+
+    Returns:
+        Stopwords
+    """
+    find_nltk_resource('corpora/stopwords')
+    return set(stopwords.words('english'))
+
+
+def load_lemmatizer() -> Tuple[Optional[Dict[str, str]], WordNetLemmatizer]:
+    """
+    Load the exported lemma table, or WordNet if there is none.
+
+    WordNet loads lazily and takes seconds, so it is loaded here instead of
+    by the first request.
+
+    Returns:
+        Lemma table (None if not exported) and lemmatizer
+    """
+    lemmas = load_lemma_table(LEMMA_TABLE_PATH)
+    wordnet_lemmatizer = WordNetLemmatizer()
+
+    if lemmas is None:
+        find_nltk_resource('corpora/wordnet')
+        wordnet_lemmatizer.lemmatize('reviews')
+        print("✓ Loaded WordNet")
+
+    return lemmas, wordnet_lemmatizer
+
+
+def timed_call(load: Callable[[], Any]) -> Tuple[Any, float]:
+    """
+    Call a loader and time it.
+
+    Args:
+        load: Function without arguments
+
+    Returns:
+        Return value and seconds taken
+    """
+    start = time.perf_counter()
+    value = load()
+    return value, time.perf_counter() - start
+
+
+def load_models() -> Dict[str, float]:
     """
     Load trained model and preprocessing artifacts from disk.
 
-    This function is called on app startup to load all necessary components.
+    The artifacts are independent, so they are loaded in parallel threads.
+    NLTK data is only read from disk, never downloaded. The globals are set
+    once every artifact has loaded.
+
+    Returns:
+        Seconds taken to load each artifact
     """
-    global model, vectorizer, preprocessing_config, stop_words, lemmatizer
+    global model, vectorizer, preprocessing_config, stop_words, lemmatizer, lemma_table
+    global model_metadata, model_metadata_json, term_index
 
     models_dir = Path("models")
 
@@ -127,68 +334,476 @@ def load_models():
             "Please train the model first by running the Jupyter notebook."
         )
 
-    # Load Logistic Regression model
-    model_path = models_dir / "logistic_regression_model.pkl"
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model file not found: {model_path}")
+    # Default config if the model was saved without one
+    config_path = models_dir / "preprocessing_config.pkl"
+    loaders = {
+        'model': lambda: load_pickle(models_dir / "logistic_regression_model.pkl", "Model"),
+        'vectorizer': lambda: load_pickle(models_dir / "tfidf_vectorizer.pkl", "Vectorizer"),
+        'preprocessing_config': lambda: (
+            load_pickle(config_path, "Preprocessing config") if config_path.exists()
+            else (dict(DEFAULT_PREPROCESSING_CONFIG), None)
+        ),
+        'stop_words': load_stop_words,
+        'lemmatizer': load_lemmatizer
+    }
 
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    print(f"✓ Loaded model from {model_path}")
+    with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+        futures = {name: executor.submit(timed_call, load) for name, load in loaders.items()}
+        loaded = {name: future.result() for name, future in futures.items()}
+
+    loaded_model, model_hash = loaded['model'][0]
+    loaded_vectorizer, vectorizer_hash = loaded['vectorizer'][0]
+    config, config_hash = loaded['preprocessing_config'][0]
+
+    # Introspection is computed here once, not per request
+    index = build_term_index(loaded_model, loaded_vectorizer) if TERM_INDEX_ENABLED else None
+    metadata = build_model_metadata(loaded_model, loaded_vectorizer, config, {
+        'model': model_hash,
+        'vectorizer': vectorizer_hash,
+        'preprocessing_config': config_hash
+    })
+
+    # Endpoints check model and vectorizer, so they are assigned last
+    preprocessing_config = config
+    stop_words = loaded['stop_words'][0]
+    lemma_table, lemmatizer = loaded['lemmatizer'][0]
+    lemmatize_token.cache_clear()
+    term_index = index
+    model_metadata = metadata
+    model_metadata_json = json.dumps(metadata).encode('utf-8')
+    vectorizer = loaded_vectorizer
+    model = loaded_model
 
-    # Load TF-IDF vectorizer
-    vectorizer_path = models_dir / "tfidf_vectorizer.pkl"
-    if not vectorizer_path.exists():
-        raise FileNotFoundError(f"Vectorizer file not found: {vectorizer_path}")
+    print("✓ All models and preprocessing tools loaded successfully")
+    return {name: round(seconds, 4) for name, (_, seconds) in loaded.items()}
 
-    with open(vectorizer_path, 'rb') as f:
-        vectorizer = pickle.load(f)
-    print(f"✓ Loaded vectorizer from {vectorizer_path}")
 
-    # Load preprocessing config
-    config_path = models_dir / "preprocessing_config.pkl"
-    if config_path.exists():
-        with open(config_path, 'rb') as f:
-            preprocessing_config = pickle.load(f)
-        print(f"✓ Loaded preprocessing config from {config_path}")
-    else:
-        # Default config
-        preprocessing_config = {
-            'use_stemming': False,
-            'use_lemmatization': True,
-            'remove_stopwords': True
+def positive_weights(model) -> Optional[np.ndarray]:
+    """
+    Coefficients toward the positive class, for binary linear models.
+
+    Args:
+        model: Fitted classifier
+
+    Returns:
+        One weight per feature, or None if the model has no such weights
+    """
+    coef = getattr(model, 'coef_', None)
+    if coef is None or len(getattr(model, 'classes_', ())) != 2:
+        return None
+    return np.asarray(coef, dtype=np.float64).ravel()
+
+
+def build_term_index(model, vectorizer) -> Optional[TermIndex]:
+    """
+    Index the weight of every vocabulary term for /model/terms.
+
+    The vectorizer's own vocabulary maps terms to columns, so only the
+    weight, IDF and rank arrays are added.
+
+    Args:
+        model: Fitted classifier
+        vectorizer: Fitted TF-IDF vectorizer
+
+    Returns:
+        TermIndex, or None if the model has no per-term weights
+    """
+    weights = positive_weights(model)
+    columns = getattr(vectorizer, 'vocabulary_', None)
+    if weights is None or columns is None:
+        return None
+
+    # Rank 0 is the most positive term
+    ranks = np.empty(len(weights), dtype=np.int64)
+    ranks[np.argsort(-weights, kind='stable')] = np.arange(len(weights))
+    idf = getattr(vectorizer, 'idf_', None)
+    return TermIndex(columns=columns, weights=weights, idf=idf, ranks=ranks)
+
+
+def build_model_metadata(model, vectorizer, config: Dict[str, Any],
+                         artifact_hashes: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Snapshot of the loaded model for /model/info.
+
+    Args:
+        model: Fitted classifier
+        vectorizer: Fitted TF-IDF vectorizer
+        config: Preprocessing config
+        artifact_hashes: SHA-256 of each artifact file (None if not saved)
+
+    Returns:
+        JSON-serializable metadata
+    """
+    vocabulary = getattr(vectorizer, 'vocabulary_', {})
+    metadata = {
+        **MODEL_INFO,
+        "model_class": type(model).__name__,
+        "vocabulary_size": len(vocabulary),
+        "ngram_range": list(getattr(vectorizer, 'ngram_range', ())),
+        "preprocessing": config,
+        "artifact_hashes": artifact_hashes,
+        "model_loaded": True,
+        "vectorizer_loaded": True
+    }
+
+    weights = positive_weights(model)
+    if weights is None or len(weights) != len(vocabulary):
+        return metadata
+
+    nonzero = int(np.count_nonzero(weights))
+    metadata["coefficients"] = {
+        "count": len(weights),
+        "nonzero": nonzero,
+        "sparsity": 1.0 - nonzero / len(weights) if len(weights) else 0.0,
+        "intercept": float(np.ravel(model.intercept_)[0])
+    }
+
+    # Only the top terms need names, so the vocabulary is not inverted
+    k = min(TOP_TERMS, len(weights))
+    top = np.argpartition(-weights, k - 1)[:k] if k else []
+    bottom = np.argpartition(weights, k - 1)[:k] if k else []
+    wanted = set(int(i) for i in top) | set(int(i) for i in bottom)
+    names = {column: term for term, column in vocabulary.items() if column in wanted}
+
+    # Ties are ordered by column, as the ranks in build_term_index
+    def terms(columns, sign):
+        ordered = sorted((int(c) for c in columns), key=lambda c: (-sign * weights[c], sign * c))
+        return [{"term": names[c], "weight": float(weights[c])} for c in ordered]
+
+    metadata["top_positive_terms"] = terms(top, 1)
+    metadata["top_negative_terms"] = terms(bottom, -1)
+    return metadata
+
+
+def explain_term(term: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up one term in the term index.
+
+    The term is matched as given (lowercased) and then as preprocess_text
+    would normalize it, e.g. "Movies" -> "movie".
+
+    Args:
+        term: Unigram or bigram
+
+    Returns:
+        Term weight details, or None if the term is not in the vocabulary
+    """
+    key = ' '.join(term.lower().split())
+    column = term_index.columns.get(key)
+    if column is None:
+        key = preprocess_text(term)
+        column = term_index.columns.get(key)
+    if column is None:
+        return None
+
+    weight = float(term_index.weights[column])
+    return {
+        "term": key,
+        "weight": weight,
+        "sentiment": "positive" if weight > 0 else "negative" if weight < 0 else "neutral",
+        "idf": float(term_index.idf[column]) if term_index.idf is not None else None,
+        "rank": int(term_index.ranks[column]) + 1,
+        "vocabulary_size": len(term_index.weights)
+    }
+
+
+def warm_up():
+    """
+    Run a synthetic batch through the prediction path.
+
+    Fills the tokenizer and lemma caches and calls the vectorizer and model
+    once. With worker processes, the batch is large enough to start the
+    preprocessing pool, so the first real requests do not pay for any of it.
+    """
+    size = PARALLEL_THRESHOLD if PREPROCESS_WORKERS >= 2 else len(WARMUP_REVIEWS)
+    predict_sentiment_batch([WARMUP_REVIEWS[i % len(WARMUP_REVIEWS)] for i in range(size)])
+
+
+def start_up() -> Dict[str, Any]:
+    """
+    Load models and warm up, then mark the API ready.
+
+    Returns:
+        startup_state, with per-artifact, load and warm-up timings
+    """
+    start = time.perf_counter()
+    try:
+        artifacts = load_models()
+        loaded = time.perf_counter()
+
+        if STARTUP_WARMUP:
+            warm_up()
+        ready = time.perf_counter()
+
+        startup_state['timings'] = {
+            'artifacts': artifacts,
+            'load_seconds': round(loaded - start, 4),
+            'warmup_seconds': round(ready - loaded, 4),
+            'total_seconds': round(ready - start, 4)
         }
+        startup_state['ready'] = True
+        print(f"✓ Ready in {ready - start:.2f}s")
+    except Exception as e:
+        startup_state['error'] = str(e)
+        print(f"ERROR: Failed to load models: {e}")
+        print("API will not function properly until models are loaded.")
+
+    return startup_state
+
+
+def prepare_nltk_data(path: Path):
+    """
+    Download the NLTK data the API uses into a local directory, run at build time.
+
+    Args:
+        path: Output directory (the API reads NLTK_DATA_DIR)
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    for package in NLTK_PACKAGES:
+        if not nltk.download(package, download_dir=str(path), quiet=True):
+            raise RuntimeError(f"Could not download NLTK package {package}")
+
+    if str(path) not in nltk.data.path:
+        nltk.data.path.insert(0, str(path))
+    print(f"✓ Prepared NLTK data in {path}")
+
+
+def load_lemma_table(path: Path) -> Optional[Dict[str, str]]:
+    """
+    Load lemmas exported by export_lemma_table.
 
-    # Initialize NLTK components
+    Args:
+        path: JSON file written by export_lemma_table
+
+    Returns:
+        Word -> lemma for every word WordNet changes, or None if the file is
+        missing or was built with another NLTK or WordNet version
+    """
+    if not path.exists():
+        return None
+
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('nltk_version') != nltk.__version__:
+        print(f"Ignoring {path}: built with NLTK {data.get('nltk_version')}, "
+              f"running {nltk.__version__}")
+        return None
+
+    # Without WordNet installed there is no fallback the table could differ from
+    wordnet_version = installed_wordnet_version()
+    if wordnet_version is not None and data.get('wordnet_version') != wordnet_version:
+        print(f"Ignoring {path}: built with WordNet {data.get('wordnet_version')}, "
+              f"installed WordNet is {wordnet_version}")
+        return None
+
+    print(f"✓ Loaded {len(data['lemmas'])} lemmas from {path}")
+    return data['lemmas']
+
+
+def installed_wordnet_version() -> Optional[str]:
+    """
+    Version of the installed WordNet corpus, as wordnet.get_version().
+
+    Reads the license header of data.adj instead of loading WordNet.
+
+    Returns:
+        Version string, or None if WordNet is not installed
+    """
     try:
-        nltk.data.find('corpora/stopwords')
+        corpus = find_nltk_resource('corpora/wordnet')
     except LookupError:
-        print("Downloading NLTK stopwords...")
-        nltk.download('stopwords', quiet=True)
+        return None
 
+    stream = corpus.join('data.adj').open()
     try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        print("Downloading NLTK punkt...")
-        nltk.download('punkt', quiet=True)
+        # The header lines are indented; synset lines start with an offset
+        for line in stream:
+            match = WORDNET_VERSION_PATTERN.search(line.decode('utf-8', 'replace'))
+            if match:
+                return match.group(1)
+            if not line.startswith(b' '):
+                break
+    finally:
+        stream.close()
+    return None
+
+
+def export_lemma_table(path: Path):
+    """
+    Precompute WordNet noun lemmas for the API, run at build time.
+
+    WordNet changes a word only through its exception list or one suffix
+    rule that leads to a known noun, so applying the rules in reverse to
+    every noun lists all words it can change.
+
+    Args:
+        path: Output JSON file
+    """
+    from nltk.corpus import wordnet as wn
+
+    wordnet_lemmatizer = WordNetLemmatizer()
+    candidates = set(wn._exception_map['n'])
+    for lemma, positions in wn._lemma_pos_offset_map.items():
+        if 'n' not in positions:
+            continue
+        for old, new in wn.MORPHOLOGICAL_SUBSTITUTIONS['n']:
+            if lemma.endswith(new):
+                candidates.add(lemma[:len(lemma) - len(new)] + old)
+
+    # Tokens only ever contain lowercase ASCII letters
+    lemmas = {}
+    for word in sorted(candidates):
+        if WORD_PATTERN.fullmatch(word):
+            lemma = wordnet_lemmatizer.lemmatize(word)
+            if lemma != word:
+                lemmas[word] = lemma
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'nltk_version': nltk.__version__,
+            'wordnet_version': wn.get_version(),
+            'lemmas': lemmas
+        }, f)
+    print(f"✓ Exported {len(lemmas)} lemmas to {path}")
+
+
+class UnsupportedMarkup(Exception):
+    """Raised when markup needs a full HTML parser"""
+
+
+def replace_markup(match: re.Match) -> str:
+    """
+    Text BeautifulSoup keeps for one simple tag or entity.
 
+    Args:
+        match: MARKUP_PATTERN match
+
+    Returns:
+        Replacement text
+    """
+    if match.group('tag'):
+        return ''
+    character = HTML_ENTITIES.get(match.group('entity') or '')
+    if character is None:
+        raise UnsupportedMarkup()
+    return character
+
+
+def strip_html(text: str) -> str:
+    """
+    Remove HTML tags, as BeautifulSoup(text, 'html.parser').get_text().
+
+    Plain formatting tags (most often <br />) and named entities are
+    removed in one regex pass. Reviews with other markup are parsed with
+    BeautifulSoup. The text is the same except that BeautifulSoup shortens
+    whitespace-only runs between tags, which preprocessing collapses anyway.
+
+    Args:
+        text: Raw review text
+
+    Returns:
+        Text content
+    """
+    if '<' not in text and '&' not in text:
+        return text
     try:
-        nltk.data.find('corpora/wordnet')
-    except LookupError:
-        print("Downloading NLTK wordnet...")
-        nltk.download('wordnet', quiet=True)
-        nltk.download('omw-1.4', quiet=True)
+        return MARKUP_PATTERN.sub(replace_markup, text)
+    except UnsupportedMarkup:
+        return BeautifulSoup(text, 'html.parser').get_text()
 
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
 
-    print("✓ All models and preprocessing tools loaded successfully")
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def split_word(word: str) -> Tuple[str, ...]:
+    """
+    Tokens word_tokenize makes of one word (e.g. "cannot" -> "can", "not").
+
+    Cleaned text is lowercase letters and single spaces, so it has one
+    sentence and its words are tokenized independently.
+
+    Args:
+        word: Lowercase ASCII word
+
+    Returns:
+        Tokens
+    """
+    return tuple(treebank_tokenizer.tokenize(word))
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize_token(token: str) -> str:
+    """
+    WordNet lemma of a token, from the lemma table if loaded.
+
+    Args:
+        token: Lowercase token
+
+    Returns:
+        Lemma
+    """
+    if lemma_table is not None:
+        return lemma_table.get(token, token)
+    return lemmatizer.lemmatize(token)
 
 
 def preprocess_text(text: str) -> str:
     """
     Preprocess text using the same pipeline as training.
 
+    Steps:
+    1. Remove HTML tags (regex fast path, BeautifulSoup for rare markup)
+    2. Convert to lowercase
+    3. Remove URLs
+    4. Remove special characters and numbers
+    5. Tokenization (cached per word)
+    6. Remove stopwords
+    7. Lemmatization (cached per token)
+
+    The output is identical to preprocess_text_reference.
+
+    Args:
+        text: Raw review text
+
+    Returns:
+        Cleaned and preprocessed text
+    """
+    # Remove HTML tags
+    text = strip_html(text)
+
+    # Convert to lowercase
+    text = text.lower()
+
+    # Remove URLs
+    text = URL_PATTERN.sub('', text)
+
+    # Remove special characters and numbers
+    text = NON_LETTER_PATTERN.sub(' ', text)
+
+    # Remove extra whitespace
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
+
+    # Tokenization
+    tokens = [token for word in text.split() for token in split_word(word)]
+
+    # Remove stopwords
+    if preprocessing_config.get('remove_stopwords', True):
+        tokens = [word for word in tokens if word not in stop_words]
+
+    # Lemmatization
+    if preprocessing_config.get('use_lemmatization', True):
+        tokens = [lemmatize_token(word) for word in tokens]
+
+    # Join tokens back into string
+    return ' '.join(tokens)
+
+
+def preprocess_text_reference(text: str) -> str:
+    """
+    Preprocess text with the training pipeline, step by step.
+
+    BeautifulSoup, word_tokenize and WordNet are called for every review;
+    preprocess_text produces the same output faster.
+
     Steps:
     1. Remove HTML tags
     2. Convert to lowercase
@@ -236,59 +851,194 @@ def preprocess_text(text: str) -> str:
     return cleaned_text
 
 
-def predict_sentiment(text: str) -> Dict[str, Any]:
+def init_preprocess_worker(config: Dict[str, Any], lemmas: Optional[Dict[str, str]], words: set):
     """
-    Predict sentiment for a single review.
+    Set up the preprocessing globals in a worker process.
 
     Args:
-        text: Raw review text
+        config: Preprocessing config loaded with the model
+        lemmas: Precomputed lemma table, if loaded
+        words: Stopwords
+    """
+    global preprocessing_config, stop_words, lemmatizer, lemma_table
+
+    preprocessing_config = config
+    lemma_table = lemmas
+    lemmatize_token.cache_clear()
+    stop_words = words
+    lemmatizer = WordNetLemmatizer()
+
+
+def preprocess_chunk(texts: List[str]) -> List[str]:
+    """
+    Preprocess a chunk of reviews (runs in a worker process).
+
+    Args:
+        texts: Raw review texts
 
     Returns:
-        Dictionary with sentiment, confidence, and probabilities
+        Preprocessed texts
+    """
+    return [preprocess_text(text) for text in texts]
+
+
+def preprocess_batch(texts: List[str]) -> List[str]:
+    """
+    Preprocess many reviews, in worker processes for large batches.
+
+    Args:
+        texts: Raw review texts
+
+    Returns:
+        Preprocessed texts, in input order
+    """
+    global preprocess_pool
+
+    if len(texts) < PARALLEL_THRESHOLD or PREPROCESS_WORKERS < 2:
+        return [preprocess_text(text) for text in texts]
+
+    with preprocess_pool_lock:
+        if preprocess_pool is None:
+            # Spawned, not forked: the pool is first used from the startup
+            # thread while loader threads and the event loop are running
+            preprocess_pool = ProcessPoolExecutor(
+                max_workers=PREPROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_preprocess_worker,
+                initargs=(preprocessing_config, lemma_table, stop_words)
+            )
+
+    # A few chunks per worker balances uneven review lengths
+    size = max(1, -(-len(texts) // (PREPROCESS_WORKERS * 4)))
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    cleaned = []
+    for result in preprocess_pool.map(preprocess_chunk, chunks):
+        cleaned.extend(result)
+    return cleaned
+
+
+def predict_sentiment_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Predict sentiment for many reviews with one vectorizer and model call.
+
+    All reviews are preprocessed, transformed into one sparse matrix and
+    scored with a single predict_proba; labels are the most probable class,
+    which is what model.predict returns for logistic regression.
+
+    Args:
+        texts: Raw review texts
+
+    Returns:
+        List of dictionaries with sentiment, confidence, and probabilities
     """
-    # Preprocess text
-    cleaned = preprocess_text(text)
+    # Preprocess texts
+    cleaned = preprocess_batch(texts)
 
     # Handle empty text after preprocessing
-    if not cleaned.strip():
-        return {
+    results = [
+        {
             'text': text,
             'sentiment': 'neutral',
             'confidence': 0.5,
             'probabilities': {'negative': 0.5, 'positive': 0.5}
         }
+        for text in texts
+    ]
+    scored = [i for i, text in enumerate(cleaned) if text.strip()]
+    if not scored:
+        return results
 
     # Vectorize
-    features = vectorizer.transform([cleaned])
+    features = vectorizer.transform([cleaned[i] for i in scored])
 
     # Predict
-    prediction = model.predict(features)[0]
-    probabilities = model.predict_proba(features)[0]
+    probabilities = model.predict_proba(features)
+    predictions = model.classes_[probabilities.argmax(axis=1)]
+
+    for i, prediction, row in zip(scored, predictions, probabilities):
+        results[i] = {
+            'text': texts[i],
+            'sentiment': 'positive' if prediction == 1 else 'negative',
+            'confidence': float(row.max()),
+            'probabilities': {
+                'negative': float(row[0]),
+                'positive': float(row[1])
+            }
+        }
+
+    return results
+
 
-    sentiment = 'positive' if prediction == 1 else 'negative'
-    confidence = probabilities[prediction]
+def predict_sentiment(text: str) -> Dict[str, Any]:
+    """
+    Predict sentiment for a single review.
+
+    Args:
+        text: Raw review text
+
+    Returns:
+        Dictionary with sentiment, confidence, and probabilities
+    """
+    return predict_sentiment_batch([text])[0]
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Count positive and negative predictions.
+
+    Args:
+        results: Prediction dictionaries
 
+    Returns:
+        Summary statistics (positive/negative counts)
+    """
     return {
-        'text': text,
-        'sentiment': sentiment,
-        'confidence': float(confidence),
-        'probabilities': {
-            'negative': float(probabilities[0]),
-            'positive': float(probabilities[1])
-        }
+        "positive": sum(1 for r in results if r['sentiment'] == 'positive'),
+        "negative": sum(1 for r in results if r['sentiment'] == 'negative')
     }
 
 
+def stream_batch(texts: List[str]) -> Iterator[str]:
+    """
+    Predict a large batch chunk by chunk as NDJSON lines.
+
+    One line per review, in input order, then a final line with the count
+    and summary. Only one chunk of results is held in memory at a time.
+
+    Args:
+        texts: Raw review texts
+
+    Yields:
+        JSON lines
+    """
+    summary = {"positive": 0, "negative": 0}
+    for start in range(0, len(texts), BATCH_CHUNK_SIZE):
+        results = predict_sentiment_batch(texts[start:start + BATCH_CHUNK_SIZE])
+        for key, value in summarize(results).items():
+            summary[key] += value
+        yield ''.join(json.dumps(r) + '\n' for r in results)
+
+    yield json.dumps({"count": len(texts), "summary": summary}) + '\n'
+
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Load models when the API starts.
+    Load models and warm up in the background.
+
+    The API is live at once; /health/ready reports when it can serve.
     """
-    try:
-        load_models()
-    except Exception as e:
-        print(f"ERROR: Failed to load models: {e}")
-        print("API will not function properly until models are loaded.")
+    threading.Thread(target=start_up, name="startup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """
+    Stop the preprocessing worker processes.
+    """
+    if preprocess_pool is not None:
+        preprocess_pool.shutdown(cancel_futures=True)
 
 
 @app.get("/", tags=["Info"])
@@ -304,6 +1054,8 @@ async def root():
             "predict": "POST /predict - Predict sentiment for a single review",
             "batch_predict": "POST /predict/batch - Predict sentiment for multiple reviews",
             "model_info": "GET /model/info - Get model information",
+            "model_terms": "GET /model/terms/{term} - Get the weight of a vocabulary term",
+            "health": "GET /health - Liveness, readiness and startup timings",
             "docs": "GET /docs - Interactive API documentation",
         }
     }
@@ -348,8 +1100,13 @@ async def predict_batch(request: BatchReviewRequest):
     """
     Predict sentiment for multiple movie reviews (batch processing).
 
+    All reviews are vectorized and scored together. Batches of more than
+    100 reviews (up to `MAX_BATCH_SIZE`) are streamed as
+    `application/x-ndjson`: one prediction per line in input order, then a
+    line with `count` and `summary`.
+
     **Request Body:**
-    - `reviews`: List of review texts (1-100 reviews)
+    - `reviews`: List of review texts (1-MAX_BATCH_SIZE reviews, up to 10,000 characters each)
 
     **Response:**
     - `results`: List of individual predictions
@@ -372,21 +1129,21 @@ async def predict_batch(request: BatchReviewRequest):
             detail="Model not loaded. Please ensure models are trained and available."
         )
 
-    try:
-        # Predict for all reviews
-        results = [predict_sentiment(text) for text in request.reviews]
+    if len(request.reviews) > STREAM_THRESHOLD:
+        # Stream large batches (generator runs in the threadpool)
+        return StreamingResponse(
+            stream_batch(request.reviews),
+            media_type="application/x-ndjson"
+        )
 
-        # Calculate summary statistics
-        positive_count = sum(1 for r in results if r['sentiment'] == 'positive')
-        negative_count = sum(1 for r in results if r['sentiment'] == 'negative')
+    try:
+        # Predict for all reviews in one pass, off the event loop
+        results = await run_in_threadpool(predict_sentiment_batch, request.reviews)
 
         return BatchSentimentResponse(
             results=[SentimentResponse(**r) for r in results],
             count=len(results),
-            summary={
-                "positive": positive_count,
-                "negative": negative_count
-            }
+            summary=summarize(results)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
@@ -397,28 +1154,51 @@ async def model_info():
     """
     Get information about the loaded model.
 
+    Built once when the model loads and served from memory, so dashboards
+    can poll it cheaply.
+
     **Response:**
     - Model type and architecture
     - Training accuracy
-    - Feature engineering details
-    - Dataset information
+    - Feature engineering details and vocabulary size
+    - Coefficient count, sparsity and intercept
+    - Top positive and negative terms
+    - SHA-256 of each artifact file
     """
-    if model is None:
+    if model is None or model_metadata_json is None:
         raise HTTPException(
             status_code=503,
             detail="Model not loaded. Please ensure models are trained and available."
         )
 
-    # Get vocabulary size from vectorizer
-    vocab_size = len(vectorizer.get_feature_names_out()) if vectorizer else 0
+    return Response(content=model_metadata_json, media_type="application/json")
 
-    return {
-        **MODEL_INFO,
-        "vocabulary_size": vocab_size,
-        "preprocessing": preprocessing_config,
-        "model_loaded": model is not None,
-        "vectorizer_loaded": vectorizer is not None
-    }
+
+@app.get("/model/terms/{term}", tags=["Info"])
+async def model_term(term: str):
+    """
+    Get the weight of one vocabulary term in the model.
+
+    Positive weights push predictions toward positive sentiment. `rank` is
+    the term's position by weight (1 = most positive).
+
+    **Example:** `GET /model/terms/excellent`
+    """
+    if model is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Please ensure models are trained and available."
+        )
+    if term_index is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Term index not available (disabled with TERM_INDEX=0 or model has no term weights)"
+        )
+
+    result = explain_term(term)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Term not in vocabulary: {term}")
+    return result
 
 
 # Health check for monitoring
@@ -426,19 +1206,81 @@ async def model_info():
 async def health_check():
     """
     Health check endpoint for monitoring systems.
+
+    `live` is true while the process serves requests. `ready` becomes true
+    once models are loaded and warmed up; `status` is "starting" until then
+    and "unhealthy" if startup failed.
     """
-    is_healthy = model is not None and vectorizer is not None
+    if startup_state['ready']:
+        status = "healthy"
+    elif startup_state['error']:
+        status = "unhealthy"
+    else:
+        status = "starting"
 
     return {
-        "status": "healthy" if is_healthy else "unhealthy",
+        "status": status,
+        "live": True,
+        "ready": startup_state['ready'],
         "model_loaded": model is not None,
-        "vectorizer_loaded": vectorizer is not None
+        "vectorizer_loaded": vectorizer is not None,
+        "startup": {
+            **startup_state['timings'],
+            "error": startup_state['error']
+        }
     }
 
 
+@app.get("/health/live", tags=["Info"])
+async def liveness():
+    """
+    Liveness probe - succeeds while the process is serving requests.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Info"])
+async def readiness():
+    """
+    Readiness probe - 503 until models are loaded and warmed up.
+    """
+    if not startup_state['ready']:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy" if startup_state['error'] else "starting",
+                     "error": startup_state['error']}
+        )
+    return {"status": "ready"}
+
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
 
+    parser = argparse.ArgumentParser(description="Sentiment Analysis API")
+    parser.add_argument(
+        "--prepare-nltk-data",
+        type=Path,
+        nargs="?",
+        const=NLTK_DATA_DIR,
+        metavar="PATH",
+        help=f"Download the NLTK data the API needs to PATH (default: {NLTK_DATA_DIR}) and exit"
+    )
+    parser.add_argument(
+        "--export-lemma-table",
+        type=Path,
+        metavar="PATH",
+        help="Precompute WordNet lemmas to PATH (e.g. models/lemma_table.json) and exit"
+    )
+    args = parser.parse_args()
+
+    if args.prepare_nltk_data:
+        prepare_nltk_data(args.prepare_nltk_data)
+    if args.export_lemma_table:
+        export_lemma_table(args.export_lemma_table)
+    if args.prepare_nltk_data or args.export_lemma_table:
+        raise SystemExit(0)
+
     # Run the API
     print("Starting Sentiment Analysis API...")
     print("Visit http://localhost:8000/docs for interactive documentation")
@@ -0,0 +1,177 @@
+"""
+Preprocessing and Cold-Start Benchmarks for the Sentiment API
+
+Preprocessing: runs preprocess_text and the step-by-step reference pipeline
+(BeautifulSoup, word_tokenize, WordNetLemmatizer) on a golden corpus,
+checks that the outputs are identical and reports latency per review.
+
+The corpus is synthetic IMDB-style reviews (line breaks, formatting tags,
+entities, contractions, comments and scripts), plus real reviews from the
+IMDB dataset when --data-dir is given.
+
+Cold start (--cold-start): starts fresh interpreters that import the API,
+load the artifacts from models/ and serve one request, with and without
+the warm-up batch, and reports the median time of each phase.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --reviews 5000 --data-dir data/test
+    python benchmark.py --cold-start 5
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import api
+
+WORDS = (
+    "the movie film was great terrible boring amazing plot acting really not "
+    "very good bad loved hated story ending characters scenes director actors "
+    "performances wasted watching times minutes cannot gonna wanna"
+).split()
+MARKUP = [
+    "<br /><br />", "<br/>", "<i>", "</i>", "<b>", "</b>", "&amp;", "&quot;",
+    "&#39;", "<a href=\"http://imdb.com\">link</a>", "<!-- spoiler -->",
+    "<script>alert('x')</script>", "AT&T", "<3",
+]
+PUNCTUATION = [",", ".", "!", "?", "...", "'s", "n't", " (1999)", " 10/10", " -"]
+
+# Run in a fresh interpreter; prints phase timings as the last line
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import api
+imported = time.perf_counter()
+state = api.start_up()
+ready = time.perf_counter()
+api.predict_sentiment(sys.argv[1])
+done = time.perf_counter()
+api.shutdown_event()
+timings = state["timings"]
+print(json.dumps({
+    "error": state["error"],
+    "import": imported - start,
+    "load": timings.get("load_seconds", 0.0),
+    "artifacts (sum)": sum(timings.get("artifacts", {}).values()),
+    "warm-up": timings.get("warmup_seconds", 0.0),
+    "ready": ready - start,
+    "first request": done - ready,
+}))
+"""
+COLD_START_REVIEW = "Not the best plot, but the cast was wonderful. Worth watching twice!"
+
+
+def make_corpus(n_reviews: int, seed: int = 0) -> List[str]:
+    """
+    Build reviews of 20-300 words, most with line breaks, some with rarer markup
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_reviews):
+        parts = []
+        for _ in range(rng.randint(20, 300)):
+            word = rng.choice(WORDS)
+            parts.append(word.capitalize() if rng.random() < 0.05 else word)
+            roll = rng.random()
+            if roll < 0.1:
+                parts[-1] += rng.choice(PUNCTUATION)
+            elif roll < 0.13:
+                parts.append(rng.choice(MARKUP[:4]) if rng.random() < 0.9 else rng.choice(MARKUP))
+        corpus.append(" ".join(parts))
+    return corpus
+
+
+def load_reviews(data_dir: Path, limit: int) -> List[str]:
+    """Read up to limit reviews from an IMDB split directory (pos/ and neg/)"""
+    files = sorted(data_dir.glob("*/*.txt"))[:limit]
+    return [path.read_text(encoding="utf-8") for path in files]
+
+
+def timed(texts: List[str], fn) -> tuple:
+    """Preprocess all texts and return (outputs, seconds)"""
+    start = time.perf_counter()
+    outputs = [fn(text) for text in texts]
+    return outputs, time.perf_counter() - start
+
+
+def cold_start(warmup: bool) -> Dict[str, float]:
+    """Start the API in a fresh interpreter and return its phase timings"""
+    env = dict(os.environ, STARTUP_WARMUP="1" if warmup else "0")
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT, COLD_START_REVIEW],
+        capture_output=True, text=True, env=env, cwd=Path(__file__).parent, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    if timings.pop("error"):
+        print(result.stdout)
+        sys.exit(1)
+    return timings
+
+
+def benchmark_cold_start(runs: int):
+    """Report median cold-start phases with and without the warm-up batch"""
+    medians = {}
+    for warmup in (True, False):
+        samples = [cold_start(warmup) for _ in range(runs)]
+        medians[warmup] = {phase: statistics.median(s[phase] for s in samples) for phase in samples[0]}
+
+    print(f"Cold start: median of {runs} runs, seconds")
+    print(f"{'phase':<20}{'warm-up':>10}{'no warm-up':>12}")
+    for phase in medians[True]:
+        print(f"{phase:<20}{medians[True][phase]:>10.3f}{medians[False][phase]:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sentiment API preprocessing")
+    parser.add_argument("--reviews", type=int, default=2000, help="Synthetic reviews")
+    parser.add_argument("--data-dir", type=Path, help="IMDB split directory with pos/ and neg/")
+    parser.add_argument("--real-reviews", type=int, default=5000, help="Maximum real reviews")
+    parser.add_argument("--cold-start", type=int, metavar="RUNS",
+                        help="Measure API startup over RUNS fresh processes instead (needs models/)")
+    args = parser.parse_args()
+
+    if args.cold_start:
+        benchmark_cold_start(args.cold_start)
+        return
+
+    # Same preprocessing state as the API after load_models
+    lemmas, _ = api.load_lemmatizer()
+    api.init_preprocess_worker(dict(api.DEFAULT_PREPROCESSING_CONFIG), lemmas, api.load_stop_words())
+
+    corpus = make_corpus(args.reviews)
+    if args.data_dir:
+        corpus += load_reviews(args.data_dir, args.real_reviews)
+
+    # Load punkt for the reference pipeline before timing
+    api.preprocess_text_reference(corpus[0])
+
+    reference, reference_time = timed(corpus, api.preprocess_text_reference)
+    api.split_word.cache_clear()
+    api.lemmatize_token.cache_clear()
+    cold, cold_time = timed(corpus, api.preprocess_text)
+    warm, warm_time = timed(corpus, api.preprocess_text)
+
+    print(f"Golden corpus: {len(corpus)} reviews")
+    print(f"Lemma table: {'loaded' if api.lemma_table is not None else 'not found, using WordNet'}")
+    print(f"{'pipeline':<28}{'ms/review':>10}{'speedup':>10}")
+    print(f"{'reference':<28}{reference_time / len(corpus) * 1e3:>10.3f}")
+    for name, seconds in [("preprocess_text (cold)", cold_time), ("preprocess_text (warm)", warm_time)]:
+        print(f"{name:<28}{seconds / len(corpus) * 1e3:>10.3f}{reference_time / seconds:>9.1f}x")
+
+    mismatches = sum(a != b for a, b in zip(reference, cold)) + sum(a != b for a, b in zip(reference, warm))
+    if mismatches:
+        print(f"\nOutput differs from the reference pipeline ({mismatches} mismatches)")
+        sys.exit(1)
+    print("\nOutput is identical to the reference pipeline")
+
+
+if __name__ == "__main__":
+    main()
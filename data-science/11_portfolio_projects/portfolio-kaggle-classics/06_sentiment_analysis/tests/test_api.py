@@ -0,0 +1,191 @@
+"""
+Unit tests for the sentiment analysis API
+
+Run with: pytest tests/test_api.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+# Add the project directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import api
+
+REVIEWS = [
+    "This movie was absolutely fantastic! The acting was superb.<br /><br />Loved it.",
+    "Terrible waste of time &amp; money. I couldn't wait for it to end...",
+    "The plot wasn't great, but the performances were <i>amazing</i> (8/10).",
+    "Boring, predictable and far too long. See www.example.com instead.",
+    "12345 !!! ??? ...",
+    "A wonderful, moving story with a brilliant cast and a great ending.",
+]
+
+# Reviews covering every preprocessing shortcut: the regex HTML fast path
+# and its BeautifulSoup fallback, entities with and without ";", words
+# word_tokenize splits ("cannot", "gonna") and URLs
+GOLDEN_CORPUS = [
+    "Great film!<br /><br />Loved it.<BR>Really.<p>New paragraph</p>",
+    "<i>Amazing</i> <b>cast</b>, <em>weak</em> <strong>ending</strong><hr/><h2>10/10</h2>",
+    '<a href="http://example.com">a link</a> and <div class="x">a div</div>',
+    "Hidden <!-- a comment --> text and <script>var x = 1;</script> script",
+    "<img src=x.jpg>pictures<br/ > <unknown-tag>odd</unknown-tag> <?php echo 1; ?>",
+    "Tom &amp; Jerry &lt;3 &quot;quoted&quot; caf&eacute; &nbsp;spaced&hellip;",
+    "AT&T &amp without semicolon &ampfoo &notit; &notin; &copy2020 &lt",
+    "Unknown &bogus; entity, numeric &#39;quote&#39; and &#x27;hex&#x27;",
+    "Maths: 5 < 6 and 7 > 3, a <= b & c",
+    "I cannot believe it, we're gonna love it, wanna see it, gotta go, lemme know",
+    "Don't, can't, won't, I'm, you'd, 'tis, gimme more'n that",
+    "See http://example.com/review?id=1&x=2 or www.example.org/path and https://t.co/abc.",
+    "Link at end: www.imdb.com/title/tt0111161/",
+    "CAPS LOCK REVIEW, MiXeD case, numbers 123 and sym#bols",
+    "Caf\u00e9 na\u00efve r\u00e9sum\u00e9 \u2014 stories of the movies and cities",
+    "The bodies of the wolves ran past geese, mice and children",
+    "<br />",
+    "   ",
+]
+REFERENCE_STOPWORDS = {"the", "a", "and", "of", "it", "i", "not", "can", "to", "we"}
+
+
+def require_nltk_data(*resources):
+    """Skip a test when NLTK data the reference pipeline loads is missing"""
+    for resource in resources:
+        try:
+            api.find_nltk_resource(resource)
+        except LookupError:
+            pytest.skip(f"NLTK resource {resource} is not installed")
+
+
+@pytest.fixture
+def loaded_model(monkeypatch):
+    """Small fitted model, with an empty lemma table so WordNet is not needed"""
+    api.init_preprocess_worker(
+        dict(api.DEFAULT_PREPROCESSING_CONFIG), {}, {"the", "a", "and", "was", "it", "to", "i"}
+    )
+    texts = ["great movie loved acting", "terrible film hated plot",
+             "amazing story brilliant cast", "boring awful waste time"] * 10
+    labels = [1, 0, 1, 0] * 10
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+    model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+    monkeypatch.setattr(api, "vectorizer", vectorizer)
+    monkeypatch.setattr(api, "model", model)
+    return model, vectorizer
+
+
+def predict_one_by_one(text, model, vectorizer):
+    """Per-review prediction, as the API computed it before batching"""
+    cleaned = api.preprocess_text(text)
+    if not cleaned.strip():
+        return "neutral", {"negative": 0.5, "positive": 0.5}
+    features = vectorizer.transform([cleaned])
+    prediction = model.predict(features)[0]
+    probabilities = model.predict_proba(features)[0]
+    return (
+        "positive" if prediction == 1 else "negative",
+        {"negative": float(probabilities[0]), "positive": float(probabilities[1])},
+    )
+
+
+class TestBatchPrediction:
+    """Test cases for the vectorized batch path"""
+
+    def test_batch_matches_single_predictions(self, loaded_model):
+        """Test one vectorized batch gives the per-review labels and probabilities"""
+        model, vectorizer = loaded_model
+        results = api.predict_sentiment_batch(REVIEWS)
+
+        for text, result in zip(REVIEWS, results):
+            sentiment, probabilities = predict_one_by_one(text, model, vectorizer)
+            assert result["text"] == text
+            assert result["sentiment"] == sentiment
+            assert result["probabilities"] == pytest.approx(probabilities, abs=1e-12)
+            assert result == api.predict_sentiment(text)
+
+    def test_parallel_preprocessing_matches(self, loaded_model, monkeypatch):
+        """Test worker-process preprocessing gives the same results"""
+        expected = api.predict_sentiment_batch(REVIEWS)
+        monkeypatch.setattr(api, "PARALLEL_THRESHOLD", 2)
+        monkeypatch.setattr(api, "PREPROCESS_WORKERS", 2)
+        try:
+            assert api.predict_sentiment_batch(REVIEWS) == expected
+        finally:
+            api.shutdown_event()
+            api.preprocess_pool = None
+
+    def test_streamed_batch_matches(self, loaded_model):
+        """Test NDJSON streaming returns the same predictions in order"""
+        reviews = REVIEWS * 20
+        response = TestClient(api.app).post("/predict/batch", json={"reviews": reviews})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert lines[:-1] == api.predict_sentiment_batch(reviews)
+        assert lines[-1]["count"] == len(reviews)
+
+    def test_review_length_limits(self):
+        """Test batch items are capped at the single review maximum, with no minimum"""
+        api.BatchReviewRequest(reviews=["Great!", "x" * 10000])
+        with pytest.raises(ValidationError):
+            api.BatchReviewRequest(reviews=["x" * 10001])
+
+
+class TestLemmaTable:
+    """Test cases for loading the exported lemma table"""
+
+    def write_table(self, path, wordnet_version):
+        path.write_text(json.dumps({
+            "nltk_version": api.nltk.__version__,
+            "wordnet_version": wordnet_version,
+            "lemmas": {"movies": "movie"},
+        }))
+        return path
+
+    def test_loads_matching_table(self, tmp_path, monkeypatch):
+        """Test a table built with the installed WordNet is used"""
+        monkeypatch.setattr(api, "installed_wordnet_version", lambda: "3.0")
+        table = self.write_table(tmp_path / "lemmas.json", "3.0")
+        assert api.load_lemma_table(table) == {"movies": "movie"}
+
+    def test_ignores_other_wordnet_version(self, tmp_path, monkeypatch):
+        """Test a table built with another WordNet version falls back to WordNet"""
+        monkeypatch.setattr(api, "installed_wordnet_version", lambda: "3.1")
+        table = self.write_table(tmp_path / "lemmas.json", "3.0")
+        assert api.load_lemma_table(table) is None
+
+
+class TestPreprocessingParity:
+    """preprocess_text must produce exactly the reference pipeline's output"""
+
+    def assert_matches_reference(self, config, lemmas=None):
+        api.init_preprocess_worker(
+            {**api.DEFAULT_PREPROCESSING_CONFIG, **config}, lemmas, REFERENCE_STOPWORDS
+        )
+        for text in GOLDEN_CORPUS:
+            assert api.preprocess_text(text) == api.preprocess_text_reference(text), text
+
+    def test_matches_reference_without_lemmatization(self):
+        """Test HTML, URL, tokenization and stopword steps"""
+        require_nltk_data("tokenizers/punkt_tab")
+        self.assert_matches_reference({"use_lemmatization": False})
+        self.assert_matches_reference({"use_lemmatization": False, "remove_stopwords": False})
+
+    def test_matches_reference_with_wordnet(self):
+        """Test lemmatizing through WordNet when no lemma table is loaded"""
+        require_nltk_data("tokenizers/punkt_tab", "corpora/wordnet")
+        self.assert_matches_reference({})
+
+    def test_matches_reference_with_lemma_table(self, tmp_path):
+        """Test lemmatizing through the exported lemma table"""
+        require_nltk_data("tokenizers/punkt_tab", "corpora/wordnet")
+        path = tmp_path / "lemma_table.json"
+        api.export_lemma_table(path)
+        lemmas = api.load_lemma_table(path)
+        assert lemmas
+        self.assert_matches_reference({}, lemmas)
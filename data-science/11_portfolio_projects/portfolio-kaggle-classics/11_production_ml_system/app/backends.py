@@ -0,0 +1,452 @@
+"""
+Managed clients for the database and Redis
+Pooled connections, lazy (re)connection in the background and circuit breaking
+"""
+
+import os
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Sequence, Tuple, Type
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from starlette.concurrency import run_in_threadpool
+
+from app.database import engine as default_engine
+from app.monitoring import (
+    backend_circuit_state,
+    backend_errors,
+    backend_rejections,
+    bind_pool_metrics
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of calling a backend whose circuit is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a backend is unreachable
+
+    - closed: calls go through; failure_threshold consecutive connection
+      failures open the circuit
+    - open: calls are rejected without touching the backend
+    - half open: after reset_timeout seconds a single trial call is let
+      through while other calls are still rejected; its success closes the
+      circuit, its failure reopens it
+
+    Only exceptions in failure_exceptions count as failures, so e.g. a
+    malformed query does not take a healthy backend out of service.
+    Thread safe: backend calls run on worker threads.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        """
+        Args:
+            name: Backend name used as the metrics label
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before calls are retried
+            failure_exceptions: Exception types that count as backend failures
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # Set while the one half-open trial call is in flight
+        self._probing = False
+        self._lock = threading.Lock()
+        self._state_gauge = backend_circuit_state.labels(backend=name)
+        self._errors = backend_errors.labels(backend=name)
+        self._rejections = backend_rejections.labels(backend=name)
+        self._state_gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        opened_at = self._opened_at
+        if opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Whether a call should be attempted now
+        """
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probing)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._opened_at is not None:
+                self._opened_at = None
+                print(f"✓ {self.name} reachable again, circuit closed")
+            self._state_gauge.set(0)
+
+    def record_failure(self):
+        self._errors.inc()
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"Warning: {self.name} unreachable, circuit opened")
+                # A failed retry keeps the circuit open for another reset_timeout
+                self._opened_at = time.monotonic()
+                self._state_gauge.set(self._STATE_VALUES[self.OPEN])
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn unless the circuit is open, recording the outcome
+        While half open, only one caller at a time gets to try the backend
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with a
+                trial call already in flight
+        """
+        with self._lock:
+            state = self.state
+            if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+                self._rejections.inc()
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            trial = state == self.HALF_OPEN
+            if trial:
+                self._probing = True
+
+        try:
+            result = fn(*args, **kwargs)
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not a backend failure: let another caller run the trial
+            if trial:
+                with self._lock:
+                    self._probing = False
+            raise
+        self.record_success()
+        return result
+
+
+class _ManagedBackend(ABC):
+    """
+    Background reconnection shared by the database and Redis backends
+
+    start() returns immediately; a task on the event loop probes the backend
+    right away and then every reconnect_interval seconds until it connects,
+    and again whenever failing calls open the circuit. The application
+    starts whether or not the backend is up.
+    """
+
+    name = ""
+
+    def __init__(self, breaker: CircuitBreaker, reconnect_interval: float):
+        self.breaker = breaker
+        self.reconnect_interval = reconnect_interval
+        self.connected = False
+        self._monitor: Optional[asyncio.Task] = None
+        self._outage_logged = False
+
+    async def start(self):
+        """
+        Start connecting in the background
+        """
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop reconnecting and close pooled connections
+        """
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+        await run_in_threadpool(self.close)
+        self.connected = False
+
+    async def _run(self):
+        while True:
+            if not self.connected or self.breaker.state != CircuitBreaker.CLOSED:
+                await run_in_threadpool(self._probe)
+            await asyncio.sleep(self.reconnect_interval)
+
+    def _probe(self):
+        """
+        Connect bypassing the breaker (runs on a worker thread)
+
+        The breaker is closed before the connect hooks run, so hooks that
+        write through it (e.g. replaying spilled logs) are not rejected
+        """
+        try:
+            self._check()
+            self.breaker.record_success()
+            self._on_connect()
+        except self.breaker.failure_exceptions as e:
+            # Log the start of an outage, not every retry
+            if not self._outage_logged:
+                print(f"Warning: {self.name} not available: {e}")
+                self._outage_logged = True
+            self.connected = False
+            self.breaker.record_failure()
+            return
+
+        if not self.connected or self._outage_logged:
+            print(f"✓ Connected to {self.name}")
+        self.connected = True
+        self._outage_logged = False
+
+    def ping(self) -> bool:
+        """
+        Cheap connectivity check; False without any I/O while the circuit is open
+        """
+        try:
+            self.breaker.call(self._check)
+        except Exception:
+            return False
+        return True
+
+    def stats(self) -> Dict:
+        in_use, idle, max_connections = self.pool_stats()
+        return {
+            "connected": self.connected,
+            "circuit": self.breaker.state,
+            "pool_in_use": in_use,
+            "pool_idle": idle,
+            "pool_max": max_connections
+        }
+
+    @abstractmethod
+    def _check(self):
+        """Make one cheap round trip to the backend"""
+
+    def _on_connect(self):
+        pass
+
+    @abstractmethod
+    def pool_stats(self) -> Tuple[int, int, int]:
+        """Pooled connections as (in_use, idle, max_connections)"""
+
+    @abstractmethod
+    def close(self):
+        """Close pooled connections"""
+
+
+class DatabaseBackend(_ManagedBackend):
+    """
+    Database engine with a breaker and connect hooks
+
+    on_connect callables (e.g. creating tables, replaying spilled logs) run
+    on a worker thread when the database first becomes reachable and again
+    after every outage, so they must be idempotent.
+    """
+
+    name = "database"
+
+    def __init__(
+        self,
+        engine=None,
+        breaker: Optional[CircuitBreaker] = None,
+        reconnect_interval: float = 5.0,
+        on_connect: Sequence[Callable[[], None]] = ()
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine (defaults to app.database.engine)
+            breaker: Circuit breaker for database calls
+            reconnect_interval: Seconds between connection attempts while down
+            on_connect: Called after each successful (re)connection
+        """
+        super().__init__(
+            breaker or CircuitBreaker(self.name, failure_exceptions=(OperationalError, InterfaceError)),
+            reconnect_interval
+        )
+        self.engine = engine if engine is not None else default_engine
+        self.on_connect = list(on_connect)
+        bind_pool_metrics(self.name, self.pool_stats)
+
+    def _check(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def _on_connect(self):
+        for hook in self.on_connect:
+            try:
+                hook()
+            except self.breaker.failure_exceptions:
+                # Lost the connection again: retried on the next probe
+                raise
+            except Exception as e:
+                print(f"Error in {self.name} connect hook {getattr(hook, '__name__', hook)}: {e}")
+
+    def pool_stats(self) -> Tuple[int, int, int]:
+        pool = self.engine.pool
+        # QueuePool exposes counters; SQLite in-memory pools do not
+        if not hasattr(pool, "checkedout"):
+            return 0, 0, 0
+        return pool.checkedout(), pool.checkedin(), pool.size() + max(pool._max_overflow, 0)
+
+    def close(self):
+        self.engine.dispose()
+
+
+class RedisBackend(_ManagedBackend):
+    """
+    Redis client over an explicit, bounded connection pool
+
+    Exposes the subset of the redis client API used by the prediction cache
+    (get, setex) through the circuit breaker. Callers can check `available`
+    to skip Redis entirely while the circuit is open. Short socket timeouts
+    keep a hung Redis from stalling requests.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 50,
+        socket_timeout: float = 0.5,
+        connect_timeout: float = 0.5,
+        health_check_interval: int = 30,
+        breaker: Optional[CircuitBreaker] = None,
+        reconnect_interval: float = 5.0
+    ):
+        """
+        Args:
+            url: Redis URL
+            max_connections: Pool size; calls beyond it fail instead of opening more
+            socket_timeout: Seconds to wait for a reply
+            connect_timeout: Seconds to wait for a new connection
+            health_check_interval: Ping idle connections older than this before reuse
+            breaker: Circuit breaker for Redis calls
+            reconnect_interval: Seconds between connection attempts while down
+        """
+        super().__init__(
+            breaker or CircuitBreaker(
+                self.name, failure_exceptions=(redis.ConnectionError, redis.TimeoutError)
+            ),
+            reconnect_interval
+        )
+        # Creating the pool opens no connection
+        self.pool = redis.ConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=connect_timeout,
+            health_check_interval=health_check_interval,
+            decode_responses=True
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+        bind_pool_metrics(self.name, self.pool_stats)
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.allow()
+
+    def get(self, key: str):
+        return self.breaker.call(self.client.get, key)
+
+    def setex(self, key: str, ttl_seconds: int, value: str):
+        return self.breaker.call(self.client.setex, key, ttl_seconds, value)
+
+    def _check(self):
+        self.client.ping()
+
+    def pool_stats(self) -> Tuple[int, int, int]:
+        # redis-py keeps these lists on the pool; it has no public counters
+        return (
+            len(self.pool._in_use_connections),
+            len(self.pool._available_connections),
+            self.pool.max_connections
+        )
+
+    def close(self):
+        self.pool.disconnect()
+
+
+def _breaker_options() -> Dict:
+    return {
+        "failure_threshold": int(os.getenv("BACKEND_FAILURE_THRESHOLD", "5")),
+        "reset_timeout": float(os.getenv("BACKEND_RESET_TIMEOUT_SECONDS", "30"))
+    }
+
+
+# Global backend instances
+_database_instance: Optional[DatabaseBackend] = None
+_redis_instance: Optional[RedisBackend] = None
+
+
+def get_database_backend() -> DatabaseBackend:
+    """
+    Get or create the global database backend
+    Pool settings come from app.database; the breaker is configured by
+    BACKEND_FAILURE_THRESHOLD, BACKEND_RESET_TIMEOUT_SECONDS and
+    BACKEND_RECONNECT_INTERVAL_SECONDS
+    """
+    global _database_instance
+
+    if _database_instance is None:
+        _database_instance = DatabaseBackend(
+            breaker=CircuitBreaker(
+                DatabaseBackend.name,
+                failure_exceptions=(OperationalError, InterfaceError),
+                **_breaker_options()
+            ),
+            reconnect_interval=float(os.getenv("BACKEND_RECONNECT_INTERVAL_SECONDS", "5"))
+        )
+
+    return _database_instance
+
+
+def get_redis_backend() -> RedisBackend:
+    """
+    Get or create the global Redis backend
+    Configured by REDIS_URL, REDIS_MAX_CONNECTIONS, REDIS_SOCKET_TIMEOUT,
+    REDIS_CONNECT_TIMEOUT and the BACKEND_* breaker settings
+    """
+    global _redis_instance
+
+    if _redis_instance is None:
+        _redis_instance = RedisBackend(
+            os.getenv("REDIS_URL", "redis://localhost:6379"),
+            max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
+            socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5")),
+            connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5")),
+            breaker=CircuitBreaker(
+                RedisBackend.name,
+                failure_exceptions=(redis.ConnectionError, redis.TimeoutError),
+                **_breaker_options()
+            ),
+            reconnect_interval=float(os.getenv("BACKEND_RECONNECT_INTERVAL_SECONDS", "5"))
+        )
+
+    return _redis_instance
@@ -0,0 +1,363 @@
+"""
+Columnar bulk scoring
+Reads CSV, NumPy .npy or Arrow IPC request bodies in chunks and scores each
+chunk with one vectorized model call
+"""
+
+import io
+import struct
+from abc import ABC, abstractmethod
+import tempfile
+import time
+from typing import AsyncIterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+from app.model import MLModel
+from app.monitoring import bulk_rows_scored, bulk_chunk_latency
+
+try:
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # Arrow support is optional
+    pa_ipc = None
+
+# Content-Type -> format name
+BULK_FORMATS = {
+    "text/csv": "csv",
+    "application/x-npy": "npy",
+    "application/vnd.apache.arrow.stream": "arrow"
+}
+
+# Arrow bodies are spooled to disk beyond this size
+ARROW_SPOOL_BYTES = 64 * 1024 * 1024
+
+
+class BulkFormatError(ValueError):
+    """
+    Raised for an unsupported Content-Type or a malformed payload header
+    """
+
+
+class BulkSchemaError(ValueError):
+    """
+    Raised when the payload columns do not match the model's features
+    """
+
+
+def column_index(columns: Sequence[str], feature_names: Sequence[str]) -> Optional[np.ndarray]:
+    """
+    Positions of the model's features within the payload columns
+
+    Returns:
+        Index array to reorder payload columns into model order, or None if
+        they already are in model order
+
+    Raises:
+        BulkSchemaError: On missing, unexpected or duplicated columns
+    """
+    columns = list(columns)
+    if len(set(columns)) != len(columns):
+        raise BulkSchemaError(f"Duplicated columns: {sorted({c for c in columns if columns.count(c) > 1})}")
+
+    missing = [name for name in feature_names if name not in columns]
+    extra = [name for name in columns if name not in feature_names]
+    if missing or extra:
+        raise BulkSchemaError(f"Schema mismatch: missing {missing}, unexpected {extra}")
+
+    positions = {name: i for i, name in enumerate(columns)}
+    index = np.array([positions[name] for name in feature_names])
+    if np.array_equal(index, np.arange(len(index))):
+        return None
+    return index
+
+
+class _BodyReader:
+    """
+    Buffered reads on top of an async byte stream (e.g. Request.stream())
+    """
+
+    def __init__(self, stream: AsyncIterator[bytes]):
+        self._stream = stream.__aiter__()
+        self._buffer = bytearray()
+        self.eof = False
+
+    async def fill(self) -> bool:
+        """
+        Append the next piece of the body to the buffer; False at end of body
+        """
+        if self.eof:
+            return False
+        try:
+            self._buffer += await self._stream.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            return False
+        return True
+
+    async def read_exact(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            if not await self.fill():
+                raise BulkFormatError(f"Body ended after {len(self._buffer)} of {n} expected bytes")
+        return self.take(n)
+
+    def take(self, n: int) -> bytes:
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    def buffered(self) -> bytearray:
+        return self._buffer
+
+
+class BulkReader(ABC):
+    """
+    Base class: read_header() returns the payload's column names, then
+    chunks() yields float64 arrays with those columns
+    """
+
+    format = ""
+
+    def __init__(self, body: _BodyReader, chunk_rows: int):
+        self.body = body
+        self.chunk_rows = chunk_rows
+
+    @abstractmethod
+    async def read_header(self) -> List[str]:
+        """Read the payload header and return its column names"""
+
+    @abstractmethod
+    def chunks(self) -> AsyncIterator[np.ndarray]:
+        """Yield the payload rows as float64 arrays"""
+
+
+class CsvReader(BulkReader):
+    """
+    CSV with a header row; parsed in chunks of about chunk_rows lines
+    """
+
+    format = "csv"
+
+    async def read_header(self) -> List[str]:
+        while b"\n" not in self.body.buffered():
+            if not await self.body.fill():
+                break
+        buffered = self.body.buffered()
+        end = buffered.find(b"\n")
+        line = self.body.take(end + 1 if end >= 0 else len(buffered))
+        self.columns = [c.strip() for c in line.decode().strip().split(",") if c.strip()]
+        if not self.columns:
+            raise BulkFormatError("CSV body has no header row")
+        return self.columns
+
+    async def chunks(self) -> AsyncIterator[np.ndarray]:
+        newlines = self.body.buffered().count(b"\n")
+        while True:
+            # Collect about chunk_rows complete lines before parsing
+            while newlines < self.chunk_rows and not self.body.eof:
+                before = len(self.body.buffered())
+                if await self.body.fill():
+                    newlines += self.body.buffered().count(b"\n", before)
+
+            buffered = self.body.buffered()
+            end = len(buffered) if self.body.eof else buffered.rfind(b"\n") + 1
+            if end <= 0:
+                return
+            data = self.body.take(end)
+            newlines = self.body.buffered().count(b"\n")
+            if data.strip():
+                yield await run_in_threadpool(self._parse, data)
+
+    def _parse(self, data: bytes) -> np.ndarray:
+        frame = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=self.columns,
+            dtype=np.float64,
+            engine="c"
+        )
+        return frame.to_numpy()
+
+
+class NpyReader(BulkReader):
+    """
+    A single 2D numeric .npy array, read chunk_rows rows at a time
+    Columns are named by the caller (defaults to the model's feature order).
+    C-ordered arrays are streamed; Fortran-ordered ones (e.g. from
+    DataFrame.to_numpy()) store columns contiguously and are read whole first.
+    """
+
+    format = "npy"
+
+    def __init__(self, body: _BodyReader, chunk_rows: int, columns: Optional[List[str]]):
+        super().__init__(body, chunk_rows)
+        self.columns = columns
+
+    async def read_header(self) -> List[str]:
+        magic = await self.body.read_exact(8)
+        if magic[:6] != b"\x93NUMPY":
+            raise BulkFormatError("Body is not a .npy array")
+        major = magic[6]
+        length_size = 2 if major == 1 else 4
+        length_bytes = await self.body.read_exact(length_size)
+        (header_length,) = struct.unpack("<H" if major == 1 else "<I", length_bytes)
+        header = await self.body.read_exact(header_length)
+
+        read_header = (
+            np.lib.format.read_array_header_1_0 if major == 1
+            else np.lib.format.read_array_header_2_0
+        )
+        shape, fortran_order, dtype = read_header(io.BytesIO(length_bytes + header))
+
+        if len(shape) != 2 or dtype.kind not in "biuf":
+            raise BulkFormatError("Expected a 2D numeric array")
+        self.n_rows, n_columns = shape
+        self.dtype = dtype
+        self.fortran_order = fortran_order
+
+        if len(self.columns) != n_columns:
+            raise BulkSchemaError(f"Array has {n_columns} columns, {len(self.columns)} names given")
+        return self.columns
+
+    async def chunks(self) -> AsyncIterator[np.ndarray]:
+        row_bytes = len(self.columns) * self.dtype.itemsize
+        if self.fortran_order:
+            data = await self.body.read_exact(self.n_rows * row_bytes)
+            array = np.frombuffer(data, dtype=self.dtype).reshape(self.n_rows, len(self.columns), order="F")
+            for start in range(0, self.n_rows, self.chunk_rows):
+                yield array[start:start + self.chunk_rows].astype(np.float64)
+            return
+
+        remaining = self.n_rows
+        while remaining > 0:
+            rows = min(self.chunk_rows, remaining)
+            data = await self.body.read_exact(rows * row_bytes)
+            remaining -= rows
+            chunk = np.frombuffer(data, dtype=self.dtype).reshape(rows, len(self.columns))
+            yield chunk.astype(np.float64, copy=False)
+
+
+class ArrowReader(BulkReader):
+    """
+    Arrow IPC stream; scored one record batch at a time
+
+    pyarrow reads synchronously, so the body is spooled first (in memory up
+    to ARROW_SPOOL_BYTES, then on disk). Clients control the chunk size
+    through the record batch size.
+    """
+
+    format = "arrow"
+
+    async def read_header(self) -> List[str]:
+        if pa_ipc is None:
+            raise BulkFormatError("Arrow payloads require pyarrow")
+
+        self._spool = tempfile.SpooledTemporaryFile(max_size=ARROW_SPOOL_BYTES)
+        self._spool.write(self.body.take(len(self.body.buffered())))
+        while await self.body.fill():
+            self._spool.write(self.body.take(len(self.body.buffered())))
+        self._spool.seek(0)
+
+        try:
+            self._reader = pa_ipc.open_stream(self._spool)
+        except Exception as e:
+            raise BulkFormatError(f"Invalid Arrow IPC stream: {e}") from e
+        return list(self._reader.schema.names)
+
+    async def chunks(self) -> AsyncIterator[np.ndarray]:
+        try:
+            while True:
+                batch = await run_in_threadpool(self._next_batch)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            self._spool.close()
+
+    def _next_batch(self) -> Optional[np.ndarray]:
+        try:
+            batch = self._reader.read_next_batch()
+        except StopIteration:
+            return None
+        return np.column_stack([
+            column.to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            for column in batch.columns
+        ])
+
+
+def open_reader(
+    content_type: str,
+    stream: AsyncIterator[bytes],
+    chunk_rows: int = 10000,
+    columns: Optional[List[str]] = None
+) -> BulkReader:
+    """
+    Reader for a request body based on its Content-Type
+
+    Raises:
+        BulkFormatError: If the Content-Type is not supported
+    """
+    fmt = BULK_FORMATS.get(content_type.split(";")[0].strip().lower())
+    if fmt is None:
+        raise BulkFormatError(
+            f"Unsupported Content-Type {content_type!r}; use one of {sorted(BULK_FORMATS)}"
+        )
+
+    body = _BodyReader(stream)
+    if fmt == "csv":
+        return CsvReader(body, chunk_rows)
+    if fmt == "npy":
+        return NpyReader(body, chunk_rows, columns)
+    return ArrowReader(body, chunk_rows)
+
+
+async def prepare(reader: BulkReader, model: MLModel) -> Optional[np.ndarray]:
+    """
+    Read the payload header and validate it against the model, once per request
+
+    Returns:
+        Column index for reordering chunks into model order (None if not needed)
+    """
+    if model.layout is None:
+        raise BulkSchemaError("Model exposes neither feature_names_in_ nor n_features_in_")
+    if isinstance(reader, NpyReader) and reader.columns is None:
+        # .npy carries no column names: assume model order
+        reader.columns = list(model.layout.names)
+
+    columns = await reader.read_header()
+    return column_index(columns, model.layout.names)
+
+
+async def stream_predictions(
+    reader: BulkReader,
+    model: MLModel,
+    index: Optional[np.ndarray],
+    executor
+) -> AsyncIterator[bytes]:
+    """
+    Score the payload chunk by chunk and yield CSV result rows
+    (prediction and, for classifiers, probability) in input order
+
+    An error after the first chunk aborts the stream, so clients should check
+    that they received one result row per input row.
+    """
+    has_proba = hasattr(model.model, "predict_proba")
+    yield b"prediction,probability\n" if has_proba else b"prediction\n"
+
+    async for chunk in reader.chunks():
+        start = time.perf_counter()
+        if index is not None:
+            chunk = chunk[:, index]
+        if not np.isfinite(chunk).all():
+            raise BulkSchemaError("Payload contains missing or non-finite values")
+
+        predictions, probabilities = await executor.score_array(model, chunk)
+
+        out = io.StringIO()
+        columns = predictions if probabilities is None else np.column_stack([predictions, probabilities])
+        np.savetxt(out, columns, delimiter=",", fmt="%.10g")
+
+        bulk_rows_scored.labels(model_version=model.version, format=reader.format).inc(len(chunk))
+        bulk_chunk_latency.labels(format=reader.format).observe(time.perf_counter() - start)
+        yield out.getvalue().encode()
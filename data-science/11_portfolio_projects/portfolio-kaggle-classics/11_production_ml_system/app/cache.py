@@ -0,0 +1,225 @@
+"""
+Two-tier prediction cache
+In-process LRU/TTL tier in front of Redis, with optional singleflight
+"""
+
+import asyncio
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.monitoring import cache_hits, cache_misses, cache_lookup_latency
+
+
+def local_cache_key(features: Dict[str, float], namespace: str) -> Tuple[str, frozenset]:
+    """
+    Key for the in-process tier
+    Hashing a frozenset of items avoids serializing the features at all
+    """
+    return namespace, frozenset(features.items())
+
+
+def redis_cache_key(features: Dict[str, float], namespace: str) -> str:
+    """
+    Stable key for the Redis tier, shared across processes
+    Sorted feature names plus their values packed as float64, hashed with BLAKE2b
+    """
+    items = sorted(features.items())
+    payload = "\x1f".join(name for name, _ in items).encode()
+    payload += struct.pack(f"{len(items)}d", *(value for _, value in items))
+    return f"prediction:{namespace}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+
+class LocalCache:
+    """
+    Bounded LRU cache with a per-entry time-to-live
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        """
+        Args:
+            max_entries: Maximum number of entries before evicting the least recently used
+            ttl_seconds: How long an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PredictionCache:
+    """
+    Prediction cache with an in-process tier in front of Redis
+
+    Lookups try the local tier first, then Redis (promoting hits to the local
+    tier). Keys are namespaced, normally by model version and artifact, so a
+    model reload never serves predictions from the previous model.
+    With singleflight enabled, concurrent misses for the same key share one
+    computation.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_entries: int = 10000,
+        local_ttl_seconds: float = 60.0,
+        redis_ttl_seconds: int = 3600,
+        singleflight: bool = True
+    ):
+        """
+        Args:
+            redis_client: Redis client (or RedisBackend), or None to use only
+                the local tier. Redis is skipped while the client reports
+                available=False, e.g. with its circuit open
+            max_entries: Size of the local tier (0 disables it)
+            local_ttl_seconds: TTL for local entries
+            redis_ttl_seconds: TTL for Redis entries
+            singleflight: Coalesce concurrent misses for the same key
+        """
+        self.redis_client = redis_client
+        self.local = LocalCache(max_entries, local_ttl_seconds)
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.singleflight = singleflight
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, features: Dict[str, float], namespace: str) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Look up cached prediction
+
+        Returns:
+            Tuple of (cached value or None, tier that served it or None)
+        """
+        key = local_cache_key(features, namespace)
+
+        start = time.perf_counter()
+        value = self.local.get(key)
+        cache_lookup_latency.labels(tier="local").observe(time.perf_counter() - start)
+        if value is not None:
+            cache_hits.labels(tier="local").inc()
+            return value, "local"
+        cache_misses.labels(tier="local").inc()
+
+        if not self._redis_available():
+            return None, None
+
+        start = time.perf_counter()
+        try:
+            cached = await run_in_threadpool(
+                self.redis_client.get, redis_cache_key(features, namespace)
+            )
+        except Exception as e:
+            print(f"Warning: Redis cache lookup failed: {e}")
+            cached = None
+        cache_lookup_latency.labels(tier="redis").observe(time.perf_counter() - start)
+
+        if cached:
+            cache_hits.labels(tier="redis").inc()
+            value = json.loads(cached)
+            self.local.set(key, value)
+            return value, "redis"
+        cache_misses.labels(tier="redis").inc()
+        return None, None
+
+    async def set(self, features: Dict[str, float], namespace: str, value: dict):
+        """
+        Store a prediction in both tiers
+        """
+        self.local.set(local_cache_key(features, namespace), value)
+
+        if not self._redis_available():
+            return
+        try:
+            await run_in_threadpool(
+                self.redis_client.setex,
+                redis_cache_key(features, namespace),
+                self.redis_ttl_seconds,
+                json.dumps(value)
+            )
+        except Exception as e:
+            print(f"Warning: Redis cache write failed: {e}")
+
+    async def get_or_compute(
+        self,
+        features: Dict[str, float],
+        namespace: str,
+        compute: Callable[[], Awaitable[dict]]
+    ) -> Tuple[dict, Optional[str]]:
+        """
+        Return the cached prediction, or compute and cache it
+
+        Returns:
+            Tuple of (value, tier) where tier is None if this call computed the
+            value and "singleflight" if it waited for another call's computation
+        """
+        value, tier = await self.get(features, namespace)
+        if value is not None:
+            return value, tier
+
+        if not self.singleflight:
+            value = await compute()
+            await self.set(features, namespace, value)
+            return value, None
+
+        key = local_cache_key(features, namespace)
+        leader = self._in_flight.get(key)
+        if leader is not None:
+            cache_hits.labels(tier="singleflight").inc()
+            return await asyncio.shield(leader), "singleflight"
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            await self.set(features, namespace, value)
+            future.set_result(value)
+            return value, None
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def _redis_available(self) -> bool:
+        return self.redis_client is not None and getattr(self.redis_client, "available", True)
+
+    def clear_local(self):
+        """
+        Drop every entry in the in-process tier
+        """
+        self.local.clear()
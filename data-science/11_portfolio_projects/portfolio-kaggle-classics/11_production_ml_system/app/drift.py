@@ -0,0 +1,256 @@
+"""
+Streaming drift statistics for model predictions
+O(1) updates per prediction; summaries are computed only when read
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Matches the prediction_distribution histogram buckets
+DEFAULT_BIN_EDGES = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+
+# Floor for bin proportions so PSI stays finite on empty bins
+PSI_EPSILON = 1e-4
+
+
+class ReferenceDistribution:
+    """
+    Binned distribution of predictions on training/validation data
+
+    bin_edges are the inner edges; bin i holds values in
+    [bin_edges[i-1], bin_edges[i]), with open-ended first and last bins,
+    so there are len(bin_edges) + 1 proportions.
+    """
+
+    def __init__(self, bin_edges: Sequence[float], proportions: Sequence[float]):
+        if len(proportions) != len(bin_edges) + 1:
+            raise ValueError("Need exactly len(bin_edges) + 1 proportions")
+        if list(bin_edges) != sorted(bin_edges):
+            raise ValueError("bin_edges must be sorted")
+        total = float(sum(proportions))
+        if total <= 0:
+            raise ValueError("proportions must sum to a positive value")
+
+        self.bin_edges = [float(e) for e in bin_edges]
+        self.proportions = [float(p) / total for p in proportions]
+
+    @classmethod
+    def from_values(cls, values: Sequence[float], n_bins: int = 10) -> "ReferenceDistribution":
+        """
+        Build a reference from training predictions using quantile bin edges
+        """
+        ordered = sorted(float(v) for v in values)
+        if not ordered:
+            raise ValueError("Need at least one value to build a reference")
+
+        edges = []
+        for i in range(1, n_bins):
+            edge = ordered[min(len(ordered) - 1, (i * len(ordered)) // n_bins)]
+            if not edges or edge > edges[-1]:
+                edges.append(edge)
+        # n_bins == 1: a single edge at the minimum
+        if not edges:
+            edges = [ordered[0]]
+
+        counts = [0] * (len(edges) + 1)
+        for value in ordered:
+            counts[bisect_right(edges, value)] += 1
+        return cls(edges, counts)
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceDistribution":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["bin_edges"], data["proportions"])
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"bin_edges": self.bin_edges, "proportions": self.proportions}, f, indent=2)
+
+
+class DriftMonitor:
+    """
+    Sliding-window statistics over the most recent predictions
+
+    - mean/variance: Welford updates with removal of the evicted value
+    - quantiles: windowed histogram over the reference bins (approximate,
+      interpolated within a bin)
+    - PSI and KS: window histogram compared with the reference distribution
+      (KS is evaluated at the bin edges)
+
+    Adding a prediction is O(1); reading metrics is O(number of bins).
+    """
+
+    def __init__(self, window_size: int = 10000, reference: Optional[ReferenceDistribution] = None):
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+
+        self.window_size = window_size
+        self.reference = reference
+        self._lock = threading.Lock()
+        self._values = [0.0] * window_size
+        self._bins = [0] * window_size
+        self._reset()
+
+    def _reset(self):
+        edges = self.reference.bin_edges if self.reference else DEFAULT_BIN_EDGES
+        self._edges = edges
+        self._counts = [0] * (len(edges) + 1)
+        self._next = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def set_reference(self, reference: Optional[ReferenceDistribution]):
+        """
+        Switch reference distribution, re-binning the current window
+        """
+        with self._lock:
+            values = self._window_values()
+            self.reference = reference
+            self._reset()
+            for value in values:
+                self._add(value)
+
+    def clear(self):
+        """
+        Forget every prediction in the window
+        """
+        with self._lock:
+            self._reset()
+
+    def add(self, value: float):
+        with self._lock:
+            self._add(value)
+
+    def extend(self, values: Sequence[float]):
+        with self._lock:
+            for value in values:
+                self._add(value)
+
+    def _add(self, value: float):
+        slot = self._next
+        if self._count == self.window_size:
+            # Evict the oldest value (reverse Welford step)
+            old = self._values[slot]
+            self._counts[self._bins[slot]] -= 1
+            self._count -= 1
+            if self._count:
+                delta = old - self._mean
+                self._mean -= delta / self._count
+                self._m2 -= delta * (old - self._mean)
+            else:
+                self._mean = self._m2 = 0.0
+
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+        bin_index = bisect_right(self._edges, value)
+        self._values[slot] = value
+        self._bins[slot] = bin_index
+        self._counts[bin_index] += 1
+        self._next = (slot + 1) % self.window_size
+
+    def _window_values(self) -> List[float]:
+        if self._count < self.window_size:
+            return self._values[:self._count]
+        return self._values[self._next:] + self._values[:self._next]
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self._count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (same as np.std)"""
+        if not self._count:
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / self._count)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile of the window from the binned counts
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        if not total:
+            return 0.0
+
+        edges = self._edges
+        target = q * total
+        cumulative = 0
+        for i, c in enumerate(counts):
+            if c and cumulative + c >= target:
+                # Outer bins are open-ended: report their inner edge
+                if i == 0:
+                    return edges[0]
+                if i == len(edges):
+                    return edges[-1]
+                lower, upper = edges[i - 1], edges[i]
+                return lower + (upper - lower) * (target - cumulative) / c
+            cumulative += c
+        return edges[-1]
+
+    def psi(self) -> Optional[float]:
+        """
+        Population Stability Index of the window against the reference
+        """
+        if self.reference is None or not self._count:
+            return None
+        with self._lock:
+            actual = [c / self._count for c in self._counts]
+        return sum(
+            (max(a, PSI_EPSILON) - max(e, PSI_EPSILON))
+            * math.log(max(a, PSI_EPSILON) / max(e, PSI_EPSILON))
+            for a, e in zip(actual, self.reference.proportions)
+        )
+
+    def ks(self) -> Optional[float]:
+        """
+        Kolmogorov-Smirnov distance between window and reference CDFs at the bin edges
+        """
+        if self.reference is None or not self._count:
+            return None
+        with self._lock:
+            actual = [c / self._count for c in self._counts]
+        distance = cdf_actual = cdf_expected = 0.0
+        for a, e in zip(actual, self.reference.proportions):
+            cdf_actual += a
+            cdf_expected += e
+            distance = max(distance, abs(cdf_actual - cdf_expected))
+        return distance
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        """
+        Summary of the current window
+        """
+        return {
+            "mean": self.mean,
+            "std": self.std,
+            "count": self.count,
+            "window_size": self.window_size,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "psi": self.psi(),
+            "ks": self.ks()
+        }
+
+
+def reference_path_for(model_path: Path) -> Path:
+    """
+    Default location of the reference distribution saved next to a model
+    e.g. models/model.pkl -> models/model.reference.json
+    """
+    return model_path.with_suffix(".reference.json")
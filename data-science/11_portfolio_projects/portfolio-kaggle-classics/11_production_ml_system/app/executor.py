@@ -0,0 +1,244 @@
+"""
+Inference execution layer
+Runs CPU-bound model scoring off the asyncio event loop
+"""
+
+import os
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.model import MLModel, get_model
+from app.monitoring import executor_queue_depth, executor_active_workers, executor_rejections
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Raised when the executor already has max_workers + max_queue jobs in flight
+    """
+
+
+# Models loaded in this worker process (process mode only), most recent last
+_worker_models: "OrderedDict[Tuple, MLModel]" = OrderedDict()
+
+# Models kept per worker process; older ones are dropped after a swap
+WORKER_MODEL_CACHE_SIZE = 4
+
+ModelKey = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def _model_key(model: MLModel) -> ModelKey:
+    """
+    Identifies a model artifact across processes
+    """
+    return str(model.model_path), model.version, model.artifact_id, model.mmap_mode
+
+
+def _worker_model(key: ModelKey) -> MLModel:
+    """
+    Get a model in this worker process, loading it on first use
+    """
+    model = _worker_models.get(key)
+    if model is None:
+        model_path, version, _, mmap_mode = key
+        model = MLModel(model_path, version, drift_window=1, mmap_mode=mmap_mode)
+        _worker_models[key] = model
+        while len(_worker_models) > WORKER_MODEL_CACHE_SIZE:
+            _worker_models.popitem(last=False)
+    _worker_models.move_to_end(key)
+    return model
+
+
+def _init_worker(key: Optional[ModelKey]):
+    """
+    Process pool initializer: preload the active model in each worker
+    """
+    if key is not None:
+        _worker_model(key)
+
+
+def _worker_predict_batch(key: ModelKey, features_batch: List[Dict[str, float]]):
+    """
+    Score a batch with the model cached in this worker process
+    """
+    return _worker_model(key).predict_batch(features_batch)
+
+
+def _worker_score_array(key: ModelKey, feature_array: np.ndarray):
+    """
+    Score a feature array with the model cached in this worker process
+    """
+    return _worker_model(key).score_array(feature_array)
+
+
+class InferenceExecutor:
+    """
+    Bounded pool that scores requests without blocking the event loop
+
+    Modes:
+    - inline: score on the event loop (previous behaviour, useful for debugging)
+    - thread: score in a thread pool sharing the loaded models
+    - process: score in worker processes, each with its own copy of the models
+      (loaded on first use and identified by artifact, so a model swap is
+      picked up without restarting the pool)
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        preload: Optional[MLModel] = None
+    ):
+        """
+        Args:
+            mode: One of "inline", "thread" or "process"
+            max_workers: Number of worker threads/processes
+            max_queue: Jobs allowed to wait for a free worker before rejecting
+            preload: Model to load in each worker process at startup
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"mode must be one of {EXECUTOR_MODES}, got {mode!r}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._pool: Optional[Executor] = None
+        if mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        elif mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(_model_key(preload) if preload is not None else None,)
+            )
+
+    async def predict(
+        self,
+        model: MLModel,
+        features: Dict[str, float]
+    ) -> Tuple[float, Optional[float], float]:
+        """
+        Score a single request
+
+        Returns:
+            Tuple of (prediction, probability, latency_ms)
+        """
+        predictions, probabilities, latency_ms = await self.predict_batch(model, [features])
+        return predictions[0], probabilities[0], latency_ms
+
+    async def predict_batch(
+        self,
+        model: MLModel,
+        features_batch: List[Dict[str, float]]
+    ) -> Tuple[List[float], List[Optional[float]], float]:
+        """
+        Score a batch of requests with the given model on a worker
+
+        Raises:
+            ExecutorSaturatedError: If the pool and its queue are full
+        """
+        if self._pool is None:
+            return model.predict_batch(features_batch)
+
+        if self.mode == "process":
+            result = await self._submit(_worker_predict_batch, _model_key(model), features_batch)
+            # Workers track their own copy; keep drift stats in this process
+            model.record_predictions(result[0])
+            return result
+        return await self._submit(partial(model.predict_batch, features_batch))
+
+    async def score_array(
+        self,
+        model: MLModel,
+        feature_array: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Score a 2D feature array (columns in model order) on a worker
+        See MLModel.score_array
+
+        Raises:
+            ExecutorSaturatedError: If the pool and its queue are full
+        """
+        if self._pool is None:
+            return model.score_array(feature_array)
+        if self.mode == "process":
+            return await self._submit(_worker_score_array, _model_key(model), feature_array)
+        return await self._submit(partial(model.score_array, feature_array))
+
+    async def _submit(self, fn, *args):
+        """
+        Run fn on the pool, rejecting work beyond max_workers + max_queue
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            executor_rejections.inc()
+            raise ExecutorSaturatedError(
+                f"Inference executor saturated ({self._in_flight} jobs in flight)"
+            )
+
+        self._in_flight += 1
+        self._report()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._report()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Current saturation of the executor
+        """
+        active = min(self._in_flight, self.max_workers)
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active_workers": active,
+            "queue_depth": self._in_flight - active
+        }
+
+    def _report(self):
+        stats = self.stats()
+        executor_active_workers.set(stats["active_workers"])
+        executor_queue_depth.set(stats["queue_depth"])
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop all workers
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+# Global executor instance
+_executor_instance: Optional[InferenceExecutor] = None
+
+
+def get_executor() -> InferenceExecutor:
+    """
+    Get or create the global inference executor
+    Configured by INFERENCE_EXECUTOR, INFERENCE_WORKERS and INFERENCE_MAX_QUEUE
+    """
+    global _executor_instance
+
+    if _executor_instance is None:
+        _executor_instance = InferenceExecutor(
+            mode=os.getenv("INFERENCE_EXECUTOR", "thread"),
+            max_workers=int(os.getenv("INFERENCE_WORKERS", "4")),
+            max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "64")),
+            preload=get_model()
+        )
+
+    return _executor_instance
@@ -0,0 +1,98 @@
+"""
+Compiled feature layout
+Maps request feature dicts onto the model's column order without per-call setup
+"""
+
+import threading
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class FeatureSchemaError(ValueError):
+    """
+    Raised when request features do not match the model's features
+    """
+
+    def __init__(self, missing: Sequence[str], extra: Sequence[str]):
+        self.missing = sorted(missing)
+        self.extra = sorted(extra)
+        super().__init__(f"Feature mismatch: missing {self.missing}, unexpected {self.extra}")
+
+
+class FeatureLayout:
+    """
+    Column layout of a model, built once at load time
+
+    - names/index: feature order and name -> column position
+    - validate(): one set comparison of the request keys against the schema;
+      missing or unexpected features raise instead of being zero-filled or
+      misordered
+    - to_array(): fills rows with a precompiled itemgetter into a per-thread
+      buffer that is reused across calls, so steady-state scoring allocates
+      no input arrays
+
+    The array returned by to_array() is a view of that buffer: it is only
+    valid until the next to_array() call on the same thread.
+    """
+
+    def __init__(self, names: Sequence[str], dtype=np.float64, initial_rows: int = 32):
+        """
+        Args:
+            names: Feature names in model column order
+            dtype: Input dtype expected by the model
+            initial_rows: Rows preallocated per thread (grown on demand)
+        """
+        if len(set(names)) != len(names):
+            raise ValueError("Feature names must be unique")
+
+        self.names = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.dtype = np.dtype(dtype)
+        self.initial_rows = max(1, initial_rows)
+        self._keys = frozenset(self.names)
+        # itemgetter returns a bare value, not a tuple, for a single name
+        self._getter = itemgetter(*self.names) if len(self.names) > 1 else (
+            lambda features: (features[self.names[0]],)
+        )
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self.names)
+
+    def validate(self, features: Dict[str, float]):
+        """
+        Raises:
+            FeatureSchemaError: If features has missing or unexpected names
+        """
+        if features.keys() != self._keys:
+            keys = features.keys()
+            raise FeatureSchemaError(self._keys - keys, keys - self._keys)
+
+    def to_array(self, features_batch: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Fill a (len(features_batch), n_features) array in model column order
+
+        Raises:
+            FeatureSchemaError: If any row has missing or unexpected names
+        """
+        n_rows = len(features_batch)
+        out = self._buffer(n_rows)
+        getter = self._getter
+        keys = self._keys
+        for i, features in enumerate(features_batch):
+            if features.keys() != keys:
+                self.validate(features)
+            out[i] = getter(features)
+        return out
+
+    def _buffer(self, n_rows: int) -> np.ndarray:
+        buffer: Optional[np.ndarray] = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.shape[0] < n_rows:
+            capacity = self.initial_rows
+            while capacity < n_rows:
+                capacity *= 2
+            buffer = np.empty((capacity, len(self.names)), dtype=self.dtype)
+            self._local.buffer = buffer
+        return buffer[:n_rows]
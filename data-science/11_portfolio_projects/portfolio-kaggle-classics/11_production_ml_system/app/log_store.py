@@ -0,0 +1,640 @@
+"""
+Prediction log storage
+Typed feature encoding, per-minute rollups, daily partitions, retention and
+Parquet offload of expired partitions
+"""
+
+import os
+import re
+import asyncio
+import hashlib
+import struct
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    JSON, DateTime, Float, Integer, String, case, column, delete, func, inspect, select, table, text
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from starlette.concurrency import run_in_threadpool
+
+from app.backends import get_database_backend
+from app.database import (
+    FeatureSchema,
+    PredictionLog,
+    PredictionRollup,
+    ROLLUP_LATENCY_BOUNDS_MS,
+    ROLLUP_PREDICTION_BOUNDS,
+    LATENCY_BUCKET_COLUMNS,
+    PREDICTION_BUCKET_COLUMNS,
+    engine as default_engine
+)
+from app.monitoring import log_partitions_expired, log_rows_archived, log_maintenance_latency
+
+try:
+    import pyarrow  # noqa: F401  (pandas Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:  # Parquet offload is optional
+    PARQUET_AVAILABLE = False
+
+RECORDS_TABLE = PredictionLog.__tablename__
+
+# JSON-based table written by earlier versions, backfilled by migrate_legacy()
+LEGACY_TABLE = "prediction_logs"
+_LEGACY = table(
+    LEGACY_TABLE,
+    column("id", Integer),
+    column("timestamp", DateTime),
+    column("model_version", String),
+    column("input_features", JSON),
+    column("prediction", Float),
+    column("prediction_proba", Float),
+    column("latency_ms", Float),
+    column("request_id", String)
+)
+
+# Daily PostgreSQL partitions are named prediction_records_pYYYYMMDD
+_PARTITION_NAME = re.compile(rf"^{RECORDS_TABLE}_p(\d{{8}})$")
+
+_RECORD_COLUMNS = [c.name for c in PredictionLog.__table__.columns]
+
+# Rollup columns summed when minutes are merged
+_ADDITIVE_COLUMNS = [
+    "count", "cached_count", "latency_sum_ms", "prediction_sum", "prediction_sq_sum"
+] + LATENCY_BUCKET_COLUMNS + PREDICTION_BUCKET_COLUMNS
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def schema_id_for(names: Sequence[str]) -> str:
+    """
+    Stable id of a set of feature names (in storage order)
+    """
+    return hashlib.blake2b("\x1f".join(names).encode(), digest_size=8).hexdigest()
+
+
+def decode_features(blobs: Sequence[bytes], n_features: int) -> np.ndarray:
+    """
+    Unpack stored feature vectors into a (len(blobs), n_features) array
+    """
+    if not blobs:
+        return np.empty((0, n_features))
+    data = b"".join(bytes(blob) for blob in blobs)
+    return np.frombuffer(data, dtype="<f8").reshape(len(blobs), n_features)
+
+
+def histogram_quantile(q: float, bounds: Sequence[float], counts: Sequence[int]) -> Optional[float]:
+    """
+    Estimate a quantile from bucket counts by linear interpolation within
+    the bucket holding it (like Prometheus' histogram_quantile)
+    Values in the overflow bucket are reported as the last bound.
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= rank:
+            if i == len(bounds):
+                return float(bounds[-1])
+            upper = bounds[i]
+            lower = bounds[i - 1] if i > 0 else min(0.0, upper)
+            return float(lower + (upper - lower) * (rank - cumulative) / count)
+        cumulative += count
+    return float(bounds[-1])
+
+
+def _bucket_counts(values: np.ndarray, bounds: Sequence[float]) -> np.ndarray:
+    # Bucket i holds bounds[i-1] < value <= bounds[i]
+    return np.bincount(np.searchsorted(bounds, values, side="left"), minlength=len(bounds) + 1)
+
+
+class LogStore:
+    """
+    Storage layout for prediction logs
+
+    Write path (one transaction per log batch, called by the log writer):
+    - features are packed as float64 in sorted-name order and stored as
+      bytes with the id of their FeatureSchema, instead of a JSON object
+    - per-minute, per-version rollups (counts, latency and prediction
+      histograms, sums) are upserted in the same transaction, so dashboards
+      read at most one row per minute and version
+
+    Maintenance (periodic, and whenever the database reconnects):
+    - on PostgreSQL, daily range partitions are created ahead of time and a
+      default partition catches anything else
+    - raw rows older than retention_days are removed: whole partitions are
+      dropped on PostgreSQL, rows are deleted day by day on SQLite. With an
+      archive_dir they are first written to Parquet, one file per day and
+      feature schema with one typed column per feature
+    - rollups are kept for rollup_retention_days
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        retention_days: int = 30,
+        rollup_retention_days: int = 365,
+        archive_dir: Optional[str] = None,
+        precreate_days: int = 3,
+        maintenance_interval_seconds: float = 3600,
+        breaker=None
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine (defaults to app.database.engine)
+            retention_days: Days of raw prediction logs to keep
+            rollup_retention_days: Days of per-minute rollups to keep
+            archive_dir: Write expired raw logs here as Parquet (None to discard)
+            precreate_days: Daily partitions created ahead of today (PostgreSQL)
+            maintenance_interval_seconds: Time between maintenance runs
+            breaker: Optional CircuitBreaker; maintenance is skipped while it is open
+        """
+        if retention_days < 1 or rollup_retention_days < 1:
+            raise ValueError("Retention periods must be at least one day")
+        if archive_dir and not PARQUET_AVAILABLE:
+            raise ValueError("Archiving prediction logs to Parquet requires pyarrow")
+
+        self.engine = engine if engine is not None else default_engine
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.precreate_days = precreate_days
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        self.breaker = breaker
+        # Feature key order -> (schema id, names, getter, packer)
+        self._layouts: Dict[Tuple[str, ...], tuple] = {}
+        self._worker: Optional[asyncio.Task] = None
+
+    # Write path
+
+    def write(self, conn, rows: List[Dict]):
+        """
+        Insert log rows and update rollups on an open transaction
+
+        Rows are dicts with request_id, timestamp, model_version,
+        input_features, prediction, prediction_proba, latency_ms and
+        optionally cached.
+        """
+        if not rows:
+            return
+        insert = _DIALECT_INSERTS.get(conn.dialect.name)
+        if insert is None:
+            raise ValueError(f"Unsupported database dialect {conn.dialect.name!r}")
+
+        records, schemas = self.encode(rows)
+        conn.execute(
+            insert(FeatureSchema.__table__).on_conflict_do_nothing(index_elements=["schema_id"]),
+            [{"schema_id": schema_id, "feature_names": list(names)} for schema_id, names in schemas.items()]
+        )
+        conn.execute(PredictionLog.__table__.insert(), records)
+        conn.execute(_rollup_upsert(insert), self.rollup_increments(records))
+
+    def encode(self, rows: List[Dict]) -> Tuple[List[Dict], Dict[str, Tuple[str, ...]]]:
+        """
+        Convert log rows to PredictionLog records
+
+        Returns:
+            Tuple of (records, schema id -> feature names used by them)
+        """
+        records = []
+        schemas = {}
+        for row in rows:
+            features = row["input_features"]
+            schema_id, names, getter, packer = self._layout(tuple(features))
+            schemas[schema_id] = names
+            timestamp = row.get("timestamp") or datetime.utcnow()
+            latency_ms = row.get("latency_ms") or 0.0
+            records.append({
+                "request_id": row["request_id"],
+                "timestamp": timestamp,
+                "model_version": row["model_version"],
+                "schema_id": schema_id,
+                "features": packer.pack(*getter(features)),
+                "prediction": row.get("prediction"),
+                "prediction_proba": row.get("prediction_proba"),
+                "latency_ms": latency_ms,
+                "cached": bool(row.get("cached", False))
+            })
+        return records, schemas
+
+    def _layout(self, keys: Tuple[str, ...]) -> tuple:
+        layout = self._layouts.get(keys)
+        if layout is None:
+            names = tuple(sorted(keys))
+            if len(names) > 1:
+                getter = itemgetter(*names)
+            else:
+                # itemgetter returns a bare value, not a tuple, for a single name
+                getter = lambda features, names=names: tuple(features[n] for n in names)
+            layout = (schema_id_for(names), names, getter, struct.Struct(f"<{len(names)}d"))
+            if len(self._layouts) >= 1024:
+                self._layouts.clear()
+            self._layouts[keys] = layout
+        return layout
+
+    @staticmethod
+    def rollup_increments(records: List[Dict]) -> List[Dict]:
+        """
+        Per-minute, per-version aggregates of a batch of records
+        """
+        groups: Dict[Tuple[datetime, str], List[Dict]] = {}
+        for record in records:
+            minute = record["timestamp"].replace(second=0, microsecond=0)
+            groups.setdefault((minute, record["model_version"]), []).append(record)
+
+        increments = []
+        for (minute, version), group in groups.items():
+            latency = np.array([r["latency_ms"] for r in group], dtype=float)
+            predictions = np.array(
+                [r["prediction"] for r in group if r["prediction"] is not None], dtype=float
+            )
+            increment = {
+                "minute": minute,
+                "model_version": version,
+                "count": len(group),
+                "cached_count": sum(1 for r in group if r["cached"]),
+                "latency_sum_ms": float(latency.sum()),
+                "latency_max_ms": float(latency.max()),
+                "prediction_sum": float(predictions.sum()),
+                "prediction_sq_sum": float(np.square(predictions).sum())
+            }
+            increment.update(zip(
+                LATENCY_BUCKET_COLUMNS, _bucket_counts(latency, ROLLUP_LATENCY_BOUNDS_MS).tolist()
+            ))
+            increment.update(zip(
+                PREDICTION_BUCKET_COLUMNS, _bucket_counts(predictions, ROLLUP_PREDICTION_BOUNDS).tolist()
+            ))
+            increments.append(increment)
+        return increments
+
+    # Reads
+
+    def rollups(
+        self,
+        start: datetime,
+        end: datetime,
+        model_version: Optional[str] = None,
+        step_minutes: int = 1
+    ) -> List[Dict]:
+        """
+        Summaries over [start, end) in step_minutes buckets, per model version,
+        computed from the rollup table only
+        """
+        if step_minutes < 1:
+            raise ValueError("step_minutes must be at least 1")
+
+        rollup = PredictionRollup.__table__
+        query = select(rollup).where(rollup.c.minute >= start, rollup.c.minute < end)
+        if model_version is not None:
+            query = query.where(rollup.c.model_version == model_version)
+        with self.engine.connect() as conn:
+            frame = pd.DataFrame(conn.execute(query).mappings().all(), columns=rollup.c.keys())
+        if frame.empty:
+            return []
+
+        offset = (pd.to_datetime(frame["minute"]) - pd.Timestamp(start)) // pd.Timedelta(minutes=step_minutes)
+        frame["bucket_start"] = pd.Timestamp(start) + offset * pd.Timedelta(minutes=step_minutes)
+        aggregations = {name: "sum" for name in _ADDITIVE_COLUMNS}
+        aggregations["latency_max_ms"] = "max"
+        merged = frame.groupby(["bucket_start", "model_version"], sort=True).agg(aggregations)
+
+        summaries = []
+        for (bucket_start, version), row in merged.iterrows():
+            count = int(row["count"])
+            latency_counts = row[LATENCY_BUCKET_COLUMNS].astype(int).tolist()
+            prediction_counts = row[PREDICTION_BUCKET_COLUMNS].astype(int).tolist()
+            n_predictions = sum(prediction_counts)
+            mean = row["prediction_sum"] / n_predictions if n_predictions else None
+            variance = row["prediction_sq_sum"] / n_predictions - mean ** 2 if n_predictions else None
+            summaries.append({
+                "start": bucket_start.isoformat(),
+                "model_version": version,
+                "count": count,
+                "cached_count": int(row["cached_count"]),
+                "latency_mean_ms": row["latency_sum_ms"] / count if count else None,
+                "latency_max_ms": float(row["latency_max_ms"]),
+                **{
+                    f"latency_p{round(q * 100)}_ms": _at_most(
+                        histogram_quantile(q, ROLLUP_LATENCY_BOUNDS_MS, latency_counts),
+                        float(row["latency_max_ms"])
+                    )
+                    for q in (0.5, 0.95, 0.99)
+                },
+                "prediction_mean": mean,
+                "prediction_std": float(np.sqrt(max(variance, 0.0))) if variance is not None else None,
+                "prediction_histogram": {
+                    "bounds": ROLLUP_PREDICTION_BOUNDS,
+                    "counts": prediction_counts
+                }
+            })
+        return summaries
+
+    def read_records(
+        self,
+        start: datetime,
+        end: datetime,
+        model_version: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Raw log rows in [start, end) with one float column per feature
+        Rows with different feature schemas are concatenated (missing
+        features are NaN).
+        """
+        records = PredictionLog.__table__
+        query = select(records).where(records.c.timestamp >= start, records.c.timestamp < end)
+        if model_version is not None:
+            query = query.where(records.c.model_version == model_version)
+        with self.engine.connect() as conn:
+            return self._decode_frame(conn, conn.execute(query).mappings().all())
+
+    @staticmethod
+    def _decode_frame(conn, rows) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame(columns=[c for c in _RECORD_COLUMNS if c != "features"])
+
+        by_schema: Dict[str, List] = {}
+        for row in rows:
+            by_schema.setdefault(row["schema_id"], []).append(row)
+        schemas = dict(conn.execute(
+            select(FeatureSchema.schema_id, FeatureSchema.feature_names)
+            .where(FeatureSchema.schema_id.in_(list(by_schema)))
+        ).all())
+
+        frames = []
+        for schema_id, group in by_schema.items():
+            names = schemas[schema_id]
+            frame = pd.DataFrame(
+                [{k: row[k] for k in _RECORD_COLUMNS if k != "features"} for row in group]
+            )
+            values = decode_features([row["features"] for row in group], len(names))
+            frames.append(pd.concat([frame, pd.DataFrame(values, columns=names)], axis=1))
+        return pd.concat(frames, ignore_index=True).sort_values("timestamp", ignore_index=True)
+
+    # Maintenance
+
+    def migrate_legacy(self, batch_size: int = 5000) -> int:
+        """
+        Move rows from the legacy prediction_logs table into prediction_records
+
+        Each batch is written (with its rollups) and deleted from the legacy
+        table in one transaction, so an interrupted migration resumes where it
+        stopped. The emptied legacy table is dropped. Rows older than the
+        retention period are expired (or archived) by the next maintain().
+
+        Returns:
+            Number of rows migrated
+        """
+        if not inspect(self.engine).has_table(LEGACY_TABLE):
+            return 0
+
+        with self.engine.connect() as conn:
+            remaining = conn.execute(select(func.count()).select_from(_LEGACY)).scalar()
+        if remaining:
+            print(f"Warning: migrating {remaining} prediction logs from {LEGACY_TABLE} to {RECORDS_TABLE}")
+
+        migrated = 0
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(
+                    select(_LEGACY).order_by(_LEGACY.c.id).limit(batch_size)
+                ).mappings().all()
+                if not rows:
+                    conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+                    break
+                self.write(conn, [{
+                    "request_id": row["request_id"] or str(uuid.uuid4()),
+                    "timestamp": row["timestamp"],
+                    "model_version": row["model_version"] or "unknown",
+                    "input_features": row["input_features"] or {},
+                    "prediction": row["prediction"],
+                    "prediction_proba": row["prediction_proba"],
+                    "latency_ms": row["latency_ms"]
+                } for row in rows])
+                conn.execute(delete(_LEGACY).where(_LEGACY.c.id <= rows[-1]["id"]))
+            migrated += len(rows)
+
+        if migrated:
+            print(f"Migrated {migrated} prediction logs from {LEGACY_TABLE}")
+        return migrated
+
+    def maintain(self, now: Optional[datetime] = None):
+        """
+        Create upcoming partitions and enforce retention (runs on a worker thread)
+        """
+        now = now or datetime.utcnow()
+        start = time.perf_counter()
+        if self.engine.dialect.name == "postgresql":
+            self.ensure_partitions(now.date())
+        self.enforce_retention(now)
+        log_maintenance_latency.observe(time.perf_counter() - start)
+
+    def ensure_partitions(self, today: date):
+        """
+        Create the default partition and daily partitions from yesterday
+        through precreate_days ahead (PostgreSQL only)
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {RECORDS_TABLE}_default PARTITION OF {RECORDS_TABLE} DEFAULT"
+            ))
+
+        for offset in range(-1, self.precreate_days + 1):
+            day = today + timedelta(days=offset)
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} PARTITION OF {RECORDS_TABLE} "
+                        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                    ))
+            except Exception as e:
+                # E.g. rows for that day already landed in the default partition
+                print(f"Warning: could not create log partition for {day}: {e}")
+
+    def enforce_retention(self, now: datetime):
+        """
+        Remove raw logs and rollups older than their retention periods
+        """
+        cutoff = datetime.combine((now - timedelta(days=self.retention_days)).date(), datetime.min.time())
+
+        if self.engine.dialect.name == "postgresql":
+            for day, partition in self._partitions():
+                if day < cutoff.date():
+                    self._archive_day(partition, day)
+                    with self.engine.begin() as conn:
+                        conn.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+                    log_partitions_expired.inc()
+            # Stragglers outside the daily partitions
+            self._expire_rows(f"{RECORDS_TABLE}_default", cutoff)
+        else:
+            self._expire_rows(RECORDS_TABLE, cutoff)
+
+        rollup = PredictionRollup.__table__
+        with self.engine.begin() as conn:
+            conn.execute(delete(rollup).where(
+                rollup.c.minute < now - timedelta(days=self.rollup_retention_days)
+            ))
+
+    def _partitions(self) -> List[Tuple[date, str]]:
+        with self.engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :parent"
+            ), {"parent": RECORDS_TABLE}).scalars().all()
+
+        partitions = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions.append((datetime.strptime(match.group(1), "%Y%m%d").date(), name))
+        return sorted(partitions)
+
+    def _expire_rows(self, table_name: str, cutoff: datetime):
+        """
+        Archive and delete rows older than cutoff one day at a time
+        """
+        records = _records_table(table_name)
+        while True:
+            with self.engine.connect() as conn:
+                oldest = conn.execute(
+                    select(func.min(records.c.timestamp)).where(records.c.timestamp < cutoff)
+                ).scalar()
+            if oldest is None:
+                return
+
+            day = oldest.date()
+            self._archive_day(table_name, day)
+            day_start = datetime.combine(day, datetime.min.time())
+            with self.engine.begin() as conn:
+                conn.execute(delete(records).where(
+                    records.c.timestamp >= day_start,
+                    records.c.timestamp < day_start + timedelta(days=1)
+                ))
+            log_partitions_expired.inc()
+
+    def _archive_day(self, table_name: str, day: date):
+        """
+        Write one day of raw logs to Parquet, one file per feature schema
+        """
+        if self.archive_dir is None:
+            return
+
+        records = _records_table(table_name)
+        day_start = datetime.combine(day, datetime.min.time())
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(records).where(
+                records.c.timestamp >= day_start,
+                records.c.timestamp < day_start + timedelta(days=1)
+            )).mappings().all()
+            frame = self._decode_frame(conn, rows)
+        if frame.empty:
+            return
+
+        directory = self.archive_dir / f"date={day.isoformat()}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for schema_id, group in frame.groupby("schema_id"):
+            group = group.dropna(axis=1, how="all")
+            path = directory / f"schema={schema_id}.parquet"
+            if path.exists():
+                # Rows of this day archived by an earlier run (e.g. late arrivals)
+                group = pd.concat([pd.read_parquet(path), group], ignore_index=True)
+                group = group.drop_duplicates("request_id", keep="last")
+            tmp = path.with_suffix(".parquet.tmp")
+            group.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        log_rows_archived.inc(len(frame))
+
+    def start(self):
+        """
+        Start periodic maintenance on the running event loop
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.maintenance_interval_seconds)
+            if self.breaker is not None and not self.breaker.allow():
+                continue
+            try:
+                await run_in_threadpool(self.maintain)
+            except Exception as e:
+                print(f"Error maintaining prediction log storage: {e}")
+
+
+def _at_most(estimate: Optional[float], maximum: float) -> Optional[float]:
+    # Interpolation within a bucket can overshoot the largest observed value
+    return None if estimate is None else min(estimate, maximum)
+
+
+def _partition_name(day: date) -> str:
+    return f"{RECORDS_TABLE}_p{day.strftime('%Y%m%d')}"
+
+
+def _records_table(name: str):
+    """
+    Lightweight table clause with the PredictionLog columns, for partitions
+    """
+    if name == RECORDS_TABLE:
+        return PredictionLog.__table__
+    return table(name, *(column(c.name, c.type) for c in PredictionLog.__table__.columns))
+
+
+def _rollup_upsert(insert):
+    """
+    INSERT ... ON CONFLICT that adds increments to an existing minute
+    """
+    rollup = PredictionRollup.__table__
+    statement = insert(rollup)
+    excluded = statement.excluded
+    updates = {name: rollup.c[name] + excluded[name] for name in _ADDITIVE_COLUMNS}
+    updates["latency_max_ms"] = case(
+        (excluded.latency_max_ms > rollup.c.latency_max_ms, excluded.latency_max_ms),
+        else_=rollup.c.latency_max_ms
+    )
+    return statement.on_conflict_do_update(index_elements=["minute", "model_version"], set_=updates)
+
+
+# Global store instance
+_store_instance: Optional[LogStore] = None
+
+
+def get_log_store() -> LogStore:
+    """
+    Get or create the global prediction log store
+    Configured by LOG_RETENTION_DAYS, LOG_ROLLUP_RETENTION_DAYS,
+    LOG_ARCHIVE_DIR, LOG_PARTITION_PRECREATE_DAYS and
+    LOG_MAINTENANCE_INTERVAL_SECONDS
+    """
+    global _store_instance
+
+    if _store_instance is None:
+        _store_instance = LogStore(
+            retention_days=int(os.getenv("LOG_RETENTION_DAYS", "30")),
+            rollup_retention_days=int(os.getenv("LOG_ROLLUP_RETENTION_DAYS", "365")),
+            archive_dir=os.getenv("LOG_ARCHIVE_DIR") or None,
+            precreate_days=int(os.getenv("LOG_PARTITION_PRECREATE_DAYS", "3")),
+            maintenance_interval_seconds=float(os.getenv("LOG_MAINTENANCE_INTERVAL_SECONDS", "3600")),
+            breaker=get_database_backend().breaker
+        )
+
+    return _store_instance
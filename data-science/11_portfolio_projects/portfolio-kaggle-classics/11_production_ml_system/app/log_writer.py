@@ -0,0 +1,316 @@
+"""
+Buffered, batched writer for prediction logs
+Replaces one INSERT + COMMIT per request with periodic bulk inserts
+"""
+
+import os
+import json
+import asyncio
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.backends import CircuitOpenError, get_database_backend
+from app.database import engine as default_engine
+from app.log_store import LogStore, get_log_store
+from app.monitoring import (
+    log_buffer_rows,
+    log_rows_written,
+    log_rows_dropped,
+    log_rows_spilled,
+    log_flush_latency
+)
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+
+class PredictionLogWriter:
+    """
+    Collects prediction log rows in memory and bulk-inserts them
+
+    Rows are flushed when batch_size rows are buffered or every
+    flush_interval_ms, whichever comes first. The buffer never holds more than
+    max_buffer rows; what happens to rows beyond that depends on the policy:
+    - block: the caller waits until a flush frees space (backpressure)
+    - drop: the row is discarded and counted
+    - spill: the row is queued and appended to a JSON lines file on a worker
+      thread, then inserted later
+
+    Rows from a failed flush are spilled when a spill file is configured and
+    dropped otherwise. Call replay_spill() once the database is reachable to
+    insert spilled rows; the app registers it as a database connect hook.
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size: int = 500,
+        flush_interval_ms: float = 1000,
+        max_buffer: int = 50000,
+        overflow_policy: str = "drop",
+        spill_path: Optional[str] = None,
+        breaker=None,
+        store: Optional[LogStore] = None
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine to write to (defaults to app.database.engine)
+            batch_size: Rows per bulk insert; reaching it triggers a flush
+            flush_interval_ms: Maximum time a row waits in the buffer
+            max_buffer: Memory cap in rows
+            overflow_policy: One of "block", "drop" or "spill"
+            spill_path: JSON lines file for spilled rows (required for "spill")
+            breaker: Optional CircuitBreaker; while it is open, batches are
+                spilled or dropped without attempting an insert
+            store: LogStore that encodes rows and maintains rollups
+                (defaults to one on the same engine)
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow_policy must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}"
+            )
+        if overflow_policy == "spill" and not spill_path:
+            raise ValueError("spill_path is required for the spill overflow policy")
+        if batch_size < 1 or max_buffer < batch_size:
+            raise ValueError("Need 1 <= batch_size <= max_buffer")
+
+        self.engine = engine if engine is not None else default_engine
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.breaker = breaker
+        self.store = store if store is not None else LogStore(self.engine)
+
+        self._buffer: List[Dict] = []
+        self._overflow: List[Dict] = []
+        self._worker: Optional[asyncio.Task] = None
+        self._overflow_worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._spill_lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the periodic flush task on the running event loop
+        """
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._stopping = False
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flush task and write everything still buffered
+        """
+        if self._worker is not None:
+            # Not cancelled: a cancelled flush would lose the rows it took from the buffer
+            self._stopping = True
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+        if self._overflow_worker is not None:
+            await self._overflow_worker
+            self._overflow_worker = None
+        await self._spill_overflow()
+        await self.flush()
+
+    async def log(self, row: Dict):
+        """
+        Buffer one prediction log row (see LogStore.write for its keys)
+        Returns immediately unless the buffer is full and the policy is "block"
+        """
+        self.start()
+
+        if len(self._buffer) >= self.max_buffer:
+            if self.overflow_policy == "drop":
+                log_rows_dropped.labels(reason="buffer_full").inc()
+                return
+            if self.overflow_policy == "spill":
+                # Written off the event loop; the file I/O must not stall requests
+                self._overflow.append(row)
+                if self._overflow_worker is None or self._overflow_worker.done():
+                    self._overflow_worker = asyncio.get_running_loop().create_task(
+                        self._spill_overflow()
+                    )
+                return
+            while len(self._buffer) >= self.max_buffer:
+                self._space.clear()
+                self._wakeup.set()
+                await self._space.wait()
+
+        self._buffer.append(row)
+        log_buffer_rows.set(len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """
+        Write all buffered rows in batch_size chunks
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            while self._buffer:
+                rows = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                log_buffer_rows.set(len(self._buffer))
+                if self._space is not None:
+                    self._space.set()
+                await run_in_threadpool(self._write, rows)
+
+    async def _run(self):
+        """
+        Flush when batch_size is reached or the interval elapses
+        """
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _spill_overflow(self):
+        """
+        Append queued overflow rows to the spill file on a worker thread
+        """
+        while self._overflow:
+            rows = self._overflow
+            self._overflow = []
+            try:
+                await run_in_threadpool(self._spill, rows)
+            except Exception as e:
+                print(f"Error spilling {len(rows)} prediction logs: {e}")
+                log_rows_dropped.labels(reason="spill_error").inc(len(rows))
+
+    def _write(self, rows: List[Dict]):
+        """
+        Bulk insert rows in one transaction (runs on a worker thread)
+        """
+        start = time.perf_counter()
+        try:
+            if self.breaker is not None:
+                self.breaker.call(self._insert, rows)
+            else:
+                self._insert(rows)
+        except CircuitOpenError:
+            self._fail(rows, "circuit_open")
+            return
+        except Exception as e:
+            print(f"Error writing {len(rows)} prediction logs: {e}")
+            self._fail(rows, "write_error")
+            return
+
+        log_flush_latency.observe(time.perf_counter() - start)
+        log_rows_written.inc(len(rows))
+
+    def _insert(self, rows: List[Dict]):
+        with self.engine.begin() as conn:
+            self.store.write(conn, rows)
+
+    def _fail(self, rows: List[Dict], reason: str):
+        """
+        Keep rows that could not be written in the spill file, or drop them
+        """
+        if self.spill_path is not None:
+            self._spill(rows)
+        else:
+            log_rows_dropped.labels(reason=reason).inc(len(rows))
+
+    def _spill(self, rows: List[Dict]):
+        """
+        Append rows to the spill file as JSON lines
+        """
+        with self._spill_lock:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=_json_default) + "\n")
+        log_rows_spilled.inc(len(rows))
+
+    def replay_spill(self):
+        """
+        Insert rows spilled by this or a previous process
+
+        Runs as a database connect hook, so rows are inserted directly rather
+        than through the breaker. On the first failed batch the remaining rows
+        go back to the spill file and the error is raised, so the next
+        connection attempt retries them.
+        """
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+
+        replaying = self.spill_path.with_suffix(self.spill_path.suffix + ".replay")
+        with self._spill_lock:
+            os.replace(self.spill_path, replaying)
+
+        rows = []
+        with open(replaying) as f:
+            for line in f:
+                row = json.loads(line)
+                if row.get("timestamp"):
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                rows.append(row)
+
+        written = 0
+        try:
+            for i in range(0, len(rows), self.batch_size):
+                batch = rows[i:i + self.batch_size]
+                self._insert(batch)
+                written += len(batch)
+                log_rows_written.inc(len(batch))
+        finally:
+            if written < len(rows):
+                self._spill(rows[written:])
+            replaying.unlink()
+            if written:
+                print(f"Replayed {written} spilled prediction logs")
+
+    def buffered(self) -> int:
+        """
+        Number of rows waiting to be written
+        """
+        return len(self._buffer)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+# Global writer instance
+_writer_instance: Optional[PredictionLogWriter] = None
+
+
+def get_log_writer() -> PredictionLogWriter:
+    """
+    Get or create the global prediction log writer
+    Configured by LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL_MS, LOG_MAX_BUFFER,
+    LOG_OVERFLOW_POLICY and LOG_SPILL_PATH
+    """
+    global _writer_instance
+
+    if _writer_instance is None:
+        _writer_instance = PredictionLogWriter(
+            batch_size=int(os.getenv("LOG_BATCH_SIZE", "500")),
+            flush_interval_ms=float(os.getenv("LOG_FLUSH_INTERVAL_MS", "1000")),
+            max_buffer=int(os.getenv("LOG_MAX_BUFFER", "50000")),
+            overflow_policy=os.getenv("LOG_OVERFLOW_POLICY", "drop"),
+            spill_path=os.getenv("LOG_SPILL_PATH", "logs/prediction_spill.jsonl"),
+            breaker=get_database_backend().breaker,
+            store=get_log_store()
+        )
+
+    return _writer_instance
@@ -5,30 +5,45 @@ Features: Model versioning, caching, logging, monitoring
 """
 
 import os
-import json
-import hashlib
+import time
+import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-import redis
-
-from app.model import get_model, MLModel
-from app.database import init_db, get_db, PredictionLog
+from sqlalchemy.exc import OperationalError
+
+from app.model import (
+    get_model,
+    get_model_manager,
+    get_batcher,
+    batching_enabled,
+    ModelPathError,
+    ModelValidationError,
+    MLModel,
+    resolve_model_file
+)
+from app.executor import get_executor, ExecutorSaturatedError
+from app.features import FeatureSchemaError
+from app.registry import get_registry, UnknownModelVersionError
+from app.bulk import BulkFormatError, BulkSchemaError, open_reader, prepare, stream_predictions
+from app.cache import PredictionCache
+from app.backends import get_database_backend, get_redis_backend
+from app.database import init_db
+from app.log_writer import get_log_writer
+from app.log_store import get_log_store
 from app.monitoring import (
     metrics_endpoint,
     predictions_total,
     prediction_latency,
     prediction_distribution,
-    prediction_mean,
-    prediction_std,
     prediction_errors,
-    cache_hits,
-    cache_misses
+    observe_stage,
+    MetricsMiddleware
 )
 
 # Initialize FastAPI app
@@ -38,36 +53,60 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Request count/latency by route template, in-flight requests
+app.add_middleware(MetricsMiddleware)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """
-    Initialize database and load model on application startup
+    Load model on application startup
+    Backends connect in the background, so startup does not wait for (or
+    fail without) the database or Redis
     """
-    init_db()
-    # Preload model
+    # Preload model and start inference workers
     get_model()
+    get_registry()
+    get_executor()
+    # Once the database is reachable (and after every outage): create tables,
+    # move logs from the legacy prediction_logs table, prepare log partitions
+    # and apply retention, then insert logs spilled to disk while it was not
+    database = get_database_backend()
+    store = get_log_store()
+    database.on_connect = [init_db, store.migrate_legacy, store.maintain, get_log_writer().replay_spill]
+    await database.start()
+    await get_redis_backend().start()
+    get_log_writer().start()
+    get_log_store().start()
+    if batching_enabled():
+        get_batcher().start()
     print("✓ Application started successfully")
 
 
-# Redis connection (with fallback if Redis is not available)
-def get_redis_client():
+@app.on_event("shutdown")
+async def shutdown_event():
     """
-    Get Redis client for caching
-    Returns None if Redis is not available
+    Stop the micro-batching worker and the inference executor,
+    flush buffered prediction logs, then close backend connections
     """
-    try:
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        client = redis.from_url(redis_url, decode_responses=True)
-        # Test connection
-        client.ping()
-        return client
-    except Exception as e:
-        print(f"Warning: Redis not available: {e}")
-        return None
-
-
-redis_client = get_redis_client()
+    if batching_enabled():
+        await get_batcher().stop()
+    get_executor().shutdown()
+    await get_log_writer().stop()
+    await get_log_store().stop()
+    await get_database_backend().stop()
+    await get_redis_backend().stop()
+
+
+# Redis is pooled and connects lazily; while it is down the cache serves
+# from the local tier only
+prediction_cache = PredictionCache(
+    get_redis_backend(),
+    max_entries=int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "10000")),
+    local_ttl_seconds=float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "60")),
+    redis_ttl_seconds=int(os.getenv("CACHE_TTL_SECONDS", "3600")),
+    singleflight=os.getenv("CACHE_SINGLEFLIGHT", "true").lower() in ("1", "true", "yes")
+)
 
 
 # Pydantic models for request/response validation
@@ -112,130 +151,112 @@ class HealthResponse(BaseModel):
     model_version: str
     database_connected: bool
     redis_connected: bool
+    backends: Dict[str, Dict] = Field(default_factory=dict)
     timestamp: str
 
 
-def log_prediction_background(
-    db: Session,
-    request_id: str,
-    model_version: str,
-    features: Dict,
-    prediction: float,
-    probability: Optional[float],
-    latency_ms: float
-):
-    """
-    Background task to log prediction to database
-    Runs asynchronously to not block the response
-    """
-    try:
-        log_entry = PredictionLog(
-            request_id=request_id,
-            timestamp=datetime.utcnow(),
-            model_version=model_version,
-            input_features=features,
-            prediction=prediction,
-            prediction_proba=probability,
-            latency_ms=latency_ms
-        )
-        db.add(log_entry)
-        db.commit()
-    except Exception as e:
-        print(f"Error logging prediction: {e}")
-        db.rollback()
-
-
-def get_cache_key(features: Dict) -> str:
-    """
-    Generate cache key from features
-    Uses hash of sorted features to ensure consistency
-    """
-    features_str = json.dumps(features, sort_keys=True)
-    return f"prediction:{hashlib.md5(features_str.encode()).hexdigest()}"
-
-
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(
     request: PredictionRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    x_model_version: Optional[str] = Header(None),
+    x_routing_key: Optional[str] = Header(None)
 ):
     """
     Make prediction using the loaded model
 
     Features:
-    - Caching with Redis for repeated requests
-    - Automatic logging to PostgreSQL
+    - Two-tier caching (in-process LRU + Redis) for repeated requests
+    - Batched logging to PostgreSQL
     - Prometheus metrics collection
-    - Model versioning
+    - Model versioning and per-version routing
 
     Args:
         request: Prediction request with features
-        background_tasks: FastAPI background tasks
-        db: Database session
+        http_request: Raw request, used to time the request stages
+        x_model_version: Score with this model version (X-Model-Version header)
+        x_routing_key: Keeps a client on the same version of a weighted
+            split (X-Routing-Key header)
 
     Returns:
         PredictionResponse with prediction and metadata
     """
+    # Body read, JSON parsing and validation happen before the handler runs
+    request_start = getattr(http_request.state, "request_start", None)
+    if request_start is not None:
+        observe_stage("deserialize", time.perf_counter() - request_start)
+
     request_id = str(uuid.uuid4())
-    model = get_model()
-    cached = False
-    prediction = None
-    probability = None
-    latency_ms = 0
+    try:
+        model = await get_registry().resolve(x_model_version, x_routing_key)
+    except UnknownModelVersionError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {x_model_version}")
+    try:
+        model.validate_features(request.features)
+    except FeatureSchemaError as e:
+        prediction_errors.labels(error_type=type(e).__name__).inc()
+        raise HTTPException(status_code=422, detail=str(e))
+    namespace = model.cache_namespace
+    inference_seconds = 0.0
+
+    async def compute():
+        nonlocal inference_seconds
+        start = time.perf_counter()
+        if batching_enabled():
+            prediction, probability, latency_ms = await get_batcher().predict(model, request.features)
+        else:
+            prediction, probability, latency_ms = await get_executor().predict(model, request.features)
+        inference_seconds = time.perf_counter() - start
+        observe_stage("inference", inference_seconds)
+        return {"prediction": prediction, "probability": probability, "latency_ms": latency_ms}
 
     try:
-        # Check cache first
-        if request.use_cache and redis_client:
-            cache_key = get_cache_key(request.features)
-            cached_result = redis_client.get(cache_key)
-
-            if cached_result:
-                cache_hits.inc()
-                cached = True
-                result = json.loads(cached_result)
-                prediction = result["prediction"]
-                probability = result.get("probability")
-                latency_ms = 0.0  # Cache hit is essentially instant
+        if request.use_cache:
+            start = time.perf_counter()
+            result, tier = await prediction_cache.get_or_compute(
+                request.features, namespace, compute
+            )
+            elapsed = time.perf_counter() - start
+            if tier == "singleflight":
+                # Followers spend this waiting on the leader's inference,
+                # which must not be counted as cache time
+                observe_stage("singleflight_wait", elapsed)
             else:
-                cache_misses.inc()
-
-        # Make prediction if not cached
-        if not cached:
-            prediction, probability, latency_ms = model.predict(request.features)
-
-            # Cache the result if Redis is available
-            if redis_client:
-                cache_key = get_cache_key(request.features)
-                cache_value = json.dumps({
-                    "prediction": prediction,
-                    "probability": probability
-                })
-                # Cache for 1 hour
-                redis_client.setex(cache_key, 3600, cache_value)
+                observe_stage("cache_lookup", elapsed - inference_seconds)
+        else:
+            result, tier = await compute(), None
+            await prediction_cache.set(request.features, namespace, result)
+
+        cached = tier is not None
+        prediction = result["prediction"]
+        probability = result.get("probability")
+        # Cache hit is essentially instant
+        latency_ms = 0.0 if cached else result["latency_ms"]
 
         # Update Prometheus metrics
         predictions_total.labels(model_version=model.version).inc()
         prediction_latency.observe(latency_ms / 1000)
         prediction_distribution.observe(prediction)
 
-        # Update drift metrics
-        drift_metrics = model.get_drift_metrics()
-        prediction_mean.labels(model_version=model.version).set(drift_metrics["mean"])
-        prediction_std.labels(model_version=model.version).set(drift_metrics["std"])
-
-        # Log to database (background task)
-        background_tasks.add_task(
-            log_prediction_background,
-            db=db,
-            request_id=request_id,
-            model_version=model.version,
-            features=request.features,
-            prediction=prediction,
-            probability=probability,
-            latency_ms=latency_ms
-        )
-
+        # Compare against the shadow model, if one is running (background)
+        manager = get_model_manager()
+        if model is manager.active:
+            manager.maybe_shadow(request.features, prediction)
+
+        # Log to database (buffered, written in batches)
+        await get_log_writer().log({
+            "request_id": request_id,
+            "timestamp": datetime.utcnow(),
+            "model_version": model.version,
+            "input_features": request.features,
+            "prediction": prediction,
+            "prediction_proba": probability,
+            "latency_ms": latency_ms,
+            "cached": cached
+        })
+
+        # The middleware times response serialization from here
+        http_request.state.handler_end = time.perf_counter()
         return PredictionResponse(
             request_id=request_id,
             prediction=prediction,
@@ -246,13 +267,71 @@ async def predict(
             timestamp=datetime.utcnow().isoformat()
         )
 
+    except ExecutorSaturatedError as e:
+        prediction_errors.labels(error_type=type(e).__name__).inc()
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         prediction_errors.labels(error_type=type(e).__name__).inc()
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+@app.post("/predict/bulk")
+async def predict_bulk(
+    request: Request,
+    columns: Optional[str] = None,
+    x_model_version: Optional[str] = Header(None)
+):
+    """
+    Score a columnar payload and stream the results back as CSV
+
+    The body is CSV with a header row (text/csv), a 2D .npy array
+    (application/x-npy) or an Arrow IPC stream
+    (application/vnd.apache.arrow.stream). The schema is validated once
+    against the model's features, then rows are scored in vectorized chunks
+    of BULK_CHUNK_ROWS. Results are neither cached nor logged per row.
+
+    Args:
+        request: Raw request, read as a stream
+        columns: Comma-separated column names for .npy payloads
+            (defaults to the model's feature order)
+        x_model_version: Score with this model version (X-Model-Version
+            header); defaults to the active model
+
+    Returns:
+        CSV with a prediction (and probability) column, one row per input row
+    """
+    try:
+        model = await get_registry().get(x_model_version or get_model().version)
+    except UnknownModelVersionError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {x_model_version}")
+
+    try:
+        reader = open_reader(
+            request.headers.get("content-type", ""),
+            request.stream(),
+            chunk_rows=int(os.getenv("BULK_CHUNK_ROWS", "10000")),
+            columns=columns.split(",") if columns else None
+        )
+    except BulkFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    try:
+        index = await prepare(reader, model)
+    except BulkFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BulkSchemaError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return StreamingResponse(
+        stream_predictions(reader, model, index, get_executor()),
+        media_type="text/csv",
+        headers={"X-Model-Version": model.version}
+    )
+
+
 @app.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check():
     """
     Health check endpoint
 
@@ -260,30 +339,26 @@ async def health_check(db: Session = Depends(get_db)):
     - Model version
     - Database connectivity
     - Redis connectivity
+    - Circuit state and pool usage of each backend
+
+    Backends with an open circuit are reported as disconnected without
+    being contacted, so health checks stay fast during an outage.
     """
     model = get_model()
+    database = get_database_backend()
+    redis_backend = get_redis_backend()
 
-    # Check database
-    db_connected = True
-    try:
-        db.execute("SELECT 1")
-    except Exception:
-        db_connected = False
-
-    # Check Redis
-    redis_connected = False
-    if redis_client:
-        try:
-            redis_client.ping()
-            redis_connected = True
-        except Exception:
-            pass
+    db_connected, redis_connected = await asyncio.gather(
+        run_in_threadpool(database.ping),
+        run_in_threadpool(redis_backend.ping)
+    )
 
     return HealthResponse(
         status="healthy" if db_connected else "degraded",
         model_version=model.version,
         database_connected=db_connected,
         redis_connected=redis_connected,
+        backends={"database": database.stats(), "redis": redis_backend.stats()},
         timestamp=datetime.utcnow().isoformat()
     )
 
@@ -293,8 +368,9 @@ async def metrics():
     """
     Prometheus metrics endpoint
     Returns metrics in Prometheus format for scraping
+    Rendered in a worker thread so a scrape never stalls in-flight requests
     """
-    return metrics_endpoint()
+    return await run_in_threadpool(metrics_endpoint)
 
 
 @app.get("/model/info")
@@ -313,23 +389,126 @@ async def model_info():
         "model_path": str(model.model_path),
         "feature_names": model.feature_names,
         "feature_count": len(model.feature_names) if model.feature_names else None,
-        "drift_metrics": drift_metrics
+        "drift_metrics": drift_metrics,
+        "executor": get_executor().stats(),
+        "deployment": get_model_manager().info()
     }
 
 
+def candidate_model_path(model_file: Optional[str], version: Optional[str]) -> Optional[str]:
+    """
+    Model path for a reload or shadow request, or None if neither names one
+    A model_file must be inside the models directory; otherwise a version
+    registered in MODEL_REGISTRY is loaded from its configured path
+
+    Raises:
+        HTTPException: 400 if model_file is outside the models directory or missing
+    """
+    if model_file is not None:
+        try:
+            return resolve_model_file(model_file, get_model_manager().models_dir)
+        except ModelPathError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if version is not None:
+        return get_registry().model_paths.get(version)
+    return None
+
+
 @app.post("/model/reload")
-async def reload_model():
+async def reload_model(model_file: Optional[str] = None, version: Optional[str] = None):
     """
-    Reload model from disk
-    Useful for deploying new model versions without restarting the service
+    Load a model in the background, validate it and swap it in atomically
+    Defaults to reloading the current model file; pass model_file (a file in
+    MODELS_DIR) and/or version to deploy a different artifact. Requests keep
+    being served by the current model until the swap.
     """
+    model_path = candidate_model_path(model_file, version)
     try:
-        model = get_model()
-        model.reload_model()
-        return {"status": "success", "message": "Model reloaded successfully"}
+        swap = await get_model_manager().swap(model_path, version)
+    except ModelValidationError as e:
+        raise HTTPException(status_code=409, detail=f"Model rejected: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reloading model: {str(e)}")
 
+    get_registry().sync_active()
+    # Entries of the old model are unreachable under the new namespace
+    prediction_cache.clear_local()
+    return {"status": "success", "message": "Model reloaded successfully", **swap}
+
+
+@app.get("/models")
+async def list_models():
+    """
+    Versions served by the registry, their memory footprint and traffic split
+    """
+    return get_registry().info()
+
+
+@app.get("/predictions/rollups")
+async def prediction_rollups(
+    minutes: int = 60,
+    step_minutes: int = 1,
+    model_version: Optional[str] = None
+):
+    """
+    Request counts, latency quantiles and prediction histograms per model
+    version over the last `minutes`, in `step_minutes` buckets
+    Read from the per-minute rollup table, never from raw prediction logs
+    """
+    if minutes < 1 or step_minutes < 1:
+        raise HTTPException(status_code=422, detail="minutes and step_minutes must be positive")
+
+    end = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    start = end - timedelta(minutes=minutes)
+    try:
+        buckets = await run_in_threadpool(
+            get_database_backend().breaker.call,
+            get_log_store().rollups, start, end, model_version, step_minutes
+        )
+    except (ConnectionError, OperationalError) as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading rollups: {str(e)}")
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "step_minutes": step_minutes,
+        "buckets": buckets
+    }
+
+
+@app.post("/model/shadow")
+async def start_shadow(version: str, model_file: Optional[str] = None, fraction: float = 0.1):
+    """
+    Score a sampled fraction of live traffic with a second model
+    The model is model_file (a file in MODELS_DIR) or, without it, the
+    registered version. Latency and agreement are recorded in Prometheus;
+    responses are unaffected
+    """
+    model_path = candidate_model_path(model_file, version)
+    if model_path is None:
+        raise HTTPException(
+            status_code=422, detail=f"Pass model_file or a registered version, got {version!r}"
+        )
+    try:
+        return await get_model_manager().start_shadow(model_path, version, fraction)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ModelValidationError as e:
+        raise HTTPException(status_code=409, detail=f"Model rejected: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading shadow model: {str(e)}")
+
+
+@app.delete("/model/shadow")
+async def stop_shadow():
+    """
+    Stop shadow scoring
+    """
+    get_model_manager().stop_shadow()
+    return {"status": "success", "message": "Shadow model stopped"}
+
 
 @app.get("/")
 async def root():
@@ -341,10 +520,14 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/predict": "Make predictions",
+            "/predict/bulk": "Score CSV, .npy or Arrow payloads (streamed CSV results)",
             "/health": "Health check",
             "/metrics": "Prometheus metrics",
             "/model/info": "Model information",
-            "/model/reload": "Reload model",
+            "/model/reload": "Reload model (validated, zero-downtime swap)",
+            "/model/shadow": "Start/stop shadow scoring with a candidate model",
+            "/models": "Served model versions and routing weights",
+            "/predictions/rollups": "Per-minute prediction and latency summaries",
             "/docs": "API documentation (Swagger UI)"
         }
     }
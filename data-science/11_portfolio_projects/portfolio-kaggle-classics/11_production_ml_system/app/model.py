@@ -4,14 +4,78 @@ Supports model versioning with MLflow
 """
 
 import os
+import sys
+import json
+import random
+import asyncio
 import joblib
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import time
 
-# For model drift tracking
-from collections import deque
+from starlette.concurrency import run_in_threadpool
+
+from app.drift import DriftMonitor, ReferenceDistribution, reference_path_for
+from app.features import FeatureLayout
+from app.monitoring import (
+    batch_size,
+    batch_queue_wait,
+    batch_queue_depth,
+    bind_drift_metrics,
+    model_swaps,
+    model_warmup_latency,
+    shadow_predictions,
+    shadow_latency,
+    unbind_drift_metrics
+)
+
+
+def estimate_memory_bytes(obj, _seen: Optional[dict] = None) -> int:
+    """
+    Approximate heap memory held by a fitted estimator
+
+    Walks containers and object attributes, counting numpy buffers by nbytes
+    and everything else by sys.getsizeof. Memory-mapped arrays are file-backed
+    and shared between processes, so they are not counted.
+    """
+    # id -> object, keeping temporaries (e.g. __getstate__ results) alive so
+    # their ids are not reused during the walk
+    if _seen is None:
+        _seen = {}
+    if id(obj) in _seen:
+        return 0
+    _seen[id(obj)] = obj
+
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        if isinstance(obj.base, np.ndarray):
+            # A view: count the buffer it shares once
+            return estimate_memory_bytes(obj.base, _seen)
+        if obj.dtype == object:
+            return obj.nbytes + sum(estimate_memory_bytes(item, _seen) for item in obj.flat)
+        return obj.nbytes
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            estimate_memory_bytes(k, _seen) + estimate_memory_bytes(v, _seen)
+            for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_memory_bytes(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += estimate_memory_bytes(vars(obj), _seen)
+    elif hasattr(obj, "__getstate__"):
+        # Extension types such as sklearn's Tree expose their arrays this way
+        try:
+            state = obj.__getstate__()
+        except Exception:
+            state = None
+        if isinstance(state, (dict, tuple)):
+            size += estimate_memory_bytes(state, _seen)
+    return size
 
 
 class MLModel:
@@ -19,21 +83,34 @@ class MLModel:
     Wrapper class for ML model with versioning support
     """
 
-    def __init__(self, model_path: str = "models/model.pkl", version: str = "v1.0"):
+    def __init__(
+        self,
+        model_path: str = "models/model.pkl",
+        version: str = "v1.0",
+        drift_window: int = 10000,
+        mmap_mode: Optional[str] = None
+    ):
         """
         Initialize model from disk
 
         Args:
             model_path: Path to serialized model file
             version: Model version identifier
+            drift_window: Number of recent predictions used for drift statistics
+            mmap_mode: joblib mmap_mode (e.g. "r") to memory-map the model's
+                numpy arrays, so processes loading the same file share pages
         """
         self.model_path = Path(model_path)
         self.version = version
+        self.mmap_mode = mmap_mode
         self.model = None
         self.feature_names = None
+        self.layout: Optional[FeatureLayout] = None
+        self.artifact_id = None
+        self.memory_bytes = 0
 
         # For tracking predictions (model drift detection)
-        self.recent_predictions = deque(maxlen=1000)
+        self.drift = DriftMonitor(drift_window)
 
         self.load_model()
 
@@ -48,15 +125,42 @@ class MLModel:
                 f"Please train a model first using notebooks/model_training.ipynb"
             )
 
-        self.model = joblib.load(self.model_path)
+        self.model = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+        stat = self.model_path.stat()
+        self.artifact_id = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        self.memory_bytes = estimate_memory_bytes(self.model)
         print(f"✓ Model loaded successfully from {self.model_path}")
         print(f"  Version: {self.version}")
+        print(f"  Memory: {self.memory_bytes / 1e6:.1f} MB")
 
         # Try to get feature names if available
         if hasattr(self.model, 'feature_names_in_'):
             self.feature_names = self.model.feature_names_in_.tolist()
             print(f"  Features: {len(self.feature_names)}")
 
+        # Request dict -> array mapping, compiled once per load
+        self.layout = None
+        layout_names = self.feature_names
+        if layout_names is None and hasattr(self.model, 'n_features_in_'):
+            # Unnamed models (trained on arrays) take feature_0 .. feature_{n-1}
+            layout_names = [f"feature_{i}" for i in range(self.model.n_features_in_)]
+        if layout_names is not None:
+            self.layout = FeatureLayout(layout_names)
+
+        # Training prediction distribution for PSI/KS, if saved next to the model
+        reference_path = reference_path_for(self.model_path)
+        if reference_path.exists():
+            self.drift.set_reference(ReferenceDistribution.load(str(reference_path)))
+            print(f"  Drift reference: {reference_path}")
+
+    @property
+    def cache_namespace(self) -> str:
+        """
+        Prefix for cached predictions of this model
+        Changes whenever a different artifact is loaded, even under the same version
+        """
+        return f"{self.version}:{self.artifact_id}"
+
     def predict(self, features: Dict[str, float]) -> Tuple[float, Optional[float], float]:
         """
         Make prediction from input features
@@ -69,14 +173,7 @@ class MLModel:
         """
         start_time = time.time()
 
-        # Convert features dict to array in correct order
-        if self.feature_names:
-            feature_array = np.array([
-                [features.get(name, 0.0) for name in self.feature_names]
-            ])
-        else:
-            # If no feature names, assume features dict has correct order
-            feature_array = np.array([list(features.values())])
+        feature_array = self._to_array([features])
 
         # Make prediction
         prediction = self.model.predict(feature_array)[0]
@@ -91,49 +188,539 @@ class MLModel:
         latency_ms = (time.time() - start_time) * 1000
 
         # Track prediction for drift monitoring
-        self.recent_predictions.append(float(prediction))
+        self.record_predictions([float(prediction)])
 
         return float(prediction), probability, latency_ms
 
-    def get_drift_metrics(self) -> Dict[str, float]:
+    def predict_batch(
+        self,
+        features_batch: List[Dict[str, float]]
+    ) -> Tuple[List[float], List[Optional[float]], float]:
+        """
+        Make predictions for many inputs with one vectorized model call
+
+        Args:
+            features_batch: List of feature dictionaries
+
+        Returns:
+            Tuple of (predictions, probabilities, latency_ms) where latency_ms
+            is the time spent scoring the whole batch
+        """
+        start_time = time.time()
+
+        feature_array = self._to_array(features_batch)
+
+        predictions, proba = self.score_array(feature_array)
+
+        probabilities: List[Optional[float]] = [None] * len(features_batch)
+        if proba is not None:
+            probabilities = proba.tolist()
+
+        latency_ms = (time.time() - start_time) * 1000
+
+        predictions = predictions.tolist()
+        self.record_predictions(predictions)
+
+        return predictions, probabilities, latency_ms
+
+    def score_array(self, feature_array: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Score a 2D array whose columns are already in model feature order
+        Not tracked for drift: used for bulk rescoring, which is not live traffic
+
+        Returns:
+            Tuple of (predictions, positive-class probabilities or None) as float arrays
+        """
+        predictions = self.model.predict(feature_array).astype(float)
+
+        probabilities = None
+        if hasattr(self.model, 'predict_proba'):
+            proba = self.model.predict_proba(feature_array)
+            column = 1 if proba.shape[1] > 1 else 0
+            probabilities = proba[:, column].astype(float)
+
+        return predictions, probabilities
+
+    def record_predictions(self, predictions: List[float]):
+        """
+        Track predictions for drift monitoring
+        """
+        self.drift.extend(predictions)
+
+    def validate_features(self, features: Dict[str, float]):
+        """
+        Check a request's feature names against the model before it is
+        queued or cached, so one bad request cannot fail a whole batch
+
+        Raises:
+            FeatureSchemaError: On missing or unexpected features
+        """
+        if self.layout is not None:
+            self.layout.validate(features)
+
+    def _to_array(self, features_batch: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Convert feature dicts to an array in model column order
+        The result is a reused buffer: score it before converting another batch
+
+        Raises:
+            FeatureSchemaError: On missing or unexpected features
+        """
+        if self.layout is None:
+            raise ValueError("Model exposes neither feature_names_in_ nor n_features_in_")
+        return self.layout.to_array(features_batch)
+
+    def get_drift_metrics(self) -> Dict[str, Optional[float]]:
         """
         Calculate metrics for model drift detection
 
         Returns:
-            Dictionary with mean, std of recent predictions
+            Dictionary with mean, std, quantiles of recent predictions and,
+            when a reference distribution is available, PSI and KS scores
         """
-        if not self.recent_predictions:
-            return {"mean": 0.0, "std": 0.0, "count": 0}
+        return self.drift.metrics()
 
-        predictions_array = np.array(self.recent_predictions)
-        return {
-            "mean": float(np.mean(predictions_array)),
-            "std": float(np.std(predictions_array)),
-            "count": len(self.recent_predictions)
-        }
+    def canary_batch(self) -> List[Dict[str, float]]:
+        """
+        Inputs used to warm up and validate the model before it serves traffic
+        Uses models/<model>.canary.json (a list of feature dicts) when present,
+        otherwise a few synthetic rows
+        """
+        canary_path = self.model_path.with_suffix(".canary.json")
+        if canary_path.exists():
+            with open(canary_path) as f:
+                return json.load(f)
+
+        names = self.layout.names if self.layout is not None else []
+        return [{name: value for name in names} for value in (0.0, 1.0, -1.0)]
+
+
+class ModelValidationError(RuntimeError):
+    """
+    Raised when a candidate model fails its canary checks
+    """
+
+
+class ModelPathError(ValueError):
+    """
+    Raised when a requested model file is not inside the models directory
+    """
+
+
+def resolve_model_file(name: str, models_dir) -> str:
+    """
+    Resolve a model file name requested over the API inside models_dir
+
+    Loading a model unpickles it, so API callers may only name artifacts the
+    deployment put in the models directory: absolute paths and names that
+    leave the directory (e.g. via ../ or a symlink) are rejected.
+
+    Raises:
+        ModelPathError: If the file is outside models_dir or does not exist
+    """
+    root = Path(models_dir).resolve()
+    path = (root / name).resolve()
+    if root not in path.parents:
+        raise ModelPathError(f"Model file must be inside the models directory: {name}")
+    if not path.is_file():
+        raise ModelPathError(f"Model file not found: {name}")
+    return str(path)
+
+
+def validate_model(candidate: MLModel, active: Optional[MLModel] = None) -> float:
+    """
+    Warm up a candidate model on its canary batch and sanity check the output
+
+    Checks that every row gets a finite prediction, that probabilities are in
+    [0, 1], and that the feature schema matches the active model (clients
+    keep sending the same features across a swap).
+
+    Returns:
+        Warm-up latency in milliseconds
+
+    Raises:
+        ModelValidationError: If any check fails
+    """
+    if active is not None and candidate.feature_names != active.feature_names:
+        raise ModelValidationError(
+            f"Feature schema changed: {active.feature_names} -> {candidate.feature_names}"
+        )
+
+    canary = candidate.canary_batch()
+    try:
+        predictions, probabilities, latency_ms = candidate.predict_batch(canary)
+    except Exception as e:
+        raise ModelValidationError(f"Canary batch failed: {e}") from e
+
+    if len(predictions) != len(canary) or not np.all(np.isfinite(predictions)):
+        raise ModelValidationError("Canary batch returned missing or non-finite predictions")
+    if any(p is not None and not 0.0 <= p <= 1.0 for p in probabilities):
+        raise ModelValidationError("Canary batch returned probabilities outside [0, 1]")
+
+    # Canary predictions must not count as live traffic for drift
+    candidate.drift.clear()
+    return latency_ms
+
+
+class ModelManager:
+    """
+    Holds the active model and swaps in new versions blue/green style
+
+    A new artifact is loaded and validated in the background while the active
+    model keeps serving. Only then is it swapped in by replacing the active
+    reference, so in-flight requests finish on the model they started with.
+
+    Optionally a shadow model scores a sampled fraction of live traffic
+    after the response is computed; its latency and agreement with the
+    active model are recorded but never returned to clients.
+    """
+
+    def __init__(
+        self,
+        active: MLModel,
+        drift_window: int = 10000,
+        mmap_mode: Optional[str] = None,
+        models_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            active: Model to serve initially
+            drift_window: Predictions per drift window of loaded models
+            mmap_mode: Memory-map mode for loaded model arrays (e.g. "r")
+            models_dir: Directory that model files named over the API must be
+                in (defaults to the active model's directory)
+        """
+        self.drift_window = drift_window
+        self.mmap_mode = mmap_mode
+        self.models_dir = Path(models_dir) if models_dir else Path(active.model_path).parent
+        self.shadow: Optional[MLModel] = None
+        self.shadow_fraction = 0.0
+        self._swap_lock: Optional[asyncio.Lock] = None
+        self._shadow_tasks = set()
+        self._activate(active)
 
-    def reload_model(self):
+    def _activate(self, model: MLModel):
+        previous = getattr(self, "active", None)
+        self.active = model
+        # Retired versions stop exporting drift gauges, which also releases
+        # their DriftMonitor (and model) held by the gauge callbacks
+        if previous is not None and previous.version != model.version:
+            unbind_drift_metrics(previous.version)
+        bind_drift_metrics(model.version, model.drift)
+
+    async def load_candidate(self, model_path: str, version: str) -> Tuple[MLModel, float]:
         """
-        Reload model from disk (useful for model updates)
+        Load and validate a model off the event loop
+
+        Returns:
+            Tuple of (candidate model, warm-up latency in ms)
         """
-        print(f"Reloading model from {self.model_path}...")
-        self.load_model()
+        candidate = await run_in_threadpool(
+            MLModel, model_path, version, self.drift_window, self.mmap_mode
+        )
+        warmup_ms = await run_in_threadpool(validate_model, candidate, self.active)
+        model_warmup_latency.observe(warmup_ms / 1000)
+        return candidate, warmup_ms
 
+    async def swap(self, model_path: Optional[str] = None, version: Optional[str] = None) -> Dict:
+        """
+        Load, validate and atomically activate a model
+        Defaults to reloading the active model's path and version
 
-# Global model instance
-_model_instance: Optional[MLModel] = None
+        Raises:
+            ModelValidationError: If the candidate fails validation
+        """
+        if self._swap_lock is None:
+            self._swap_lock = asyncio.Lock()
 
+        async with self._swap_lock:
+            previous = self.active
+            try:
+                candidate, warmup_ms = await self.load_candidate(
+                    model_path or str(previous.model_path),
+                    version or previous.version
+                )
+            except Exception:
+                model_swaps.labels(status="rejected").inc()
+                raise
 
-def get_model() -> MLModel:
+            self._activate(candidate)
+            model_swaps.labels(status="success").inc()
+            print(f"✓ Swapped model {previous.version} -> {candidate.version}")
+
+            return {
+                "previous_version": previous.version,
+                "version": candidate.version,
+                "artifact_id": candidate.artifact_id,
+                "warmup_ms": warmup_ms
+            }
+
+    async def start_shadow(self, model_path: str, version: str, fraction: float) -> Dict:
+        """
+        Load a model to score a sampled fraction of live traffic in shadow
+        """
+        if not 0.0 < fraction <= 1.0:
+            raise ValueError("fraction must be in (0, 1]")
+
+        candidate, warmup_ms = await self.load_candidate(model_path, version)
+        self.shadow = candidate
+        self.shadow_fraction = fraction
+        return {"version": candidate.version, "fraction": fraction, "warmup_ms": warmup_ms}
+
+    def stop_shadow(self):
+        self.shadow = None
+        self.shadow_fraction = 0.0
+
+    def maybe_shadow(self, features: Dict[str, float], prediction: float):
+        """
+        Score features with the shadow model in the background, if sampled
+        Never delays or affects the live response
+        """
+        shadow = self.shadow
+        if shadow is None or random.random() >= self.shadow_fraction:
+            return
+
+        task = asyncio.get_running_loop().create_task(
+            self._score_shadow(shadow, features, prediction)
+        )
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def _score_shadow(self, shadow: MLModel, features: Dict[str, float], prediction: float):
+        try:
+            shadow_prediction, _, latency_ms = await run_in_threadpool(shadow.predict, features)
+        except Exception as e:
+            print(f"Shadow prediction failed: {e}")
+            shadow_predictions.labels(shadow_version=shadow.version, result="error").inc()
+            return
+
+        shadow_latency.labels(shadow_version=shadow.version).observe(latency_ms / 1000)
+        result = "agree" if shadow_prediction == prediction else "disagree"
+        shadow_predictions.labels(shadow_version=shadow.version, result=result).inc()
+
+    def info(self) -> Dict:
+        return {
+            "active_version": self.active.version,
+            "active_artifact_id": self.active.artifact_id,
+            "shadow_version": self.shadow.version if self.shadow else None,
+            "shadow_fraction": self.shadow_fraction
+        }
+
+
+# Global model manager instance
+_manager_instance: Optional[ModelManager] = None
+
+
+def get_model_manager() -> ModelManager:
     """
-    Get or create global model instance (singleton pattern)
-    Ensures only one model is loaded in memory
+    Get or create the global model manager
+    The initial model comes from MODEL_PATH and MODEL_VERSION; MODEL_MMAP_MODE
+    (e.g. "r") memory-maps model arrays. MODELS_DIR (default: the directory
+    of MODEL_PATH) holds the files /model/reload and /model/shadow may load
     """
-    global _model_instance
+    global _manager_instance
 
-    if _model_instance is None:
+    if _manager_instance is None:
         model_path = os.getenv("MODEL_PATH", "models/model.pkl")
         model_version = os.getenv("MODEL_VERSION", "v1.0")
-        _model_instance = MLModel(model_path, model_version)
+        drift_window = int(os.getenv("DRIFT_WINDOW", "10000"))
+        mmap_mode = os.getenv("MODEL_MMAP_MODE") or None
+        _manager_instance = ModelManager(
+            MLModel(model_path, model_version, drift_window, mmap_mode),
+            drift_window=drift_window,
+            mmap_mode=mmap_mode,
+            models_dir=os.getenv("MODELS_DIR") or None
+        )
+
+    return _manager_instance
+
+
+def get_model() -> MLModel:
+    """
+    Get the currently active model
+    Callers should fetch it once per request: a swap replaces the reference,
+    it never mutates a model that is serving
+    """
+    return get_model_manager().active
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into vectorized model calls
+
+    Requests are queued and a single worker task collects them until either
+    max_batch_size requests are waiting or max_wait_ms has passed since the
+    first one arrived. The batch is scored with one predict/predict_proba call
+    per model (requests queued around a model swap may target different
+    models) and each caller's future receives its own row of the result.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        executor=None
+    ):
+        """
+        Args:
+            max_batch_size: Maximum number of requests per model call
+            max_wait_ms: Maximum time to hold the first request of a batch
+            executor: Optional InferenceExecutor to score batches off the event loop
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_progress = set()
+
+    def start(self):
+        """
+        Start the batching worker on the running event loop
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the worker and fail any requests still waiting in the queue
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # Let batches that are already being scored finish
+        if self._in_progress:
+            await asyncio.gather(*self._in_progress, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        batch_queue_depth.set(0)
+
+    async def predict(
+        self,
+        model: MLModel,
+        features: Dict[str, float]
+    ) -> Tuple[float, Optional[float], float]:
+        """
+        Queue features for the next batch of this model and wait for the result
+
+        Returns:
+            Tuple of (prediction, probability, latency_ms), where latency_ms
+            includes the time spent waiting for the batch to form
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((model, features, future, time.time()))
+        batch_queue_depth.set(self._queue.qsize())
+        return await future
+
+    async def _run(self):
+        """
+        Worker loop: collect a batch, score it, fan results back out
+        """
+        loop = asyncio.get_running_loop()
+        max_wait = self.max_wait_ms / 1000
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued before waiting for more
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            batch_queue_depth.set(self._queue.qsize())
+
+            groups: Dict[int, list] = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+
+            # Score in separate tasks so the next batch can form meanwhile
+            for group in groups.values():
+                task = loop.create_task(self._process(group))
+                self._in_progress.add(task)
+                task.add_done_callback(self._in_progress.discard)
+
+    async def _process(self, batch: List[Tuple[MLModel, Dict[str, float], asyncio.Future, float]]):
+        """
+        Score one single-model batch and resolve the futures of its requests
+        """
+        dequeued_at = time.time()
+        batch_size.observe(len(batch))
+        for _, _, _, enqueued_at in batch:
+            batch_queue_wait.observe(dequeued_at - enqueued_at)
+
+        model = batch[0][0]
+        features_batch = [features for _, features, _, _ in batch]
+        try:
+            if self.executor is not None:
+                predictions, probabilities, _ = await self.executor.predict_batch(model, features_batch)
+            else:
+                predictions, probabilities, _ = model.predict_batch(features_batch)
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        finished_at = time.time()
+        for (_, _, future, enqueued_at), prediction, probability in zip(
+            batch, predictions, probabilities
+        ):
+            # The caller may have been cancelled (e.g. client disconnect)
+            if not future.done():
+                latency_ms = (finished_at - enqueued_at) * 1000
+                future.set_result((prediction, probability, latency_ms))
+
+
+# Global batcher instance (only created when batching is enabled)
+_batcher_instance: Optional[MicroBatcher] = None
+
+
+def batching_enabled() -> bool:
+    """
+    Whether /predict should coalesce requests (BATCHING_ENABLED env var)
+    """
+    return os.getenv("BATCHING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def get_batcher() -> MicroBatcher:
+    """
+    Get or create the global micro-batcher
+    Batch size and wait window come from BATCH_MAX_SIZE and BATCH_MAX_WAIT_MS
+    """
+    global _batcher_instance
+
+    if _batcher_instance is None:
+        # Imported here because app.executor depends on this module
+        from app.executor import get_executor
+
+        _batcher_instance = MicroBatcher(
+            max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "2")),
+            executor=get_executor()
+        )
 
-    return _model_instance
+    return _batcher_instance
@@ -14,6 +14,11 @@ request_count = Counter(
     ['endpoint', 'method', 'status']
 )
 
+requests_in_progress = Gauge(
+    'ml_api_requests_in_progress',
+    'Number of HTTP requests currently being handled'
+)
+
 # Latency metrics
 request_latency = Histogram(
     'ml_api_request_latency_seconds',
@@ -22,6 +27,13 @@ request_latency = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0]
 )
 
+request_stage_latency = Histogram(
+    'ml_api_request_stage_latency_seconds',
+    'Time spent in each stage of a /predict request',
+    ['stage'],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5]
+)
+
 prediction_latency = Histogram(
     'ml_prediction_latency_seconds',
     'Model prediction latency in seconds',
@@ -54,6 +66,24 @@ prediction_std = Gauge(
     ['model_version']
 )
 
+prediction_quantile = Gauge(
+    'ml_prediction_quantile',
+    'Approximate quantiles of recent predictions',
+    ['model_version', 'quantile']
+)
+
+prediction_psi = Gauge(
+    'ml_prediction_psi',
+    'Population Stability Index of recent predictions vs the training reference',
+    ['model_version']
+)
+
+prediction_ks = Gauge(
+    'ml_prediction_ks',
+    'Kolmogorov-Smirnov distance of recent predictions vs the training reference',
+    ['model_version']
+)
+
 # Error metrics
 prediction_errors = Counter(
     'ml_prediction_errors_total',
@@ -64,53 +94,335 @@ prediction_errors = Counter(
 # Cache metrics
 cache_hits = Counter(
     'ml_cache_hits_total',
-    'Total number of cache hits'
+    'Total number of cache hits',
+    ['tier']
 )
 
 cache_misses = Counter(
     'ml_cache_misses_total',
-    'Total number of cache misses'
+    'Total number of cache misses',
+    ['tier']
+)
+
+cache_lookup_latency = Histogram(
+    'ml_cache_lookup_latency_seconds',
+    'Cache lookup latency in seconds',
+    ['tier'],
+    buckets=[0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05]
+)
+
+# Micro-batching metrics
+batch_size = Histogram(
+    'ml_batch_size',
+    'Number of requests coalesced into a single model call',
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128]
+)
+
+batch_queue_wait = Histogram(
+    'ml_batch_queue_wait_seconds',
+    'Time a request waits in the batching queue before inference',
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05]
+)
+
+batch_queue_depth = Gauge(
+    'ml_batch_queue_depth',
+    'Number of requests waiting in the batching queue'
+)
+
+# Inference executor metrics
+executor_queue_depth = Gauge(
+    'ml_executor_queue_depth',
+    'Inference jobs waiting for a free worker'
+)
+
+executor_active_workers = Gauge(
+    'ml_executor_active_workers',
+    'Inference workers currently scoring'
+)
+
+executor_rejections = Counter(
+    'ml_executor_rejections_total',
+    'Inference jobs rejected because the executor was saturated'
+)
+
+# Bulk scoring metrics
+bulk_rows_scored = Counter(
+    'ml_bulk_rows_scored_total',
+    'Rows scored through the bulk prediction endpoint',
+    ['model_version', 'format']
+)
+
+bulk_chunk_latency = Histogram(
+    'ml_bulk_chunk_latency_seconds',
+    'Time to parse and score one chunk of a bulk request',
+    ['format'],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+)
+
+# Model deployment metrics
+model_swaps = Counter(
+    'ml_model_swaps_total',
+    'Model swap attempts',
+    ['status']
+)
+
+model_warmup_latency = Histogram(
+    'ml_model_warmup_latency_seconds',
+    'Time to score the canary batch of a newly loaded model',
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+)
+
+shadow_predictions = Counter(
+    'ml_shadow_predictions_total',
+    'Shadow model predictions by agreement with the active model',
+    ['shadow_version', 'result']
+)
+
+shadow_latency = Histogram(
+    'ml_shadow_latency_seconds',
+    'Shadow model prediction latency in seconds',
+    ['shadow_version'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5]
+)
+
+# Model registry metrics
+registry_model_memory = Gauge(
+    'ml_registry_model_memory_bytes',
+    'Estimated memory footprint of each loaded model',
+    ['model_version']
+)
+
+registry_loads = Counter(
+    'ml_registry_loads_total',
+    'Models loaded on demand by the registry',
+    ['model_version']
+)
+
+registry_evictions = Counter(
+    'ml_registry_evictions_total',
+    'Models unloaded to stay within the registry memory budget',
+    ['model_version']
+)
+
+# Backend connection metrics (database, redis)
+backend_pool_connections = Gauge(
+    'ml_backend_pool_connections',
+    'Pooled backend connections by state (in_use, idle)',
+    ['backend', 'state']
+)
+
+backend_pool_max_connections = Gauge(
+    'ml_backend_pool_max_connections',
+    'Maximum connections a backend pool will open',
+    ['backend']
 )
 
+backend_circuit_state = Gauge(
+    'ml_backend_circuit_state',
+    'Circuit breaker state: 0 closed, 1 half open, 2 open',
+    ['backend']
+)
+
+backend_errors = Counter(
+    'ml_backend_errors_total',
+    'Failed backend calls',
+    ['backend']
+)
+
+backend_rejections = Counter(
+    'ml_backend_rejections_total',
+    'Backend calls skipped because the circuit was open',
+    ['backend']
+)
+
+# Prediction log writer metrics
+log_buffer_rows = Gauge(
+    'ml_log_buffer_rows',
+    'Prediction log rows waiting to be written'
+)
+
+log_rows_written = Counter(
+    'ml_log_rows_written_total',
+    'Prediction log rows written to the database'
+)
+
+log_rows_dropped = Counter(
+    'ml_log_rows_dropped_total',
+    'Prediction log rows discarded',
+    ['reason']
+)
+
+log_rows_spilled = Counter(
+    'ml_log_rows_spilled_total',
+    'Prediction log rows spilled to disk'
+)
+
+log_flush_latency = Histogram(
+    'ml_log_flush_latency_seconds',
+    'Time to bulk insert one batch of prediction logs',
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+)
+
+# Prediction log storage metrics
+log_partitions_expired = Counter(
+    'ml_log_partitions_expired_total',
+    'Daily prediction log partitions removed by retention'
+)
+
+log_rows_archived = Counter(
+    'ml_log_rows_archived_total',
+    'Prediction log rows offloaded to Parquet before removal'
+)
+
+log_maintenance_latency = Histogram(
+    'ml_log_maintenance_latency_seconds',
+    'Time for one partition/retention maintenance run',
+    buckets=[0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0]
+)
+
+
+def bind_drift_metrics(model_version: str, drift_monitor):
+    """
+    Point the drift gauges of a model version at its DriftMonitor
+    Values are computed when Prometheus scrapes, not on every prediction
+    """
+    prediction_mean.labels(model_version=model_version).set_function(lambda: drift_monitor.mean)
+    prediction_std.labels(model_version=model_version).set_function(lambda: drift_monitor.std)
+    for q in (0.5, 0.9, 0.99):
+        prediction_quantile.labels(model_version=model_version, quantile=str(q)).set_function(
+            lambda q=q: drift_monitor.quantile(q)
+        )
+    # NaN when no reference distribution is available
+    prediction_psi.labels(model_version=model_version).set_function(
+        lambda: _or_nan(drift_monitor.psi())
+    )
+    prediction_ks.labels(model_version=model_version).set_function(
+        lambda: _or_nan(drift_monitor.ks())
+    )
+
+
+def unbind_drift_metrics(model_version: str):
+    """
+    Remove the drift gauges of a model version that is no longer loaded
+    """
+    for gauge in (prediction_mean, prediction_std, prediction_psi, prediction_ks):
+        try:
+            gauge.remove(model_version)
+        except KeyError:
+            pass
+    for q in (0.5, 0.9, 0.99):
+        try:
+            prediction_quantile.remove(model_version, str(q))
+        except KeyError:
+            pass
+
+
+def bind_pool_metrics(backend: str, pool_stats):
+    """
+    Point the pool gauges of a backend at a function returning
+    (in_use, idle, max_connections); read when Prometheus scrapes
+    """
+    backend_pool_connections.labels(backend=backend, state="in_use").set_function(
+        lambda: pool_stats()[0]
+    )
+    backend_pool_connections.labels(backend=backend, state="idle").set_function(
+        lambda: pool_stats()[1]
+    )
+    backend_pool_max_connections.labels(backend=backend).set_function(lambda: pool_stats()[2])
+
+
+def _or_nan(value):
+    return float("nan") if value is None else value
+
 
 def metrics_endpoint():
     """
     FastAPI endpoint handler for Prometheus metrics
     Returns metrics in Prometheus format
+
+    Rendering evaluates every gauge callback (drift quantiles, PSI, ...), so
+    call it from a worker thread rather than on the event loop
     """
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
+# Stages of a /predict request, timed by the handler and the middleware
+REQUEST_STAGES = ("deserialize", "cache_lookup", "singleflight_wait", "inference", "serialize")
+
+_stage_observers = {stage: request_stage_latency.labels(stage=stage) for stage in REQUEST_STAGES}
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Record time spent in one request stage
+    """
+    _stage_observers[stage].observe(seconds)
+
+
+# Label for requests that matched no route (404s, scans for random paths)
+UNMATCHED_ROUTE = "<unmatched>"
+
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
 class MetricsMiddleware:
     """
-    Middleware to automatically track request metrics
+    ASGI middleware to automatically track request metrics
+
+    Requests are labelled by route template (e.g. /model/{version}) rather
+    than the raw path, so label cardinality is bounded by the number of
+    routes; paths that match no route share a single label. Labelled child
+    metrics are cached, so the per-request cost is a dict lookup, a counter
+    increment and a histogram observation.
+
+    The middleware stores the request start time as state.request_start,
+    and reads state.handler_end (set by handlers that time their stages) to
+    record the serialize stage when the response starts.
     """
     def __init__(self, app):
         self.app = app
+        self._children = {}
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["request_start"] = start_time
+        status = 500
 
         async def send_wrapper(message):
+            nonlocal status
             if message["type"] == "http.response.start":
-                # Track request count and latency
-                latency = time.time() - start_time
-                endpoint = scope["path"]
-                method = scope["method"]
                 status = message["status"]
+                handler_end = state.get("handler_end")
+                if handler_end is not None:
+                    observe_stage("serialize", time.perf_counter() - handler_end)
+            await send(message)
 
-                request_count.labels(
-                    endpoint=endpoint,
-                    method=method,
-                    status=status
-                ).inc()
-
-                request_latency.labels(endpoint=endpoint).observe(latency)
+        requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_progress.dec()
+            # Routing has filled in scope["route"] by now, if a route matched
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
 
-            await send(message)
+            count, latency = self._metrics(endpoint, method, status)
+            count.inc()
+            latency.observe(time.perf_counter() - start_time)
 
-        await self.app(scope, receive, send_wrapper)
+    def _metrics(self, endpoint: str, method: str, status: int):
+        key = (endpoint, method, status)
+        children = self._children.get(key)
+        if children is None:
+            children = (
+                request_count.labels(endpoint=endpoint, method=method, status=status),
+                request_latency.labels(endpoint=endpoint)
+            )
+            self._children[key] = children
+        return children
@@ -0,0 +1,294 @@
+"""
+Model registry for serving several model versions side by side
+Loads versions on demand under a memory budget and routes requests between them
+"""
+
+import os
+import random
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.model import MLModel, ModelManager, get_model_manager
+from app.monitoring import (
+    bind_drift_metrics,
+    unbind_drift_metrics,
+    registry_model_memory,
+    registry_loads,
+    registry_evictions
+)
+
+
+class UnknownModelVersionError(KeyError):
+    """
+    Raised when a request asks for a version the registry does not know
+    """
+
+
+class ModelRegistry:
+    """
+    Serves the active model plus any number of registered versions
+
+    The active model of the ModelManager is always available under its
+    version and is never evicted. Other versions are registered with a model
+    path and loaded on their first request, validated like a swap candidate.
+    Loaded versions are kept in LRU order; when their estimated footprint
+    (plus the active model's) exceeds memory_budget_bytes, the least recently
+    used ones are unloaded and reloaded on demand later.
+
+    Routing, in order of precedence:
+    - an explicitly requested version (X-Model-Version header)
+    - a weighted split across versions, sticky per routing key when one is
+      given (X-Routing-Key header) and random otherwise
+    - the active model
+    """
+
+    def __init__(
+        self,
+        manager: ModelManager,
+        model_paths: Optional[Dict[str, str]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        memory_budget_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            manager: ModelManager holding the active model
+            model_paths: Version -> model path for additionally served versions
+            weights: Version -> relative share of traffic without an explicit version
+            memory_budget_bytes: Cap on the estimated memory of loaded models
+                (None for no cap)
+        """
+        if memory_budget_bytes is not None and memory_budget_bytes <= 0:
+            raise ValueError("memory_budget_bytes must be positive")
+
+        self.manager = manager
+        self.model_paths = dict(model_paths or {})
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loaded: "OrderedDict[str, MLModel]" = OrderedDict()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self.set_weights(weights or {})
+        self._report()
+
+    def versions(self) -> List[str]:
+        """
+        Every version that can be routed to
+        """
+        active = self.manager.active.version
+        return [active] + sorted(v for v in self.model_paths if v != active)
+
+    def register(self, version: str, model_path: str):
+        """
+        Make a version available for routing (loaded on first use)
+        """
+        if self.model_paths.get(version) != model_path:
+            self.unload(version)
+        self.model_paths[version] = model_path
+
+    def set_weights(self, weights: Dict[str, float]):
+        """
+        Set the traffic split for requests that do not ask for a version
+        An empty mapping sends all of them to the active model
+        """
+        known = set(self.versions())
+        for version, weight in weights.items():
+            if version not in known:
+                raise UnknownModelVersionError(version)
+            if weight < 0:
+                raise ValueError(f"Weight for {version} must be non-negative")
+        total = float(sum(weights.values()))
+        if weights and total <= 0:
+            raise ValueError("Weights must sum to a positive value")
+
+        self.weights = dict(weights)
+        self._cumulative = []
+        cumulative = 0.0
+        for version, weight in weights.items():
+            cumulative += weight / total
+            self._cumulative.append((cumulative, version))
+
+    def route(self, requested: Optional[str] = None, routing_key: Optional[str] = None) -> str:
+        """
+        Pick the version that should score a request
+
+        Raises:
+            UnknownModelVersionError: If requested is not a known version
+        """
+        if requested:
+            if requested not in self.versions():
+                raise UnknownModelVersionError(requested)
+            return requested
+
+        if not self._cumulative:
+            return self.manager.active.version
+
+        point = _unit_interval(routing_key) if routing_key else random.random()
+        version = next((v for c, v in self._cumulative if point < c), self._cumulative[-1][1])
+        # A weighted version can disappear when a swap replaces the active model
+        return version if version in self.versions() else self.manager.active.version
+
+    async def get(self, version: str) -> MLModel:
+        """
+        Get a loaded model by version, loading it if needed
+        Concurrent requests for a cold version share one load
+
+        Raises:
+            UnknownModelVersionError: If the version is not registered
+            ModelValidationError: If the model fails its canary checks
+        """
+        active = self.manager.active
+        if version == active.version:
+            return active
+
+        model = self._loaded.get(version)
+        if model is None:
+            if version not in self.model_paths:
+                raise UnknownModelVersionError(version)
+
+            lock = self._load_locks.setdefault(version, asyncio.Lock())
+            async with lock:
+                model = self._loaded.get(version)
+                if model is None:
+                    model, _ = await self.manager.load_candidate(self.model_paths[version], version)
+                    registry_loads.labels(model_version=version).inc()
+                    self._loaded[version] = model
+                    bind_drift_metrics(version, model.drift)
+                    self._evict(keep=version)
+                    self._report()
+
+        if version in self._loaded:
+            self._loaded.move_to_end(version)
+        return model
+
+    async def resolve(self, requested: Optional[str] = None, routing_key: Optional[str] = None) -> MLModel:
+        """
+        Route a request and return the model that should score it
+        """
+        return await self.get(self.route(requested, routing_key))
+
+    def unload(self, version: str):
+        """
+        Drop a loaded version; in-flight requests keep their reference
+        """
+        if self._loaded.pop(version, None) is None:
+            return
+        if version != self.manager.active.version:
+            unbind_drift_metrics(version)
+        self._report()
+
+    def sync_active(self):
+        """
+        Call after a model swap: drops a duplicate copy of the new active
+        version and re-checks the budget against the new active model
+        """
+        self.unload(self.manager.active.version)
+        self._evict()
+        self._report()
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated memory of the active model and every loaded version
+        """
+        return self.manager.active.memory_bytes + sum(m.memory_bytes for m in self._loaded.values())
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Unload least recently used versions until within the memory budget
+        """
+        if self.memory_budget_bytes is None:
+            return
+
+        while self.memory_bytes() > self.memory_budget_bytes:
+            evictable = [v for v in self._loaded if v != keep]
+            if not evictable:
+                print(
+                    f"Warning: loaded models use {self.memory_bytes()} bytes, "
+                    f"over the {self.memory_budget_bytes} byte budget"
+                )
+                return
+            self.unload(evictable[0])
+            registry_evictions.labels(model_version=evictable[0]).inc()
+            print(f"Evicted model {evictable[0]} to stay within the memory budget")
+
+    def _report(self):
+        registry_model_memory.clear()
+        active = self.manager.active
+        registry_model_memory.labels(model_version=active.version).set(active.memory_bytes)
+        for version, model in self._loaded.items():
+            registry_model_memory.labels(model_version=version).set(model.memory_bytes)
+
+    def info(self) -> Dict:
+        active = self.manager.active
+        models = [{
+            "version": active.version,
+            "model_path": str(active.model_path),
+            "active": True,
+            "loaded": True,
+            "memory_bytes": active.memory_bytes
+        }]
+        for version in self.versions()[1:]:
+            model = self._loaded.get(version)
+            models.append({
+                "version": version,
+                "model_path": self.model_paths[version],
+                "active": False,
+                "loaded": model is not None,
+                "memory_bytes": model.memory_bytes if model is not None else None
+            })
+
+        return {
+            "memory_bytes": self.memory_bytes(),
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "weights": self.weights,
+            "models": models
+        }
+
+
+def _unit_interval(key: str) -> float:
+    """
+    Map a routing key to a stable point in [0, 1)
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """
+    Parse "a=1,b=2" style environment variables
+    """
+    mapping = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        key, sep, val = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {item!r}")
+        mapping[key.strip()] = val.strip()
+    return mapping
+
+
+# Global registry instance
+_registry_instance: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """
+    Get or create the global model registry
+    Configured by MODEL_REGISTRY ("version=path,..."), MODEL_ROUTING_WEIGHTS
+    ("version=weight,...") and MODEL_MEMORY_BUDGET_MB
+    """
+    global _registry_instance
+
+    if _registry_instance is None:
+        budget_mb = os.getenv("MODEL_MEMORY_BUDGET_MB")
+        _registry_instance = ModelRegistry(
+            get_model_manager(),
+            model_paths=parse_mapping(os.getenv("MODEL_REGISTRY", "")),
+            weights={
+                version: float(weight)
+                for version, weight in parse_mapping(os.getenv("MODEL_ROUTING_WEIGHTS", "")).items()
+            },
+            memory_budget_bytes=int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+        )
+
+    return _registry_instance
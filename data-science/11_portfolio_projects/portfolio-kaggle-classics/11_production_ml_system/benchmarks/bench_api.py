@@ -0,0 +1,307 @@
+"""
+Benchmark: end-to-end /predict load test
+
+Drives the full FastAPI app (cache, executor, micro-batching, log writer,
+metrics middleware) with a local synthetic model, fakeredis in place of
+Redis and SQLite in place of PostgreSQL, so runs are reproducible on a
+laptop or CI runner without any services.
+
+Sweeps concurrency, cache hit ratio and payload size (number of features)
+and reports throughput and p50/p95/p99 latency per scenario. Requests go
+through the ASGI app in-process (httpx ASGI transport) or over a real
+socket (uvicorn on localhost). Each feature count and transport runs in
+a fresh subprocess, since the app's singletons (model, executor, log
+writer) live for the whole process and are shut down with the app.
+
+Usage:
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --transport socket --concurrency 1 8 32 --hit-ratio 0 0.9
+    python benchmarks/bench_api.py --json current.json --baseline previous.json --max-regression 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+TRANSPORTS = ("inprocess", "socket")
+
+# Distinct payloads reused for cache hits
+HOT_PAYLOADS = 16
+
+# Fields identifying a scenario when comparing against a baseline
+SCENARIO_KEYS = ("transport", "features", "concurrency", "hit_ratio")
+
+
+def build_model(directory: Path, n_features: int) -> Path:
+    """
+    Train a small synthetic forest; scoring cost is realistic but bounded
+    """
+    rng = np.random.default_rng(0)
+    columns = [f"feature_{i}" for i in range(n_features)]
+    X = pd.DataFrame(rng.normal(size=(2000, n_features)), columns=columns)
+    y = (X.iloc[:, :3].sum(axis=1) > 0).astype(int)
+
+    model = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=0).fit(X, y)
+    path = directory / "model.pkl"
+    joblib.dump(model, path)
+    return path
+
+
+def make_payloads(n_features: int, n_requests: int, hit_ratio: float, seed: int = 0) -> List[dict]:
+    """
+    Request bodies where about hit_ratio of requests repeat a small hot set
+    (served from cache after their first occurrence) and the rest are unique
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"feature_{i}" for i in range(n_features)]
+    hot = rng.normal(size=(HOT_PAYLOADS, n_features))
+    payloads = []
+    for _ in range(n_requests):
+        row = hot[rng.integers(HOT_PAYLOADS)] if rng.random() < hit_ratio else rng.normal(size=n_features)
+        payloads.append({"features": dict(zip(names, row.tolist())), "use_cache": True})
+    return payloads
+
+
+async def run_load(client, payloads: List[dict], concurrency: int) -> Dict:
+    """
+    Closed-loop load: `concurrency` clients send requests back to back
+    """
+    latencies = []
+    statuses: Dict[int, int] = {}
+    cached = 0
+    pending = iter(payloads)
+
+    async def worker():
+        nonlocal cached
+        for payload in pending:
+            start = time.perf_counter()
+            response = await client.post("/predict", json=payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200 and response.json()["cached"]:
+                cached += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ok = statuses.get(200, 0)
+    return {
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "cache_hit_ratio": cached / ok if ok else 0.0,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(max(latencies)),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class SocketServer:
+    """
+    uvicorn serving the app on localhost from a background thread
+    """
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def run_scenarios(app, main_module, args, n_features: int, transport: str) -> List[Dict]:
+    """
+    Run every concurrency x hit-ratio scenario against one app instance
+    """
+    import httpx
+
+    async def sweep(client):
+        rows = []
+        for hit_ratio in args.hit_ratio:
+            for concurrency in args.concurrency:
+                # Every scenario starts cold so the hit ratio is controlled
+                main_module.prediction_cache.clear_local()
+                if main_module.prediction_cache.redis_client is not None:
+                    main_module.prediction_cache.redis_client.flushall()
+
+                await run_load(client, make_payloads(n_features, concurrency * 2, 0.0, seed=99), concurrency)
+                row = await run_load(client, make_payloads(n_features, args.requests, hit_ratio), concurrency)
+                row.update(
+                    transport=transport, features=n_features,
+                    concurrency=concurrency, hit_ratio=hit_ratio
+                )
+                rows.append(row)
+                print(
+                    f"{transport:<10} {n_features:>8} {concurrency:>5} {hit_ratio:>5.2f} "
+                    f"{row['cache_hit_ratio']:>6.2f} {row['throughput_rps']:>9.1f} "
+                    f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>6}",
+                    flush=True
+                )
+        return rows
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    if transport == "inprocess":
+        async with app.router.lifespan_context(app):
+            transport_ = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport_, base_url="http://bench") as client:
+                return await sweep(client)
+
+    with SocketServer(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            return await sweep(client)
+
+
+def run_child(args, n_features: int, transport: str) -> List[Dict]:
+    """
+    Child process: configure the app for one feature count and transport
+    and run all scenarios
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ.update(
+            MODEL_PATH=str(build_model(tmp, n_features)),
+            MODEL_VERSION="bench",
+            DATABASE_URL=f"sqlite:///{tmp / 'predictions.db'}",
+            # Nothing listens here: the Redis backend never connects and
+            # is replaced below
+            REDIS_URL="redis://127.0.0.1:1",
+            LOG_SPILL_PATH=str(tmp / "spill.jsonl"),
+            INFERENCE_EXECUTOR=args.executor,
+            BATCHING_ENABLED="true" if args.batching else "false",
+        )
+        from app import main as main_module
+
+        if args.redis == "fake":
+            import fakeredis
+
+            main_module.prediction_cache.redis_client = fakeredis.FakeRedis(decode_responses=True)
+        else:
+            main_module.prediction_cache.redis_client = None
+
+        rows = asyncio.run(run_scenarios(main_module.app, main_module, args, n_features, transport))
+        for row in rows:
+            row.update(executor=args.executor, batching=args.batching, redis=args.redis)
+        return rows
+
+
+def compare(results: List[Dict], baseline: List[Dict], max_regression: float) -> List[str]:
+    """
+    Scenarios whose throughput dropped or p99 rose by more than max_regression
+    """
+    previous = {tuple(row[k] for k in SCENARIO_KEYS): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(tuple(row[k] for k in SCENARIO_KEYS))
+        if old is None:
+            continue
+        name = ", ".join(f"{k}={row[k]}" for k in SCENARIO_KEYS)
+        if row["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{name}: throughput {old['throughput_rps']:.1f} -> {row['throughput_rps']:.1f} req/s"
+            )
+        if row["p99_ms"] > old["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p99 {old['p99_ms']:.2f} -> {row['p99_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--hit-ratio", type=float, nargs="+", default=[0.0, 0.8])
+    parser.add_argument("--features", type=int, nargs="+", default=[7, 100])
+    parser.add_argument("--transport", nargs="+", default=["inprocess"], choices=TRANSPORTS)
+    parser.add_argument("--executor", default="thread", choices=["inline", "thread", "process"])
+    parser.add_argument("--batching", action="store_true", help="Enable micro-batching")
+    parser.add_argument("--redis", default="fake", choices=["fake", "none"], help="fakeredis or local tier only")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, help="Previous --json report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    # Internal: run one feature count and transport, write its rows to this file
+    parser.add_argument("--child-output", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_output:
+        rows = run_child(args, args.features[0], args.transport[0])
+        args.child_output.write_text(json.dumps(rows))
+        return
+
+    print(
+        f"{'transport':<10} {'features':>8} {'conc':>5} {'hit':>5} {'hit%':>6} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}",
+        flush=True
+    )
+    results = []
+    for n_features in args.features:
+        for transport in args.transport:
+            with tempfile.NamedTemporaryFile(suffix=".json") as out:
+                # The last --features/--transport win, so the child runs just this pair
+                command = [
+                    sys.executable, __file__, *sys.argv[1:],
+                    "--features", str(n_features), "--transport", transport,
+                    "--child-output", out.name
+                ]
+                subprocess.run(command, check=True, cwd=ROOT, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+                results += json.loads(Path(out.name).read_text())
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: inference executor concurrency scaling
+
+Scores a synthetic random forest with each executor mode at increasing
+concurrency and reports throughput and event-loop responsiveness.
+
+Usage:
+    python benchmarks/bench_executor.py
+    python benchmarks/bench_executor.py --requests 400 --concurrency 1 4 16 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.executor import InferenceExecutor, EXECUTOR_MODES
+from app.model import MLModel
+
+N_FEATURES = 7
+
+
+def build_model(directory: Path) -> Path:
+    """
+    Train a CPU-heavy synthetic model so scoring time dominates overhead
+    """
+    rng = np.random.default_rng(0)
+    columns = [f"feature_{i}" for i in range(N_FEATURES)]
+    X = pd.DataFrame(rng.normal(size=(2000, N_FEATURES)), columns=columns)
+    y = (X.sum(axis=1) > 0).astype(int)
+
+    model = RandomForestClassifier(n_estimators=200, max_depth=12, random_state=0).fit(X, y)
+    path = directory / "model.pkl"
+    joblib.dump(model, path)
+    return path
+
+
+async def run_load(
+    executor: InferenceExecutor,
+    model: MLModel,
+    n_requests: int,
+    concurrency: int
+) -> dict:
+    """
+    Send n_requests through the executor with a fixed number of concurrent clients
+    """
+    rng = np.random.default_rng(1)
+    payloads = [
+        {f"feature_{i}": float(v) for i, v in enumerate(row)}
+        for row in rng.normal(size=(n_requests, N_FEATURES))
+    ]
+    latencies = []
+    loop_lag = []
+    done = asyncio.Event()
+
+    async def probe_loop():
+        # How late does a 1ms sleep wake up? Measures event loop blocking
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            loop_lag.append((time.perf_counter() - start - 0.001) * 1000)
+
+    async def client(chunk):
+        for features in chunk:
+            start = time.perf_counter()
+            await executor.predict(model, features)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    chunks = [payloads[i::concurrency] for i in range(concurrency)]
+    probe = asyncio.ensure_future(probe_loop())
+    start = time.perf_counter()
+    await asyncio.gather(*(client(chunk) for chunk in chunks))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe
+
+    return {
+        "throughput_rps": n_requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_loop_lag_ms": float(max(loop_lag)) if loop_lag else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=list(EXECUTOR_MODES), choices=EXECUTOR_MODES)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model = MLModel(str(build_model(Path(tmp))), "bench")
+
+        print(f"{'mode':<8} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'loop lag ms':>12}")
+        for mode in args.modes:
+            executor = InferenceExecutor(
+                mode=mode, max_workers=args.workers, max_queue=max(args.concurrency), preload=model
+            )
+            try:
+                # Warm up workers (process mode loads the model in each one)
+                asyncio.run(run_load(executor, model, args.workers * 2, args.workers))
+                for concurrency in args.concurrency:
+                    row = asyncio.run(run_load(executor, model, args.requests, concurrency))
+                    row.update(mode=mode, concurrency=concurrency, workers=args.workers)
+                    results.append(row)
+                    print(
+                        f"{mode:<8} {concurrency:>5} {row['throughput_rps']:>9.1f} "
+                        f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_loop_lag_ms']:>12.2f}"
+                    )
+            finally:
+                executor.shutdown()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: per-request feature conversion overhead
+
+Compares the previous dict -> array conversion (a list comprehension over
+feature names plus np.array on every call) with the compiled FeatureLayout,
+for single requests and micro-batch sized batches. Also times a full
+MLModel.predict so the conversion can be seen relative to scoring.
+
+Usage:
+    python benchmarks/bench_features.py
+    python benchmarks/bench_features.py --features 7 50 --batch-sizes 1 32 --json results.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.features import FeatureLayout
+from app.model import MLModel
+
+
+def legacy_to_array(feature_names, features_batch):
+    """
+    Conversion used by MLModel before FeatureLayout
+    """
+    return np.array([[features.get(name, 0.0) for name in feature_names] for features in features_batch])
+
+
+def time_call(fn, min_seconds: float = 0.2) -> float:
+    """
+    Best-of-5 time per call in microseconds
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_seconds / 0.2))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def build_model(directory: Path, n_features: int) -> MLModel:
+    rng = np.random.default_rng(0)
+    columns = [f"feature_{i}" for i in range(n_features)]
+    X = pd.DataFrame(rng.normal(size=(500, n_features)), columns=columns)
+    y = (X.sum(axis=1) > 0).astype(int)
+    path = directory / f"model_{n_features}.pkl"
+    joblib.dump(LogisticRegression().fit(X, y), path)
+    return MLModel(str(path), "bench", drift_window=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, nargs="+", default=[7, 50, 200])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'features':>8} {'batch':>6} {'legacy us':>10} {'layout us':>10} {'speedup':>8}")
+    for n_features in args.features:
+        names = [f"feature_{i}" for i in range(n_features)]
+        layout = FeatureLayout(names)
+        rng = np.random.default_rng(1)
+
+        for batch in args.batch_sizes:
+            features_batch = [
+                dict(zip(names, row.tolist())) for row in rng.normal(size=(batch, n_features))
+            ]
+            np.testing.assert_array_equal(
+                legacy_to_array(names, features_batch), layout.to_array(features_batch)
+            )
+
+            legacy_us = time_call(lambda: legacy_to_array(names, features_batch))
+            layout_us = time_call(lambda: layout.to_array(features_batch))
+            row = {
+                "features": n_features,
+                "batch_size": batch,
+                "legacy_us": legacy_us,
+                "layout_us": layout_us,
+                "speedup": legacy_us / layout_us,
+            }
+            results.append(row)
+            print(f"{n_features:>8} {batch:>6} {legacy_us:>10.2f} {layout_us:>10.2f} {row['speedup']:>7.1f}x")
+
+    # End-to-end single prediction for scale
+    with tempfile.TemporaryDirectory() as tmp:
+        model = build_model(Path(tmp), args.features[0])
+        features = {name: 0.5 for name in model.layout.names}
+        predict_us = time_call(lambda: model.predict(features))
+        print(f"\nMLModel.predict ({args.features[0]} features, LogisticRegression): {predict_us:.1f} us")
+        results.append({"features": args.features[0], "predict_us": predict_us})
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
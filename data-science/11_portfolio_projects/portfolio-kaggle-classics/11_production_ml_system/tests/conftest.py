@@ -0,0 +1,45 @@
+"""
+Shared fixtures for the Production ML System tests
+"""
+
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+# Add parent directory to path to import app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+FEATURE_NAMES = [
+    "tenure_months",
+    "monthly_charges",
+    "total_charges",
+    "contract_length",
+    "num_products",
+    "support_tickets",
+    "satisfaction_score",
+]
+
+
+@pytest.fixture(scope="session")
+def model_path(tmp_path_factory):
+    """Small churn-style classifier saved with joblib, like the training notebook"""
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame(rng.normal(size=(200, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+    y = (X["satisfaction_score"] + 0.5 * X["support_tickets"] > 0).astype(int)
+
+    model = LogisticRegression().fit(X, y)
+
+    path = tmp_path_factory.mktemp("models") / "model.pkl"
+    joblib.dump(model, path)
+    return path
+
+
+@pytest.fixture
+def sample_features():
+    """One request worth of features"""
+    return {name: float(i) / 10 for i, name in enumerate(FEATURE_NAMES)}
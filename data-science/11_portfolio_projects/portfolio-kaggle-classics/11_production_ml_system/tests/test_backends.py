@@ -0,0 +1,247 @@
+"""
+Unit tests for the managed database and Redis backends
+Use SQLite and a Redis URL nobody listens on, so no services are needed
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import redis
+
+from app.backends import CircuitBreaker, CircuitOpenError, DatabaseBackend, RedisBackend
+from app.cache import PredictionCache
+from app.database import make_engine
+from app.log_writer import PredictionLogWriter
+
+UNREACHABLE_REDIS = "redis://127.0.0.1:1"
+
+
+def failing():
+    raise ConnectionError("down")
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker"""
+
+    def test_opens_after_threshold(self):
+        """Consecutive failures should open the circuit and reject calls"""
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(failing)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "never called")
+
+    def test_success_resets_failure_count(self):
+        """Failures must be consecutive to open the circuit"""
+        breaker = CircuitBreaker("test", failure_threshold=2)
+
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+        breaker.call(lambda: None)
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_retry(self):
+        """After reset_timeout a success closes the circuit and a failure reopens it"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+
+        time.sleep(0.02)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.02)
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_one_trial_call(self):
+        """While half open, concurrent callers fail fast until the trial call ends"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+        time.sleep(0.02)
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_trial():
+            started.set()
+            release.wait(5)
+            return "ok"
+
+        trial = threading.Thread(target=breaker.call, args=(slow_trial,))
+        trial.start()
+        assert started.wait(5)
+
+        assert not breaker.allow()
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "never called")
+
+        release.set()
+        trial.join()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.call(lambda: "ok") == "ok"
+
+    def test_half_open_trial_released_on_other_errors(self):
+        """A trial call failing for another reason should not block later trials"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01,
+                                 failure_exceptions=(ConnectionError,))
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+        time.sleep(0.02)
+
+        with pytest.raises(ValueError):
+            breaker.call(lambda: int("x"))
+        assert breaker.call(lambda: "ok") == "ok"
+
+    def test_ignores_other_exceptions(self):
+        """Errors outside failure_exceptions should not open the circuit"""
+        breaker = CircuitBreaker("test", failure_threshold=1, failure_exceptions=(ConnectionError,))
+
+        with pytest.raises(ValueError):
+            breaker.call(lambda: int("x"))
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestRedisBackend:
+    """Tests for RedisBackend against an unreachable server"""
+
+    def test_construction_does_not_connect(self):
+        """Creating the backend should be instant and open no connection"""
+        start = time.perf_counter()
+        backend = RedisBackend(UNREACHABLE_REDIS, max_connections=4)
+
+        assert time.perf_counter() - start < 0.1
+        assert backend.pool_stats() == (0, 0, 4)
+
+    def test_failures_open_circuit(self):
+        """Connection errors should open the circuit, after which calls fail fast"""
+        backend = RedisBackend(
+            UNREACHABLE_REDIS,
+            breaker=CircuitBreaker(
+                "redis", failure_threshold=2, reset_timeout=60,
+                failure_exceptions=(redis.ConnectionError, redis.TimeoutError)
+            )
+        )
+
+        for _ in range(2):
+            with pytest.raises(redis.ConnectionError):
+                backend.get("key")
+
+        assert not backend.available
+        with pytest.raises(CircuitOpenError):
+            backend.get("key")
+        assert backend.ping() is False
+
+    def test_cache_skips_unavailable_backend(self):
+        """The prediction cache should not call Redis while its circuit is open"""
+        backend = RedisBackend(
+            UNREACHABLE_REDIS, breaker=CircuitBreaker("redis", failure_threshold=1, reset_timeout=60)
+        )
+        backend.breaker.record_failure()
+        cache = PredictionCache(backend)
+
+        async def run():
+            await cache.set({"x": 1.0}, "v1", {"prediction": 1.0})
+            return await cache.get({"x": 1.0}, "v1"), await cache.get({"x": 2.0}, "v1")
+
+        hit, miss = asyncio.run(run())
+        assert hit == ({"prediction": 1.0}, "local")
+        assert miss == (None, None)
+
+    def test_start_is_non_blocking(self):
+        """start() should return before the first connection attempt completes"""
+        backend = RedisBackend(UNREACHABLE_REDIS, reconnect_interval=0.01)
+
+        async def run():
+            await backend.start()
+            started = backend.connected
+            await asyncio.sleep(0.1)
+            await backend.stop()
+            return started
+
+        assert asyncio.run(run()) is False
+        assert backend.connected is False
+
+
+class TestDatabaseBackend:
+    """Tests for DatabaseBackend (SQLite mode)"""
+
+    def test_connect_runs_hooks(self, tmp_path):
+        """Hooks should run once the database is reachable"""
+        calls = []
+        backend = DatabaseBackend(
+            make_engine(f"sqlite:///{tmp_path / 'predictions.db'}"),
+            on_connect=[lambda: calls.append("connected")]
+        )
+
+        async def run():
+            await backend.start()
+            for _ in range(100):
+                if backend.connected:
+                    break
+                await asyncio.sleep(0.01)
+            await backend.stop()
+
+        asyncio.run(run())
+        assert calls == ["connected"]
+        assert backend.ping() is True
+
+    def test_hooks_run_with_circuit_closed(self, tmp_path):
+        """Hooks that write through the breaker must not be rejected after an outage"""
+        breaker = CircuitBreaker("database", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        results = []
+        backend = DatabaseBackend(
+            make_engine(f"sqlite:///{tmp_path / 'predictions.db'}"),
+            breaker=breaker,
+            on_connect=[lambda: results.append(breaker.call(lambda: "written"))]
+        )
+
+        backend._probe()
+
+        assert results == ["written"]
+        assert backend.connected is True
+
+    def test_unreachable_database(self, tmp_path):
+        """A database that cannot be opened should leave the backend disconnected"""
+        backend = DatabaseBackend(
+            make_engine(f"sqlite:///{tmp_path / 'missing' / 'predictions.db'}"),
+            reconnect_interval=0.01
+        )
+
+        async def run():
+            await backend.start()
+            await asyncio.sleep(0.1)
+            await backend.stop()
+
+        asyncio.run(run())
+        assert backend.connected is False
+        assert backend.breaker.state == CircuitBreaker.OPEN
+        assert backend.ping() is False
+
+    def test_log_writer_spills_while_circuit_open(self, tmp_path):
+        """Buffered logs should be spilled without attempting an insert"""
+        engine = make_engine(f"sqlite:///{tmp_path / 'predictions.db'}")
+        breaker = CircuitBreaker("database", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        spill = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(engine, batch_size=2, spill_path=str(spill), breaker=breaker)
+
+        writer._write([{"request_id": "a", "prediction": 1.0}, {"request_id": "b", "prediction": 0.0}])
+
+        lines = spill.read_text().splitlines()
+        assert [json.loads(line)["request_id"] for line in lines] == ["a", "b"]
@@ -0,0 +1,139 @@
+"""
+Unit tests for the micro-batching request coalescer
+"""
+
+import asyncio
+
+import pytest
+
+from app.model import MLModel, MicroBatcher
+
+
+@pytest.fixture
+def model(model_path):
+    return MLModel(str(model_path), "v-test")
+
+
+def make_features(i):
+    return {
+        "tenure_months": i,
+        "monthly_charges": 50.0 + i,
+        "total_charges": 100.0 * i,
+        "contract_length": 12,
+        "num_products": i % 4,
+        "support_tickets": i % 3 - 1,
+        "satisfaction_score": (i % 5) - 2.0,
+    }
+
+
+class TestPredictBatch:
+    """Tests for MLModel.predict_batch"""
+
+    def test_matches_single_predictions(self, model):
+        """Vectorized results should equal per-row predict results"""
+        batch = [make_features(i) for i in range(10)]
+        predictions, probabilities, _ = model.predict_batch(batch)
+
+        for features, prediction, probability in zip(batch, predictions, probabilities):
+            single_prediction, single_probability, _ = model.predict(features)
+            assert prediction == single_prediction
+            assert probability == pytest.approx(single_probability)
+
+    def test_tracks_predictions_for_drift(self, model):
+        """Every row of the batch should count towards drift metrics"""
+        model.predict_batch([make_features(i) for i in range(5)])
+        assert model.get_drift_metrics()["count"] == 5
+
+
+class TestMicroBatcher:
+    """Tests for MicroBatcher"""
+
+    def test_rejects_invalid_config(self, model):
+        """Batch size and wait window should be validated"""
+        with pytest.raises(ValueError):
+            MicroBatcher(max_batch_size=0)
+        with pytest.raises(ValueError):
+            MicroBatcher(max_wait_ms=-1)
+
+    def test_concurrent_requests_are_coalesced(self, model):
+        """Concurrent requests should share model calls and get their own rows"""
+        calls = []
+        original = model.predict_batch
+
+        def counting_predict_batch(features_batch):
+            calls.append(len(features_batch))
+            return original(features_batch)
+
+        model.predict_batch = counting_predict_batch
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=50)
+        batch = [make_features(i) for i in range(20)]
+
+        async def run():
+            results = await asyncio.gather(*(batcher.predict(model, f) for f in batch))
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+
+        assert sum(calls) == 20
+        assert max(calls) <= 8
+        assert len(calls) < 20
+
+        expected, _, _ = original(batch)
+        assert [prediction for prediction, _, _ in results] == expected
+
+    def test_single_request_is_not_held_past_max_wait(self, model, sample_features):
+        """A lone request should be released once the wait window expires"""
+        batcher = MicroBatcher(max_batch_size=32, max_wait_ms=1)
+
+        async def run():
+            result = await asyncio.wait_for(batcher.predict(model, sample_features), timeout=1)
+            await batcher.stop()
+            return result
+
+        prediction, probability, latency_ms = asyncio.run(run())
+        assert prediction in (0.0, 1.0)
+        assert 0.0 <= probability <= 1.0
+        assert latency_ms >= 0
+
+    def test_model_errors_propagate_to_callers(self, model, sample_features):
+        """A failing batch should raise in every waiting request"""
+        def failing_predict_batch(features_batch):
+            raise ValueError("bad batch")
+
+        model.predict_batch = failing_predict_batch
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=5)
+
+        async def run():
+            results = await asyncio.gather(
+                batcher.predict(model, sample_features),
+                batcher.predict(model, sample_features),
+                return_exceptions=True
+            )
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_requests_for_different_models_are_scored_separately(self, model, model_path):
+        """Requests queued for two models (e.g. around a swap) must not be mixed"""
+        other = MLModel(str(model_path), "v-other")
+        calls = []
+        for m in (model, other):
+            original = m.predict_batch
+            m.predict_batch = (
+                lambda features_batch, m=m, original=original:
+                calls.append((m.version, len(features_batch))) or original(features_batch)
+            )
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+
+        async def run():
+            await asyncio.gather(
+                *(batcher.predict(model, make_features(i)) for i in range(3)),
+                *(batcher.predict(other, make_features(i)) for i in range(2))
+            )
+            await batcher.stop()
+
+        asyncio.run(run())
+        assert sorted(calls) == [("v-other", 2), ("v-test", 3)]
@@ -0,0 +1,141 @@
+"""
+Unit tests for columnar bulk scoring
+"""
+
+import asyncio
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bulk import (
+    BulkFormatError,
+    BulkReader,
+    BulkSchemaError,
+    column_index,
+    open_reader,
+    prepare,
+    stream_predictions
+)
+from app.executor import InferenceExecutor
+from app.model import MLModel
+
+from tests.conftest import FEATURE_NAMES
+
+
+@pytest.fixture
+def model(model_path):
+    return MLModel(str(model_path), "v-test")
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(rng.normal(size=(250, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+
+
+async def body_stream(data: bytes, piece: int = 97):
+    """Request body delivered in small, unaligned pieces"""
+    for i in range(0, len(data), piece):
+        yield data[i:i + piece]
+
+
+def score(model, content_type, data, chunk_rows=64, columns=None):
+    """Run a payload through the bulk pipeline and parse the CSV result"""
+    async def run():
+        reader = open_reader(content_type, body_stream(data), chunk_rows, columns)
+        index = await prepare(reader, model)
+        parts = [part async for part in stream_predictions(
+            reader, model, index, InferenceExecutor(mode="inline")
+        )]
+        return pd.read_csv(io.BytesIO(b"".join(parts)))
+
+    return asyncio.run(run())
+
+
+class TestColumnIndex:
+    """Tests for schema validation"""
+
+    def test_model_order_needs_no_reordering(self):
+        """Columns already in model order should not be copied"""
+        assert column_index(FEATURE_NAMES, FEATURE_NAMES) is None
+
+    def test_reordered_columns(self):
+        """Payload columns in any order map back to model order"""
+        index = column_index(FEATURE_NAMES[::-1], FEATURE_NAMES)
+        assert [FEATURE_NAMES[::-1][i] for i in index] == FEATURE_NAMES
+
+    @pytest.mark.parametrize("columns", [
+        FEATURE_NAMES[:-1],
+        FEATURE_NAMES + ["unexpected"],
+        FEATURE_NAMES + FEATURE_NAMES[:1]
+    ])
+    def test_rejects_schema_mismatch(self, columns):
+        """Missing, unexpected and duplicated columns are errors"""
+        with pytest.raises(BulkSchemaError):
+            column_index(columns, FEATURE_NAMES)
+
+
+class TestBulkScoring:
+    """Tests for the payload readers and streamed results"""
+
+    def test_csv_matches_model(self, model, frame):
+        """CSV payloads with reordered columns are scored in input order"""
+        data = frame[FEATURE_NAMES[::-1]].to_csv(index=False).encode()
+        result = score(model, "text/csv; charset=utf-8", data)
+
+        assert len(result) == len(frame)
+        np.testing.assert_allclose(result["probability"], model.model.predict_proba(frame)[:, 1])
+
+    @pytest.mark.parametrize("order", ["C", "F"])
+    def test_npy_matches_model(self, model, frame, order):
+        """C- and Fortran-ordered arrays give the same results"""
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(frame.to_numpy(), order=order))
+        result = score(model, "application/x-npy", buffer.getvalue())
+
+        np.testing.assert_allclose(result["probability"], model.model.predict_proba(frame)[:, 1])
+
+    def test_arrow_matches_model(self, model, frame):
+        """Arrow record batches are scored one at a time"""
+        pa = pytest.importorskip("pyarrow")
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=100)
+
+        result = score(model, "application/vnd.apache.arrow.stream", sink.getvalue().to_pybytes())
+        np.testing.assert_allclose(result["probability"], model.model.predict_proba(frame)[:, 1])
+
+    def test_bulk_rows_do_not_count_for_drift(self, model, frame):
+        """Rescoring jobs are not live traffic"""
+        score(model, "text/csv", frame.to_csv(index=False).encode())
+        assert model.get_drift_metrics()["count"] == 0
+
+    def test_unsupported_content_type(self, model):
+        """Only CSV, .npy and Arrow bodies are accepted"""
+        with pytest.raises(BulkFormatError):
+            open_reader("application/json", body_stream(b"{}"))
+
+    def test_reader_must_implement_chunks(self):
+        """A reader missing an override fails when created, not mid-stream"""
+        class HeaderOnlyReader(BulkReader):
+            async def read_header(self):
+                return []
+
+        with pytest.raises(TypeError):
+            HeaderOnlyReader(None, 100)
+
+    def test_npy_column_count_checked(self, model, frame):
+        """A .npy array must have one column per feature"""
+        buffer = io.BytesIO()
+        np.save(buffer, frame.to_numpy()[:, :3])
+        with pytest.raises(BulkSchemaError):
+            score(model, "application/x-npy", buffer.getvalue())
+
+    def test_missing_values_abort_stream(self, model, frame):
+        """Blank cells should fail rather than be scored as zeros"""
+        data = frame.to_csv(index=False).encode() + b",,,,,,\n"
+        with pytest.raises(BulkSchemaError):
+            score(model, "text/csv", data)
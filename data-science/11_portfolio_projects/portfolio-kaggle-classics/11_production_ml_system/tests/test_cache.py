@@ -0,0 +1,156 @@
+"""
+Unit tests for the two-tier prediction cache
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.cache import LocalCache, PredictionCache, local_cache_key, redis_cache_key
+from app.monitoring import cache_hits
+
+
+class FakeRedis:
+    """Minimal dict-backed stand-in for the redis client methods the cache uses"""
+
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def hit_count(tier):
+    return cache_hits.labels(tier=tier)._value.get()
+
+
+class TestCacheKeys:
+    """Tests for the cache key functions"""
+
+    def test_keys_ignore_feature_order(self):
+        """The same features in a different order should map to the same key"""
+        a = {"x": 1.0, "y": 2.0}
+        b = {"y": 2.0, "x": 1.0}
+        assert local_cache_key(a, "v1") == local_cache_key(b, "v1")
+        assert redis_cache_key(a, "v1") == redis_cache_key(b, "v1")
+
+    def test_keys_depend_on_namespace_and_values(self):
+        """Different model namespaces or values must not collide"""
+        features = {"x": 1.0, "y": 2.0}
+        assert redis_cache_key(features, "v1") != redis_cache_key(features, "v2")
+        assert redis_cache_key(features, "v1") != redis_cache_key({"x": 1.0, "y": 2.5}, "v1")
+        assert redis_cache_key(features, "v1").startswith("prediction:v1:")
+
+
+class TestLocalCache:
+    """Tests for the in-process LRU/TTL tier"""
+
+    def test_evicts_least_recently_used(self):
+        """The oldest untouched entry should be evicted first"""
+        cache = LocalCache(max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        """Entries older than the TTL should not be returned"""
+        cache = LocalCache(ttl_seconds=0.01)
+        cache.set("a", {"v": 1})
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+
+class TestPredictionCache:
+    """Tests for PredictionCache"""
+
+    def test_redis_hit_is_promoted_to_local_tier(self):
+        """A Redis hit should be served locally afterwards"""
+        redis_client = FakeRedis()
+        features = {"x": 1.0}
+        writer = PredictionCache(redis_client)
+        reader = PredictionCache(redis_client)
+
+        async def run():
+            await writer.set(features, "v1", {"prediction": 1.0})
+            first = await reader.get(features, "v1")
+            second = await reader.get(features, "v1")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == ({"prediction": 1.0}, "redis")
+        assert second == ({"prediction": 1.0}, "local")
+        assert redis_client.gets == 1
+
+    def test_namespace_change_invalidates(self):
+        """Values cached for one model version must not be served for another"""
+        cache = PredictionCache(FakeRedis())
+
+        async def run():
+            await cache.set({"x": 1.0}, "v1", {"prediction": 1.0})
+            return await cache.get({"x": 1.0}, "v2")
+
+        assert asyncio.run(run()) == (None, None)
+
+    def test_works_without_redis(self):
+        """Without Redis the local tier still caches"""
+        cache = PredictionCache(None)
+        local_hits = hit_count("local")
+
+        async def run():
+            await cache.set({"x": 1.0}, "v1", {"prediction": 0.0})
+            return await cache.get({"x": 1.0}, "v1")
+
+        assert asyncio.run(run()) == ({"prediction": 0.0}, "local")
+        assert hit_count("local") == local_hits + 1
+
+    @pytest.mark.parametrize("singleflight, expected_calls", [(True, 1), (False, 5)])
+    def test_singleflight_coalesces_concurrent_misses(self, singleflight, expected_calls):
+        """Concurrent identical misses should compute once when singleflight is on"""
+        cache = PredictionCache(None, singleflight=singleflight)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"prediction": 1.0}
+
+        async def run():
+            return await asyncio.gather(
+                *(cache.get_or_compute({"x": 1.0}, "v1", compute) for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+        assert len(calls) == expected_calls
+        assert all(value == {"prediction": 1.0} for value, _ in results)
+        if singleflight:
+            assert sorted(str(tier) for _, tier in results) == ["None"] + ["singleflight"] * 4
+
+    def test_singleflight_propagates_errors(self):
+        """Waiters should see the leader's error and nothing should be cached"""
+        cache = PredictionCache(None)
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("model failed")
+
+        async def run():
+            results = await asyncio.gather(
+                *(cache.get_or_compute({"x": 1.0}, "v1", compute) for _ in range(3)),
+                return_exceptions=True
+            )
+            return results, await cache.get({"x": 1.0}, "v1")
+
+        results, cached = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert cached == (None, None)
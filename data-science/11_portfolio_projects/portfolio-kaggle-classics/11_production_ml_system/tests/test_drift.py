@@ -0,0 +1,107 @@
+"""
+Unit tests for streaming drift statistics
+"""
+
+import numpy as np
+import pytest
+
+from app.drift import DriftMonitor, ReferenceDistribution, reference_path_for
+from app.model import MLModel
+
+
+class TestDriftMonitor:
+    """Tests for DriftMonitor"""
+
+    def test_sliding_mean_and_std_match_numpy(self):
+        """Windowed Welford stats should equal a full recomputation over the window"""
+        values = np.random.default_rng(0).normal(3.0, 2.0, size=5000)
+        monitor = DriftMonitor(window_size=1000)
+        monitor.extend(values.tolist())
+
+        window = values[-1000:]
+        assert monitor.count == 1000
+        assert monitor.mean == pytest.approx(np.mean(window), rel=1e-9)
+        assert monitor.std == pytest.approx(np.std(window), rel=1e-9)
+
+    def test_empty_window(self):
+        """An empty monitor should report zeros and no drift scores"""
+        metrics = DriftMonitor(window_size=10).metrics()
+        assert metrics["mean"] == 0.0
+        assert metrics["std"] == 0.0
+        assert metrics["count"] == 0
+        assert metrics["psi"] is None
+
+    def test_quantiles_are_approximately_right(self):
+        """Binned quantiles should land within one bin of the exact quantile"""
+        values = np.random.default_rng(1).uniform(0, 1, size=10000)
+        monitor = DriftMonitor(window_size=10000)
+        monitor.extend(values.tolist())
+
+        for q in (0.5, 0.9):
+            assert monitor.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.1)
+
+    def test_evicted_values_leave_histogram(self):
+        """Only predictions inside the window should count towards quantiles"""
+        monitor = DriftMonitor(window_size=100)
+        monitor.extend([0.05] * 100)
+        monitor.extend([0.95] * 100)
+        assert monitor.quantile(0.01) >= 0.9
+
+    def test_psi_and_ks_detect_shift(self):
+        """Drift scores should be near zero without shift and large with shift"""
+        rng = np.random.default_rng(2)
+        reference = ReferenceDistribution.from_values(rng.normal(0, 1, size=5000))
+
+        stable = DriftMonitor(window_size=5000, reference=reference)
+        stable.extend(rng.normal(0, 1, size=5000).tolist())
+        shifted = DriftMonitor(window_size=5000, reference=reference)
+        shifted.extend(rng.normal(1, 1, size=5000).tolist())
+
+        assert stable.psi() < 0.05
+        assert stable.ks() < 0.05
+        assert shifted.psi() > 0.25
+        assert shifted.ks() > 0.3
+
+    def test_set_reference_rebins_window(self):
+        """Changing the reference should keep the window contents"""
+        monitor = DriftMonitor(window_size=100)
+        monitor.extend([0.2, 0.4, 0.6])
+        monitor.set_reference(ReferenceDistribution([0.5], [1, 1]))
+
+        assert monitor.count == 3
+        assert monitor.mean == pytest.approx(0.4)
+        assert monitor.ks() == pytest.approx(1 / 6)
+
+
+class TestReferenceDistribution:
+    """Tests for ReferenceDistribution"""
+
+    def test_rejects_mismatched_bins(self):
+        """Proportions must cover the open-ended outer bins"""
+        with pytest.raises(ValueError):
+            ReferenceDistribution([0.5], [1.0])
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """A saved reference should load back unchanged"""
+        reference = ReferenceDistribution.from_values([0, 0, 1, 1, 1])
+        path = tmp_path / "reference.json"
+        reference.save(str(path))
+
+        loaded = ReferenceDistribution.load(str(path))
+        assert loaded.bin_edges == reference.bin_edges
+        assert loaded.proportions == pytest.approx(reference.proportions)
+
+    def test_model_loads_reference_saved_next_to_it(self, model_path, sample_features):
+        """MLModel should pick up models/<name>.reference.json automatically"""
+        path = reference_path_for(model_path)
+        ReferenceDistribution.from_values([0, 1, 1, 0]).save(str(path))
+        try:
+            model = MLModel(str(model_path), "v-drift")
+            model.predict(sample_features)
+            metrics = model.get_drift_metrics()
+        finally:
+            path.unlink()
+
+        assert metrics["count"] == 1
+        assert metrics["psi"] is not None
+        assert metrics["ks"] is not None
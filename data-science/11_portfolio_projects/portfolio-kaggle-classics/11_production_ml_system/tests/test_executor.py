@@ -0,0 +1,123 @@
+"""
+Unit tests for the off-event-loop inference executor
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.executor import InferenceExecutor, ExecutorSaturatedError
+from app.model import MLModel
+
+
+@pytest.fixture
+def model(model_path):
+    return MLModel(str(model_path), "v-test")
+
+
+class TestInferenceExecutor:
+    """Tests for InferenceExecutor"""
+
+    def test_rejects_unknown_mode(self, model):
+        """Only inline, thread and process modes are supported"""
+        with pytest.raises(ValueError):
+            InferenceExecutor(mode="gpu")
+
+    @pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+    def test_modes_agree_with_direct_prediction(self, model, sample_features, mode):
+        """Every mode should return the same result as MLModel.predict"""
+        executor = InferenceExecutor(mode=mode, max_workers=2, preload=model)
+        try:
+            prediction, probability, _ = asyncio.run(executor.predict(model, sample_features))
+        finally:
+            executor.shutdown()
+
+        expected_prediction, expected_probability, _ = model.predict(sample_features)
+        assert prediction == expected_prediction
+        assert probability == pytest.approx(expected_probability)
+
+    def test_process_workers_pick_up_swapped_models(self, model, model_path, sample_features):
+        """A model not preloaded in the workers should be loaded on first use"""
+        other = MLModel(str(model_path), "v-other")
+        executor = InferenceExecutor(mode="process", max_workers=1, preload=model)
+        try:
+            asyncio.run(executor.predict(other, sample_features))
+        finally:
+            executor.shutdown()
+
+        assert other.get_drift_metrics()["count"] == 1
+        assert model.get_drift_metrics()["count"] == 0
+
+    def test_process_mode_keeps_drift_stats_in_parent(self, model, sample_features):
+        """Predictions scored in worker processes should still count for drift"""
+        executor = InferenceExecutor(mode="process", max_workers=1)
+        try:
+            asyncio.run(executor.predict(model, sample_features))
+        finally:
+            executor.shutdown()
+
+        assert model.get_drift_metrics()["count"] == 1
+
+    def test_thread_mode_does_not_block_event_loop(self, model, sample_features):
+        """The loop should keep running while a slow prediction is in progress"""
+        original = model.predict_batch
+
+        def slow_predict_batch(features_batch):
+            time.sleep(0.2)
+            return original(features_batch)
+
+        model.predict_batch = slow_predict_batch
+        executor = InferenceExecutor(mode="thread", max_workers=1)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(executor.predict(model, sample_features), ticker())
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    def test_rejects_when_saturated(self, model, sample_features):
+        """Jobs beyond max_workers + max_queue should be rejected"""
+        release = threading.Event()
+        original = model.predict_batch
+
+        def blocking_predict_batch(features_batch):
+            release.wait(timeout=5)
+            return original(features_batch)
+
+        model.predict_batch = blocking_predict_batch
+        executor = InferenceExecutor(mode="thread", max_workers=1, max_queue=1)
+
+        async def run():
+            first = asyncio.ensure_future(executor.predict(model, sample_features))
+            second = asyncio.ensure_future(executor.predict(model, sample_features))
+            await asyncio.sleep(0.05)
+
+            stats = executor.stats()
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.predict(model, sample_features)
+
+            release.set()
+            await asyncio.gather(first, second)
+            return stats
+
+        try:
+            stats = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert stats["active_workers"] == 1
+        assert stats["queue_depth"] == 1
+        assert executor.stats()["active_workers"] == 0
@@ -0,0 +1,89 @@
+"""
+Unit tests for the compiled feature layout
+"""
+
+import threading
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from app.features import FeatureLayout, FeatureSchemaError
+from app.model import MLModel
+
+from tests.conftest import FEATURE_NAMES
+
+
+@pytest.fixture
+def layout():
+    return FeatureLayout(FEATURE_NAMES)
+
+
+class TestFeatureLayout:
+    """Tests for FeatureLayout"""
+
+    def test_dict_order_does_not_matter(self, layout, sample_features):
+        """Columns follow the model order, not the request's key order"""
+        reordered = dict(reversed(list(sample_features.items())))
+        expected = [sample_features[name] for name in FEATURE_NAMES]
+
+        np.testing.assert_array_equal(layout.to_array([reordered])[0], expected)
+
+    def test_missing_feature_raises(self, layout, sample_features):
+        """Missing features are no longer filled with zeros"""
+        del sample_features["tenure_months"]
+        with pytest.raises(FeatureSchemaError) as excinfo:
+            layout.to_array([sample_features])
+        assert excinfo.value.missing == ["tenure_months"]
+
+    def test_extra_feature_raises(self, layout, sample_features):
+        """Unexpected features are reported, not silently ignored"""
+        sample_features["unknown"] = 1.0
+        with pytest.raises(FeatureSchemaError) as excinfo:
+            layout.validate(sample_features)
+        assert excinfo.value.extra == ["unknown"]
+
+    def test_buffer_is_reused(self, layout, sample_features):
+        """Steady-state calls should fill the same buffer"""
+        first = layout.to_array([sample_features] * 4)
+        second = layout.to_array([sample_features] * 8)
+        assert np.shares_memory(first, second)
+
+    def test_buffer_grows_for_large_batches(self, layout, sample_features):
+        """Batches beyond the preallocated rows still work"""
+        result = layout.to_array([sample_features] * 100)
+        assert result.shape == (100, len(FEATURE_NAMES))
+
+    def test_threads_get_separate_buffers(self, layout, sample_features):
+        """Concurrent scoring threads must not overwrite each other's input"""
+        arrays = []
+        thread = threading.Thread(target=lambda: arrays.append(layout.to_array([sample_features])))
+        thread.start()
+        thread.join()
+        assert not np.shares_memory(arrays[0], layout.to_array([sample_features]))
+
+    def test_single_feature(self):
+        """A one-feature layout still fills a 2D array"""
+        assert FeatureLayout(["x"]).to_array([{"x": 2.0}]).tolist() == [[2.0]]
+
+
+class TestModelFeatures:
+    """Tests for MLModel's use of the layout"""
+
+    def test_predict_rejects_missing_features(self, model_path, sample_features):
+        """MLModel.predict should refuse incomplete requests"""
+        model = MLModel(str(model_path))
+        del sample_features["support_tickets"]
+        with pytest.raises(FeatureSchemaError):
+            model.predict(sample_features)
+
+    def test_unnamed_model_uses_positional_names(self, tmp_path):
+        """Models trained on arrays take feature_0 .. feature_{n-1}"""
+        X = np.random.default_rng(0).normal(size=(50, 3))
+        path = tmp_path / "unnamed.pkl"
+        joblib.dump(LogisticRegression().fit(X, (X[:, 0] > 0).astype(int)), path)
+
+        model = MLModel(str(path))
+        features = {"feature_2": 0.0, "feature_0": 5.0, "feature_1": 0.0}
+        assert model.predict(features)[0] == model.model.predict(np.array([[5.0, 0.0, 0.0]]))[0]
@@ -0,0 +1,206 @@
+"""
+Unit tests for prediction log storage: encoding, rollups and retention (SQLite mode)
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, Integer, MetaData, String, Table, func, inspect, select
+)
+
+from app.database import Base, PredictionLog, PredictionRollup, make_engine
+from app.log_store import LEGACY_TABLE, LogStore, decode_features, histogram_quantile
+
+NOW = datetime(2025, 6, 15, 12, 30, 15)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'predictions.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_row(timestamp=NOW, latency_ms=5.0, prediction=1.0, version="v1", **features):
+    return {
+        "request_id": str(uuid.uuid4()),
+        "timestamp": timestamp,
+        "model_version": version,
+        "input_features": features or {"b": 2.0, "a": 1.0},
+        "prediction": prediction,
+        "prediction_proba": 0.9,
+        "latency_ms": latency_ms,
+        "cached": latency_ms == 0.0,
+    }
+
+
+def write(store, engine, rows):
+    with engine.begin() as conn:
+        store.write(conn, rows)
+
+
+def legacy_table(engine, rows):
+    """Create the JSON-based table written by earlier versions, with rows"""
+    legacy = Table(
+        LEGACY_TABLE, MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("timestamp", DateTime),
+        Column("model_version", String),
+        Column("input_features", JSON),
+        Column("prediction", Float),
+        Column("prediction_proba", Float, nullable=True),
+        Column("latency_ms", Float),
+        Column("request_id", String, unique=True)
+    )
+    legacy.create(engine)
+    with engine.begin() as conn:
+        conn.execute(legacy.insert(), [
+            {key: value for key, value in row.items() if key != "cached"} for row in rows
+        ])
+    return legacy
+
+
+def count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+class TestEncoding:
+    """Tests for the typed feature layout"""
+
+    def test_features_round_trip(self, engine):
+        """Features should come back under their names regardless of key order"""
+        store = LogStore(engine)
+        write(store, engine, [make_row(a=1.5, b=-2.0), make_row(b=4.0, a=3.0)])
+
+        frame = store.read_records(NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+
+        assert sorted(frame["a"]) == [1.5, 3.0]
+        assert sorted(frame["b"]) == [-2.0, 4.0]
+        assert "features" not in frame.columns
+
+    def test_packed_size(self):
+        """Each feature should take 8 bytes"""
+        records, schemas = LogStore().encode([make_row(x=1.0, y=2.0, z=3.0)])
+
+        assert len(records[0]["features"]) == 24
+        assert list(schemas.values()) == [("x", "y", "z")]
+        np.testing.assert_array_equal(decode_features([records[0]["features"]], 3), [[1.0, 2.0, 3.0]])
+
+
+class TestRollups:
+    """Tests for per-minute rollups"""
+
+    def test_batches_merge_into_one_minute(self, engine):
+        """Writes in the same minute should be added to one rollup row"""
+        store = LogStore(engine)
+        write(store, engine, [make_row(latency_ms=1.0), make_row(latency_ms=0.0, prediction=0.0)])
+        write(store, engine, [make_row(timestamp=NOW + timedelta(seconds=30), latency_ms=300.0)])
+
+        assert count(engine, PredictionRollup) == 1
+        [summary] = store.rollups(NOW - timedelta(minutes=5), NOW + timedelta(minutes=5))
+        assert summary["count"] == 3
+        assert summary["cached_count"] == 1
+        assert summary["latency_max_ms"] == 300.0
+        assert summary["prediction_mean"] == pytest.approx(2 / 3)
+        assert sum(summary["prediction_histogram"]["counts"]) == 3
+
+    def test_step_merges_minutes_per_version(self, engine):
+        """Minutes should be merged into step buckets, separately per version"""
+        store = LogStore(engine)
+        rows = [make_row(timestamp=NOW + timedelta(minutes=i)) for i in range(4)]
+        rows.append(make_row(version="v2"))
+        write(store, engine, rows)
+
+        summaries = store.rollups(
+            NOW.replace(second=0), NOW + timedelta(minutes=10), step_minutes=10
+        )
+
+        assert [(s["model_version"], s["count"]) for s in summaries] == [("v1", 4), ("v2", 1)]
+
+    def test_histogram_quantile(self):
+        """Quantiles should interpolate within the bucket that holds them"""
+        bounds = [10, 20, 30]
+
+        assert histogram_quantile(0.5, bounds, [0, 10, 0, 0]) == pytest.approx(15.0)
+        assert histogram_quantile(0.99, bounds, [0, 0, 0, 5]) == 30.0
+        assert histogram_quantile(0.5, bounds, [0, 0, 0, 0]) is None
+
+
+class TestRetention:
+    """Tests for retention and Parquet offload"""
+
+    def test_expired_days_are_removed(self, engine):
+        """Raw rows beyond retention go, recent rows and rollups stay"""
+        store = LogStore(engine, retention_days=7)
+        old = [make_row(timestamp=NOW - timedelta(days=d)) for d in (10, 9)]
+        write(store, engine, old + [make_row(timestamp=NOW - timedelta(days=1))])
+
+        store.maintain(NOW)
+
+        assert count(engine, PredictionLog) == 1
+        assert count(engine, PredictionRollup) == 3
+
+    def test_rollup_retention(self, engine):
+        """Rollups older than their own retention should be removed"""
+        store = LogStore(engine, retention_days=1, rollup_retention_days=30)
+        write(store, engine, [make_row(timestamp=NOW - timedelta(days=40)), make_row()])
+
+        store.maintain(NOW)
+
+        assert count(engine, PredictionRollup) == 1
+
+    def test_archive_to_parquet(self, engine, tmp_path):
+        """Expired rows should be written to Parquet with typed feature columns"""
+        pytest.importorskip("pyarrow")
+        archive = tmp_path / "archive"
+        store = LogStore(engine, retention_days=7, archive_dir=str(archive))
+        day = NOW - timedelta(days=10)
+        write(store, engine, [make_row(timestamp=day, a=1.0, b=2.0), make_row(timestamp=day, x=3.0)])
+
+        store.maintain(NOW)
+
+        files = sorted((archive / f"date={day.date().isoformat()}").glob("*.parquet"))
+        assert len(files) == 2
+        frames = [pd.read_parquet(path) for path in files]
+        assert sorted(len(f) for f in frames) == [1, 1]
+        assert any(set(f.columns) >= {"a", "b"} and "x" not in f.columns for f in frames)
+        assert count(engine, PredictionLog) == 0
+
+
+class TestLegacyMigration:
+    """Tests for moving rows out of the legacy prediction_logs table"""
+
+    def test_rows_move_to_records_and_rollups(self, engine):
+        """Legacy rows should be readable and counted in rollups, then the table dropped"""
+        store = LogStore(engine)
+        legacy_table(engine, [make_row(a=1.0, b=2.0), make_row(a=3.0, b=4.0), make_row(x=5.0)])
+
+        assert store.migrate_legacy(batch_size=2) == 3
+
+        frame = store.read_records(NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+        assert sorted(frame["a"].dropna()) == [1.0, 3.0]
+        assert frame["x"].dropna().tolist() == [5.0]
+        assert store.rollups(NOW - timedelta(hours=1), NOW + timedelta(hours=1))[0]["count"] == 3
+        assert not inspect(engine).has_table(LEGACY_TABLE)
+
+    def test_resumes_after_partial_migration(self, engine):
+        """Rows already moved are not written twice when the migration reruns"""
+        store = LogStore(engine)
+        rows = [make_row() for _ in range(3)]
+        legacy = legacy_table(engine, rows)
+        # A previous run moved the first row and then stopped
+        write(store, engine, rows[:1])
+        with engine.begin() as conn:
+            conn.execute(legacy.delete().where(legacy.c.request_id == rows[0]["request_id"]))
+
+        assert store.migrate_legacy() == 2
+        assert count(engine, PredictionLog) == 3
+
+    def test_no_legacy_table(self, engine):
+        """Without a legacy table nothing is migrated"""
+        assert LogStore(engine).migrate_legacy() == 0
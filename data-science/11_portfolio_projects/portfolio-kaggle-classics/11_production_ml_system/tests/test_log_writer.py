@@ -0,0 +1,226 @@
+"""
+Unit tests for the batched prediction log writer (SQLite mode)
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.backends import CircuitBreaker, DatabaseBackend
+from app.database import Base, PredictionLog, make_engine
+from app.log_writer import PredictionLogWriter
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'predictions.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_row(i=0):
+    return {
+        "request_id": str(uuid.uuid4()),
+        "timestamp": datetime.utcnow(),
+        "model_version": "v-test",
+        "input_features": {"x": float(i)},
+        "prediction": 1.0,
+        "prediction_proba": 0.9,
+        "latency_ms": 1.5,
+    }
+
+
+def count_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(PredictionLog)).scalar()
+
+
+class TestPredictionLogWriter:
+    """Tests for PredictionLogWriter"""
+
+    def test_rejects_invalid_config(self, engine):
+        """Unknown policies and spill without a path should be rejected"""
+        with pytest.raises(ValueError):
+            PredictionLogWriter(engine, overflow_policy="ignore")
+        with pytest.raises(ValueError):
+            PredictionLogWriter(engine, overflow_policy="spill", spill_path=None)
+
+    def test_flushes_when_batch_is_full(self, engine):
+        """Reaching batch_size should trigger a write before the interval"""
+        writer = PredictionLogWriter(engine, batch_size=10, flush_interval_ms=60000)
+
+        async def run():
+            for i in range(10):
+                await writer.log(make_row(i))
+            await asyncio.sleep(0.2)
+            written = count_rows(engine)
+            await writer.stop()
+            return written
+
+        assert asyncio.run(run()) == 10
+
+    def test_flushes_on_interval(self, engine):
+        """A partial batch should be written once the interval elapses"""
+        writer = PredictionLogWriter(engine, batch_size=100, flush_interval_ms=20)
+
+        async def run():
+            await writer.log(make_row())
+            await asyncio.sleep(0.2)
+            written = count_rows(engine)
+            await writer.stop()
+            return written
+
+        assert asyncio.run(run()) == 1
+
+    def test_stop_flushes_remaining_rows(self, engine):
+        """Shutdown should write everything still buffered"""
+        writer = PredictionLogWriter(engine, batch_size=100, flush_interval_ms=60000)
+
+        async def run():
+            for i in range(25):
+                await writer.log(make_row(i))
+            await writer.stop()
+
+        asyncio.run(run())
+        assert count_rows(engine) == 25
+        assert writer.buffered() == 0
+
+    def test_drop_policy_caps_memory(self, engine):
+        """Rows beyond max_buffer should be dropped under the drop policy"""
+        writer = PredictionLogWriter(engine, batch_size=5, max_buffer=5, flush_interval_ms=60000)
+
+        async def run():
+            # Fill the buffer without yielding to the flush task
+            for i in range(8):
+                await writer.log(make_row(i))
+            buffered = writer.buffered()
+            await writer.stop()
+            return buffered
+
+        assert asyncio.run(run()) == 5
+        assert count_rows(engine) == 5
+
+    def test_spill_policy_writes_to_disk_and_replays(self, engine, tmp_path):
+        """Overflowing rows should be spilled and inserted on the next start"""
+        spill_path = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(
+            engine, batch_size=5, max_buffer=5, flush_interval_ms=60000,
+            overflow_policy="spill", spill_path=str(spill_path)
+        )
+
+        async def run():
+            for i in range(8):
+                await writer.log(make_row(i))
+            await writer.stop()
+
+        asyncio.run(run())
+        assert count_rows(engine) == 5
+        assert len(spill_path.read_text().splitlines()) == 3
+        assert json.loads(spill_path.read_text().splitlines()[0])["model_version"] == "v-test"
+
+        writer.replay_spill()
+        assert count_rows(engine) == 8
+        assert not spill_path.exists()
+
+    def test_spill_policy_writes_off_the_event_loop(self, engine, tmp_path, monkeypatch):
+        """Overflow rows should be queued and spilled on a worker thread, not in log()"""
+        spill_path = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(
+            engine, batch_size=2, max_buffer=2, flush_interval_ms=60000,
+            overflow_policy="spill", spill_path=str(spill_path)
+        )
+        spill_threads = []
+        spill = writer._spill
+        monkeypatch.setattr(
+            writer, "_spill",
+            lambda rows: spill_threads.append(threading.get_ident()) or spill(rows)
+        )
+
+        async def run():
+            for i in range(6):
+                await writer.log(make_row(i))
+            # Nothing is written until log() yields to the event loop
+            queued = len(writer._overflow)
+            spilled_in_log = spill_path.exists()
+            await writer.stop()
+            return queued, spilled_in_log
+
+        assert asyncio.run(run()) == (4, False)
+        assert len(spill_path.read_text().splitlines()) == 4
+        assert spill_threads and threading.get_ident() not in spill_threads
+
+    def test_replay_keeps_rows_after_failed_batch(self, engine, tmp_path):
+        """Replay should stop at the first failed batch and keep the rest on disk"""
+        spill_path = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(engine, batch_size=2, spill_path=str(spill_path))
+        writer._spill([make_row(i) for i in range(5)])
+
+        insert = writer._insert
+        batches = []
+
+        def fail_second_batch(rows):
+            batches.append(rows)
+            if len(batches) == 2:
+                raise OperationalError("INSERT", {}, Exception("database went away"))
+            insert(rows)
+
+        writer._insert = fail_second_batch
+        with pytest.raises(OperationalError):
+            writer.replay_spill()
+
+        assert count_rows(engine) == 2
+        assert len(spill_path.read_text().splitlines()) == 3
+
+        writer._insert = insert
+        writer.replay_spill()
+        assert count_rows(engine) == 5
+        assert not spill_path.exists()
+
+    def test_replay_on_reconnect_with_open_circuit(self, engine, tmp_path):
+        """Spilled rows should be inserted when the database comes back"""
+        breaker = CircuitBreaker("database", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        spill_path = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(engine, spill_path=str(spill_path), breaker=breaker)
+        writer._spill([make_row(i) for i in range(3)])
+        backend = DatabaseBackend(engine, breaker=breaker, on_connect=[writer.replay_spill])
+
+        backend._probe()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert count_rows(engine) == 3
+        assert not spill_path.exists()
+
+    def test_failed_write_spills_rows(self, tmp_path):
+        """Rows from a failed insert should be kept on disk, not lost"""
+        missing_table_engine = make_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+        spill_path = tmp_path / "spill.jsonl"
+        writer = PredictionLogWriter(missing_table_engine, spill_path=str(spill_path))
+
+        async def run():
+            await writer.log(make_row())
+            await writer.stop()
+
+        asyncio.run(run())
+        assert len(spill_path.read_text().splitlines()) == 1
+
+    def test_block_policy_applies_backpressure(self, engine):
+        """Under the block policy, a full buffer should make callers wait for a flush"""
+        writer = PredictionLogWriter(
+            engine, batch_size=2, max_buffer=2, flush_interval_ms=60000, overflow_policy="block"
+        )
+
+        async def run():
+            for i in range(6):
+                await asyncio.wait_for(writer.log(make_row(i)), timeout=2)
+                assert writer.buffered() <= 2
+            await writer.stop()
+
+        asyncio.run(run())
+        assert count_rows(engine) == 6
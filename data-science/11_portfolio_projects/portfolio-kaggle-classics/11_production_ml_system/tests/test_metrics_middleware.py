@@ -0,0 +1,86 @@
+"""
+Unit tests for the request metrics middleware
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.monitoring import (
+    MetricsMiddleware,
+    UNMATCHED_ROUTE,
+    request_count,
+    requests_in_progress,
+    request_stage_latency
+)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.get("/in-progress")
+    async def in_progress():
+        return {"value": requests_in_progress._value.get()}
+
+    @app.get("/timed")
+    async def timed(request: Request):
+        request.state.handler_end = time.perf_counter()
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def count(endpoint, method="GET", status="200"):
+    return request_count.labels(endpoint=endpoint, method=method, status=status)._value.get()
+
+
+class TestMetricsMiddleware:
+    """Tests for MetricsMiddleware"""
+
+    def test_labels_by_route_template(self, client):
+        """Parameterized paths should share their route's label"""
+        before = count("/items/{item_id}")
+        for item_id in range(5):
+            client.get(f"/items/{item_id}")
+        assert count("/items/{item_id}") == before + 5
+        assert count("/items/3") == 0
+
+    def test_unmatched_paths_share_one_label(self, client):
+        """Random paths must not create new label values"""
+        before = count(UNMATCHED_ROUTE, status="404")
+        client.get("/wp-admin/setup.php")
+        client.get("/.env")
+        assert count(UNMATCHED_ROUTE, status="404") == before + 2
+
+    def test_unknown_methods_are_grouped(self, client):
+        """Arbitrary HTTP methods collapse to OTHER"""
+        before = count("/items/{item_id}", method="OTHER", status="405")
+        client.request("BREW", "/items/1")
+        assert count("/items/{item_id}", method="OTHER", status="405") == before + 1
+
+    def test_tracks_requests_in_progress(self, client):
+        """The gauge counts the current request and returns to its previous value"""
+        before = requests_in_progress._value.get()
+        assert client.get("/in-progress").json()["value"] == before + 1
+        assert requests_in_progress._value.get() == before
+
+    def test_records_serialize_stage(self, client):
+        """Handlers that set state.handler_end get a serialize timing"""
+        def observations():
+            histogram = request_stage_latency.collect()[0]
+            return next(
+                s.value for s in histogram.samples
+                if s.name.endswith("_count") and s.labels["stage"] == "serialize"
+            )
+
+        before = observations()
+        client.get("/timed")
+        assert observations() == before + 1
@@ -0,0 +1,159 @@
+"""
+Unit tests for zero-downtime model swaps and shadow scoring
+"""
+
+import asyncio
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from prometheus_client import REGISTRY
+from sklearn.linear_model import LogisticRegression
+
+from app.model import (
+    MLModel,
+    ModelManager,
+    ModelPathError,
+    ModelValidationError,
+    resolve_model_file,
+    validate_model
+)
+from app.monitoring import shadow_predictions
+
+
+@pytest.fixture
+def manager(model_path):
+    return ModelManager(MLModel(str(model_path), "v1"))
+
+
+@pytest.fixture
+def other_schema_path(tmp_path):
+    """Model trained on a different set of features"""
+    X = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 2)), columns=["a", "b"])
+    path = tmp_path / "other.pkl"
+    joblib.dump(LogisticRegression().fit(X, (X["a"] > 0).astype(int)), path)
+    return path
+
+
+class TestModelSwap:
+    """Tests for ModelManager.swap"""
+
+    def test_swap_replaces_active_model_by_reference(self, manager, model_path, sample_features):
+        """A swap should install a new object and leave the old one untouched"""
+        previous = manager.active
+        result = asyncio.run(manager.swap(str(model_path), "v2"))
+
+        assert manager.active is not previous
+        assert manager.active.version == "v2"
+        assert previous.version == "v1"
+        assert result["previous_version"] == "v1"
+        assert result["version"] == "v2"
+        # The old model can still finish in-flight requests
+        assert previous.predict(sample_features)[0] in (0.0, 1.0)
+
+    def test_swap_unbinds_previous_drift_metrics(self, manager, model_path):
+        """Drift gauges should only be exported for the active version"""
+        assert REGISTRY.get_sample_value("ml_prediction_mean", {"model_version": "v1"}) is not None
+
+        asyncio.run(manager.swap(str(model_path), "v2"))
+
+        assert REGISTRY.get_sample_value("ml_prediction_mean", {"model_version": "v1"}) is None
+        assert REGISTRY.get_sample_value("ml_prediction_mean", {"model_version": "v2"}) is not None
+
+    def test_swap_defaults_to_reloading_active_model(self, manager):
+        """Without arguments the current path and version are reloaded"""
+        asyncio.run(manager.swap())
+        assert manager.active.version == "v1"
+
+    def test_swap_rejects_schema_change(self, manager, other_schema_path):
+        """A candidate expecting different features must not be activated"""
+        previous = manager.active
+        with pytest.raises(ModelValidationError):
+            asyncio.run(manager.swap(str(other_schema_path), "v2"))
+        assert manager.active is previous
+
+    def test_swap_rejects_missing_artifact(self, manager, tmp_path):
+        """Load failures should keep the active model"""
+        previous = manager.active
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(manager.swap(str(tmp_path / "missing.pkl"), "v2"))
+        assert manager.active is previous
+
+
+class TestResolveModelFile:
+    """Tests for resolving model files requested over the API"""
+
+    def test_resolves_file_in_models_dir(self, model_path):
+        """A file name inside the models directory resolves to its path"""
+        assert resolve_model_file(model_path.name, model_path.parent) == str(model_path.resolve())
+
+    @pytest.mark.parametrize("name", ["../outside.pkl", "/etc/passwd", "missing.pkl"])
+    def test_rejects_files_outside_or_missing(self, tmp_path, name):
+        """Paths leaving the models directory, or missing files, are rejected"""
+        models_dir = tmp_path / "models"
+        models_dir.mkdir()
+        (tmp_path / "outside.pkl").write_bytes(b"not a model")
+
+        with pytest.raises(ModelPathError):
+            resolve_model_file(name, models_dir)
+
+    def test_manager_defaults_to_active_model_directory(self, manager, model_path):
+        """Without models_dir, the active model's directory is used"""
+        assert manager.models_dir == model_path.parent
+
+
+class TestValidateModel:
+    """Tests for the canary validation"""
+
+    def test_canary_predictions_do_not_count_as_traffic(self, model_path):
+        """Warm-up predictions should be cleared from drift statistics"""
+        candidate = MLModel(str(model_path), "v2")
+        warmup_ms = validate_model(candidate)
+
+        assert warmup_ms >= 0
+        assert candidate.get_drift_metrics()["count"] == 0
+
+    def test_uses_canary_file_next_to_model(self, model_path, sample_features):
+        """models/<model>.canary.json should replace the synthetic canary"""
+        canary_path = model_path.with_suffix(".canary.json")
+        canary_path.write_text(json.dumps([sample_features] * 5))
+        try:
+            assert MLModel(str(model_path)).canary_batch() == [sample_features] * 5
+        finally:
+            canary_path.unlink()
+
+    def test_mmap_mode_gives_same_predictions(self, model_path, sample_features):
+        """Memory-mapped loading should not change predictions"""
+        regular = MLModel(str(model_path)).predict(sample_features)
+        mapped = MLModel(str(model_path), mmap_mode="r").predict(sample_features)
+        assert mapped[0] == regular[0]
+        assert mapped[1] == pytest.approx(regular[1])
+
+
+class TestShadow:
+    """Tests for shadow scoring"""
+
+    def test_shadow_records_agreement(self, manager, model_path, sample_features):
+        """Sampled requests should be scored by the shadow model in the background"""
+        counter = shadow_predictions.labels(shadow_version="v-shadow", result="agree")
+        before = counter._value.get()
+        prediction = manager.active.predict(sample_features)[0]
+
+        async def run():
+            await manager.start_shadow(str(model_path), "v-shadow", fraction=1.0)
+            manager.maybe_shadow(sample_features, prediction)
+            await asyncio.gather(*manager._shadow_tasks)
+
+        asyncio.run(run())
+        assert counter._value.get() == before + 1
+        assert manager.info()["shadow_version"] == "v-shadow"
+
+        manager.stop_shadow()
+        assert manager.shadow is None
+
+    def test_rejects_invalid_fraction(self, manager, model_path):
+        """Shadow fraction must be in (0, 1]"""
+        with pytest.raises(ValueError):
+            asyncio.run(manager.start_shadow(str(model_path), "v-shadow", fraction=0.0))
@@ -0,0 +1,126 @@
+"""
+Unit tests for the multi-model registry
+"""
+
+import asyncio
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.model import MLModel, ModelManager, estimate_memory_bytes
+from app.registry import ModelRegistry, UnknownModelVersionError, parse_mapping
+
+
+@pytest.fixture
+def manager(model_path):
+    return ModelManager(MLModel(str(model_path), "v1"))
+
+
+@pytest.fixture
+def registry(manager, model_path):
+    return ModelRegistry(manager, {"v2": str(model_path), "v3": str(model_path)})
+
+
+class TestRouting:
+    """Tests for ModelRegistry.route"""
+
+    def test_defaults_to_active_model(self, registry):
+        """Without a header or weights every request goes to the active model"""
+        assert registry.route() == "v1"
+
+    def test_header_selects_version(self, registry):
+        """An explicitly requested version wins over the split"""
+        registry.set_weights({"v1": 1.0})
+        assert registry.route("v2") == "v2"
+
+    def test_unknown_version_is_rejected(self, registry):
+        """Requests and weights may only name registered versions"""
+        with pytest.raises(UnknownModelVersionError):
+            registry.route("v9")
+        with pytest.raises(UnknownModelVersionError):
+            registry.set_weights({"v9": 1.0})
+
+    def test_weighted_split(self, registry):
+        """Traffic should follow the configured weights"""
+        registry.set_weights({"v1": 3, "v2": 1})
+        counts = Counter(registry.route(routing_key=str(i)) for i in range(4000))
+        assert counts["v2"] / 4000 == pytest.approx(0.25, abs=0.03)
+        assert set(counts) == {"v1", "v2"}
+
+    def test_routing_key_is_sticky(self, registry):
+        """The same routing key should always land on the same version"""
+        registry.set_weights({"v1": 1, "v2": 1})
+        assert len({registry.route(routing_key="user-42") for _ in range(20)}) == 1
+
+
+class TestLoading:
+    """Tests for lazy loading and eviction"""
+
+    def test_cold_version_loaded_once(self, registry, sample_features):
+        """Concurrent requests for a cold version should share one load"""
+        async def run():
+            return await asyncio.gather(*(registry.get("v2") for _ in range(5)))
+
+        models = asyncio.run(run())
+        assert all(model is models[0] for model in models)
+        assert models[0].version == "v2"
+        assert models[0].predict(sample_features)[0] in (0.0, 1.0)
+
+    def test_active_model_is_served_directly(self, registry, manager):
+        """The active version never needs a second copy"""
+        assert asyncio.run(registry.get("v1")) is manager.active
+
+    def test_evicts_least_recently_used_over_budget(self, manager, model_path):
+        """Only as many versions as fit in the budget should stay loaded"""
+        footprint = manager.active.memory_bytes
+        registry = ModelRegistry(
+            manager,
+            {"v2": str(model_path), "v3": str(model_path)},
+            memory_budget_bytes=int(footprint * 2.5)
+        )
+
+        async def run():
+            await registry.get("v2")
+            await registry.get("v3")
+
+        asyncio.run(run())
+        loaded = {m["version"]: m["loaded"] for m in registry.info()["models"]}
+        assert loaded == {"v1": True, "v2": False, "v3": True}
+        assert registry.memory_bytes() <= registry.memory_budget_bytes
+
+    def test_info_reports_memory_per_model(self, registry):
+        """Loaded models should report their estimated footprint"""
+        asyncio.run(registry.get("v2"))
+        models = {m["version"]: m for m in registry.info()["models"]}
+        assert models["v1"]["memory_bytes"] > 0
+        assert models["v2"]["memory_bytes"] > 0
+        assert models["v3"]["memory_bytes"] is None
+
+    def test_sync_active_drops_duplicate_after_swap(self, registry, manager, model_path):
+        """Swapping in a loaded version should not keep two copies of it"""
+        async def run():
+            await registry.get("v2")
+            await manager.swap(str(model_path), "v2")
+            registry.sync_active()
+
+        asyncio.run(run())
+        assert registry.info()["models"][0]["version"] == "v2"
+        assert [m["loaded"] for m in registry.info()["models"]] == [True, False]
+        # The previous active version is no longer routable
+        assert registry.versions() == ["v2", "v3"]
+
+
+class TestHelpers:
+    """Tests for registry helpers"""
+
+    def test_parse_mapping(self):
+        """Environment mappings are comma separated key=value pairs"""
+        assert parse_mapping("a=1, b = models/b.pkl,") == {"a": "1", "b": "models/b.pkl"}
+        with pytest.raises(ValueError):
+            parse_mapping("a")
+
+    def test_memory_estimate_counts_shared_arrays_once(self):
+        """Views of an array should not be counted twice"""
+        array = np.zeros(1000)
+        assert estimate_memory_bytes([array, array[:10]]) < 2 * array.nbytes
@@ -0,0 +1,119 @@
+"""
+Benchmark: text preprocessing throughput
+
+Compares TextPreprocessor.preprocess against the step-by-step reference
+pipeline (separate regex passes and NLTK's word_tokenize) on a synthetic
+corpus of review- and tweet-like texts, checks that both produce the same
+output, and times preprocess_batch with worker processes.
+
+Usage:
+    python benchmarks/bench_preprocess.py
+    python benchmarks/bench_preprocess.py --texts 200000 --n-jobs 1 4 -1
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from preprocess import TextPreprocessor  # noqa: E402
+
+WORDS = (
+    "the movie was great terrible boring amazing plot acting really not very "
+    "good bad love hate story ending characters product service money time "
+    "cannot gonna wanna 10 2023 café naïve 😍 👎"
+).split()
+CONTRACTIONS = ["can't", "don't", "isn't", "it's", "I'm", "won't", "they're"]
+NOISE = [
+    "<br /><br />",
+    "https://example.com/item?id=42",
+    "@support",
+    "#fail",
+    "!!!",
+    "...",
+    "“really”",
+    "—",
+]
+
+
+def make_corpus(n_texts: int, seed: int = 0) -> List[str]:
+    """
+    Build texts of 5-80 words mixing plain words, contractions and noise
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_texts):
+        words = []
+        for _ in range(rng.randint(5, 80)):
+            roll = rng.random()
+            if roll < 0.08:
+                words.append(rng.choice(CONTRACTIONS))
+            elif roll < 0.14:
+                words.append(rng.choice(NOISE))
+            else:
+                word = rng.choice(WORDS)
+                words.append(word.capitalize() if rng.random() < 0.1 else word)
+        text = " ".join(words)
+        corpus.append(text[0].upper() + text[1:] + rng.choice([".", "!", "?"]))
+    return corpus
+
+
+def timed(fn: Callable[[], List[str]]) -> tuple:
+    """Run fn once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text preprocessing")
+    parser.add_argument("--texts", type=int, default=20000, help="Corpus size")
+    parser.add_argument(
+        "--n-jobs", type=int, nargs="+", default=[2, 4], help="Worker counts"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    preprocessor = TextPreprocessor()
+    corpus = make_corpus(args.texts)
+
+    reference, reference_time = timed(
+        lambda: [preprocessor.preprocess_reference(text) for text in corpus]
+    )
+    fast, fast_time = timed(lambda: [preprocessor.preprocess(text) for text in corpus])
+
+    mismatches = sum(a != b for a, b in zip(reference, fast))
+    print(f"Corpus: {len(corpus)} texts")
+    print(f"{'pipeline':<24}{'seconds':>10}{'texts/s':>12}{'speedup':>10}")
+    print(
+        f"{'reference':<24}{reference_time:>10.2f}{len(corpus) / reference_time:>12.0f}"
+    )
+    print(
+        f"{'preprocess':<24}{fast_time:>10.2f}{len(corpus) / fast_time:>12.0f}"
+        f"{reference_time / fast_time:>9.1f}x"
+    )
+
+    for n_jobs in args.n_jobs:
+        batch, batch_time = timed(
+            lambda: preprocessor.preprocess_batch(
+                corpus, n_jobs=n_jobs, chunk_size=args.chunk_size
+            )
+        )
+        mismatches += batch != fast
+        print(
+            f"{f'batch n_jobs={n_jobs}':<24}{batch_time:>10.2f}"
+            f"{len(corpus) / batch_time:>12.0f}{reference_time / batch_time:>9.1f}x"
+        )
+
+    if mismatches:
+        print(f"\nOutput differs from the reference pipeline ({mismatches} mismatches)")
+        sys.exit(1)
+    print("\nOutput matches the reference pipeline")
+
+
+if __name__ == "__main__":
+    main()
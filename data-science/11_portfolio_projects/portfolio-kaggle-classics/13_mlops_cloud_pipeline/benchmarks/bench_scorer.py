@@ -0,0 +1,71 @@
+"""
+Benchmark: linear model scoring latency
+
+Trains a TF-IDF + logistic regression model on a synthetic corpus, then
+scores preprocessed texts one at a time, as the endpoint does for single
+requests, through scikit-learn (sparse matrix, predict_proba) and through
+LinearScorer. Checks that both give the same labels and probabilities.
+
+Usage:
+    python benchmarks/bench_scorer.py
+    python benchmarks/bench_scorer.py --texts 5000 --max-features 50000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_preprocess import make_corpus  # noqa: E402
+from preprocess import TextPreprocessor  # noqa: E402
+from scorer import LinearScorer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark linear model scoring")
+    parser.add_argument("--texts", type=int, default=2000, help="Texts scored")
+    parser.add_argument("--max-features", type=int, default=10000)
+    args = parser.parse_args()
+
+    preprocessor = TextPreprocessor()
+    train = preprocessor.preprocess_batch(make_corpus(5000, seed=1))
+    labels = np.arange(len(train)) % 2
+    vectorizer = TfidfVectorizer(max_features=args.max_features, ngram_range=(1, 2))
+    model = LogisticRegression(max_iter=1000)
+    model.fit(vectorizer.fit_transform(train), labels)
+    scorer = LinearScorer.from_model(vectorizer, model)
+
+    texts = preprocessor.preprocess_batch(make_corpus(args.texts))
+
+    start = time.perf_counter()
+    expected = [model.predict_proba(vectorizer.transform([text]))[0] for text in texts]
+    sklearn_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [scorer.score(text)[1] for text in texts]
+    scorer_time = time.perf_counter() - start
+
+    print(f"Scored {len(texts)} texts one at a time")
+    print(f"{'path':<16}{'us/text':>10}{'speedup':>10}")
+    print(f"{'scikit-learn':<16}{sklearn_time / len(texts) * 1e6:>10.1f}")
+    print(
+        f"{'LinearScorer':<16}{scorer_time / len(texts) * 1e6:>10.1f}"
+        f"{sklearn_time / scorer_time:>9.1f}x"
+    )
+
+    max_error = float(np.max(np.abs(np.array(actual) - np.array(expected))))
+    if max_error > 1e-12:
+        print(f"\nProbabilities differ from scikit-learn (max error {max_error:.2e})")
+        sys.exit(1)
+    print(f"\nProbabilities match scikit-learn (max error {max_error:.2e})")
+
+
+if __name__ == "__main__":
+    main()
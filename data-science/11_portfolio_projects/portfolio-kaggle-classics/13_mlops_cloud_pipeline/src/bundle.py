@@ -0,0 +1,474 @@
+"""
+Single-File Model Bundle
+
+Stores a trained sentiment model (vectorizer, linear model and
+preprocessing config) in one versioned file:
+
+    magic (8 bytes) | format version (uint32) | header length (uint32)
+    | SHA-256 of the rest of the file (32 bytes) | JSON header | arrays
+
+The header holds the vectorizer settings, model metadata and preprocessing
+config as plain data, plus the dtype, shape and offset of each array. The
+vocabulary is a sorted UTF-8 blob with an offsets array, and the
+coefficients are float32. Arrays are 64-byte aligned and read straight from
+a memory map, so loading does no unpickling and copies almost nothing.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from preprocess import TextPreprocessor
+
+BUNDLE_FILE = "model.bundle"
+MAGIC = b"SENTBNDL"
+FORMAT_VERSION = 1
+PREFIX = struct.Struct("<8sII32s")
+ALIGNMENT = 64
+PREFIX_PADDING = b"\0" * 8
+
+# Vectorizer settings stored in the header; anything else must be default
+TFIDF_PARAMS = (
+    "lowercase",
+    "strip_accents",
+    "token_pattern",
+    "ngram_range",
+    "binary",
+    "norm",
+    "use_idf",
+    "smooth_idf",
+    "sublinear_tf",
+)
+HASHING_PARAMS = (
+    "lowercase",
+    "strip_accents",
+    "token_pattern",
+    "ngram_range",
+    "binary",
+    "norm",
+    "n_features",
+    "alternate_sign",
+)
+
+
+class BundleError(ValueError):
+    """Raised when a bundle cannot be written or is invalid"""
+
+
+class ArrayVocabulary:
+    """
+    Read-only term -> column mapping backed by two arrays
+
+    Lookups search a sorted array of each term's first 8 bytes, built with
+    numpy from the two arrays, so no per-term Python object is created and
+    a memory-mapped vocabulary is usable as soon as it is mapped.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        """
+        Initialize vocabulary
+
+        Args:
+            offsets: Start of each term in data, plus the end (int64)
+            data: Concatenated UTF-8 terms in column order, which is sorted
+        """
+        self.offsets = offsets
+        self.data = data
+        self._offset_view = memoryview(offsets)
+        self._data_view = memoryview(data)
+        self._prefixes = _term_prefixes(offsets, data)
+
+    @classmethod
+    def from_terms(cls, terms: List[str]) -> "ArrayVocabulary":
+        """
+        Build from terms in column order
+
+        Args:
+            terms: Terms, where terms[i] is column i
+
+        Returns:
+            ArrayVocabulary
+        """
+        encoded = [term.encode("utf-8") for term in terms]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(term) for term in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(offsets, data)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def term_bytes(self, index: int) -> bytes:
+        """UTF-8 bytes of the term in column index"""
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:stop].tobytes()
+
+    def term(self, index: int) -> str:
+        """Term in column index"""
+        return self.term_bytes(index).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self.term(index)
+
+    def get(self, term: str) -> Optional[int]:
+        """
+        Column of a term
+
+        Args:
+            term: Term to look up
+
+        Returns:
+            Column index, or None if the term is not in the vocabulary
+        """
+        return self.columns([term])[0]
+
+    def columns(self, terms: List[str]) -> List[Optional[int]]:
+        """
+        Columns of several terms, with one search over the term prefixes
+
+        Args:
+            terms: Terms to look up
+
+        Returns:
+            Column index per term, None for terms not in the vocabulary
+        """
+        if len(self) == 0:
+            return [None] * len(terms)
+
+        keys = [term.encode("utf-8") for term in terms]
+        prefixes = np.frombuffer(
+            b"".join([(key + PREFIX_PADDING)[:8] for key in keys]), dtype=">u8"
+        ).astype(np.uint64)
+        starts = np.searchsorted(self._prefixes, prefixes)
+        candidates = np.minimum(starts, len(self) - 1)
+        found = self._prefixes[candidates] == prefixes
+        # A term of at most 8 bytes is its prefix, so equal prefixes and
+        # lengths mean equal terms; longer terms are compared in full
+        key_lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+        term_lengths = self.offsets[candidates + 1] - self.offsets[candidates]
+        exact = found & (key_lengths == term_lengths) & (key_lengths <= 8)
+        compare = found & ~exact & (key_lengths > 8)
+
+        candidate_columns = candidates.tolist()
+        columns: List[Optional[int]] = [
+            column if is_exact else None
+            for column, is_exact in zip(candidate_columns, exact.tolist())
+        ]
+        positions = np.flatnonzero(compare)
+        if len(positions):
+            # Terms sharing the prefix run from the candidate to the last tie
+            stops = np.searchsorted(self._prefixes, prefixes[positions], side="right")
+            offsets, data = self._offset_view, self._data_view
+            for position, stop in zip(positions.tolist(), stops.tolist()):
+                key = keys[position]
+                for index in range(candidate_columns[position], stop):
+                    if data[offsets[index] : offsets[index + 1]] == key:
+                        columns[position] = index
+                        break
+        return columns
+
+    def to_dict(self) -> Dict[str, int]:
+        """Term -> column dictionary, as used by scikit-learn"""
+        return {term: index for index, term in enumerate(self)}
+
+
+def _term_prefixes(offsets: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """
+    First 8 bytes of each term as a big-endian integer, zero padded
+
+    Terms are sorted by their bytes, so the prefixes are sorted too.
+    """
+    padded = np.concatenate([data, np.zeros(8, dtype=np.uint8)])
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+    prefixes = np.zeros(len(starts), dtype=np.uint64)
+    for position in range(8):
+        byte = padded[starts + position].astype(np.uint64)
+        byte[lengths <= position] = 0
+        prefixes |= byte << np.uint64(8 * (7 - position))
+    return prefixes
+
+
+class ModelBundle:
+    """Model components loaded from a bundle"""
+
+    def __init__(self, vectorizer, model, preprocessor, header: Dict, checksum: str):
+        """
+        Initialize bundle
+
+        Args:
+            vectorizer: Configured scikit-learn vectorizer; a TF-IDF
+                vectorizer gets its vocabulary_ from the bundle on first use
+            model: Fitted linear classifier with predict_proba
+            preprocessor: TextPreprocessor built from the stored config
+            header: Parsed bundle header
+            checksum: Hex SHA-256 of the bundle contents
+        """
+        self._vectorizer = vectorizer
+        self.model = model
+        self.preprocessor = preprocessor
+        self.header = header
+        self.checksum = checksum
+        self.vocabulary: Optional[ArrayVocabulary] = None
+        self.idf: Optional[np.ndarray] = None
+        self.coef: Optional[np.ndarray] = None
+        self.intercept = 0.0
+
+    @property
+    def vectorizer(self):
+        """
+        Fitted scikit-learn vectorizer
+
+        scikit-learn needs the vocabulary as a dict, which takes a Python
+        object per term, so it is only built when the vectorizer is used.
+        """
+        if self.vocabulary is not None and not hasattr(self._vectorizer, "vocabulary_"):
+            self._vectorizer.vocabulary_ = self.vocabulary.to_dict()
+        return self._vectorizer
+
+    def build_analyzer(self):
+        """Callable turning a document into its n-grams, as the vectorizer's"""
+        return self._vectorizer.build_analyzer()
+
+
+def _vectorizer_header(vectorizer) -> Dict:
+    """Describe a supported vectorizer as plain data"""
+    names: Tuple[str, ...]
+    if isinstance(vectorizer, TfidfVectorizer):
+        kind, names = "tfidf", TFIDF_PARAMS
+    elif isinstance(vectorizer, HashingVectorizer):
+        kind, names = "hashing", HASHING_PARAMS
+    else:
+        raise BundleError(f"Unsupported vectorizer: {type(vectorizer).__name__}")
+
+    params = vectorizer.get_params()
+    default = type(vectorizer)().get_params()
+    for name, value in params.items():
+        if name not in names and name != "dtype" and value != default[name]:
+            raise BundleError(f"Vectorizer setting {name}={value!r} cannot be bundled")
+
+    header: Dict[str, Any] = {"type": kind}
+    header.update({name: params[name] for name in names})
+    header["ngram_range"] = list(params["ngram_range"])
+    return header
+
+
+def save_bundle(path, vectorizer, model, preprocessor: TextPreprocessor) -> str:
+    """
+    Write a model bundle
+
+    Args:
+        path: Output file path
+        vectorizer: Fitted TfidfVectorizer or HashingVectorizer
+        model: Fitted binary linear classifier (LogisticRegression or
+            SGDClassifier with log loss)
+        preprocessor: Preprocessor the model was trained with
+
+    Returns:
+        Hex SHA-256 checksum of the bundle
+    """
+    coef = np.asarray(model.coef_)
+    if coef.shape[0] != 1 or not hasattr(model, "predict_proba"):
+        raise BundleError(
+            "Only binary linear classifiers with predict_proba are supported"
+        )
+
+    arrays = {}
+    vectorizer_header = _vectorizer_header(vectorizer)
+    if vectorizer_header["type"] == "tfidf":
+        if not vectorizer.use_idf:
+            raise BundleError("Only TfidfVectorizer with use_idf=True is supported")
+
+        # Store terms sorted (code point order is UTF-8 byte order) so the
+        # vocabulary can be searched; columns are reordered to match
+        terms = sorted(vectorizer.vocabulary_)
+        columns = [vectorizer.vocabulary_[term] for term in terms]
+        coef = coef[:, columns]
+        vocabulary = ArrayVocabulary.from_terms(terms)
+        arrays["vocabulary_offsets"] = vocabulary.offsets
+        arrays["vocabulary_data"] = vocabulary.data
+        arrays["idf"] = np.asarray(vectorizer.idf_, dtype=np.float32)[columns]
+
+    arrays["coef"] = coef[0].astype(np.float32)
+    arrays["intercept"] = np.asarray(model.intercept_, dtype=np.float32)
+
+    header: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "vectorizer": vectorizer_header,
+        "model": {
+            "type": type(model).__name__,
+            "classes": [int(c) for c in model.classes_],
+            "n_features": int(coef.shape[1]),
+        },
+        "preprocessor": preprocessor.get_config(),
+        "arrays": {},
+    }
+
+    # Lay out arrays one after another, each aligned
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        header["arrays"][name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    data_start = _aligned(PREFIX.size + len(header_bytes))
+    chunks = [header_bytes, b" " * (data_start - PREFIX.size - len(header_bytes))]
+    position = 0
+    for name, array in arrays.items():
+        padding = header["arrays"][name]["offset"] - position
+        chunks += [b"\0" * padding, array.tobytes()]
+        position += padding + array.nbytes
+
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes), digest.digest()))
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+    return digest.hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    """Round offset up to the array alignment"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _file_digest(buffer: mmap.mmap, start: int, block_size: int = 1 << 22) -> bytes:
+    """SHA-256 of buffer from start to the end, without copying it whole"""
+    digest = hashlib.sha256()
+    view = memoryview(buffer)
+    for block_start in range(start, len(buffer), block_size):
+        block_stop = block_start + block_size
+        digest.update(view[block_start:block_stop])
+    view.release()
+    return digest.digest()
+
+
+def save_artifacts(output_path, vectorizer, model, preprocessor, legacy_pickles=False):
+    """
+    Save model artifacts as a single-file bundle
+
+    Args:
+        output_path: Directory to save model files
+        vectorizer: Fitted vectorizer
+        model: Fitted classifier
+        preprocessor: Preprocessor the model was trained with
+        legacy_pickles: Also write vectorizer.pkl, model.pkl and
+            preprocessor.pkl for endpoints that predate the bundle format
+    """
+    print(f"Saving model to {output_path}")
+
+    # Create output directory
+    output_dir = Path(output_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Save bundle
+    bundle_path = output_dir / BUNDLE_FILE
+    checksum = save_bundle(bundle_path, vectorizer, model, preprocessor)
+    print(f"Saved bundle to {bundle_path} (sha256 {checksum[:16]})")
+
+    if legacy_pickles:
+        for name, obj in [
+            ("vectorizer", vectorizer),
+            ("model", model),
+            ("preprocessor", preprocessor),
+        ]:
+            joblib.dump(obj, output_dir / f"{name}.pkl")
+        print(f"Saved vectorizer, model and preprocessor pickles to {output_dir}")
+
+
+def load_bundle(path, verify: bool = True) -> ModelBundle:
+    """
+    Load a model bundle
+
+    Arrays are views on a read-only memory map of the file. The TF-IDF
+    vocabulary stays in its sorted array form; see ModelBundle.vectorizer.
+
+    Args:
+        path: Bundle file path
+        verify: Check the SHA-256 checksum before using the contents
+
+    Returns:
+        ModelBundle with scikit-learn vectorizer and model, and the arrays
+        LinearScorer.from_bundle scores with
+
+    Raises:
+        BundleError: If the file is not a bundle, has an unsupported
+            format version or fails the checksum
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < PREFIX.size:
+        raise BundleError(f"{path} is not a model bundle")
+    magic, version, header_length, checksum = PREFIX.unpack_from(buffer)
+    if magic != MAGIC:
+        raise BundleError(f"{path} is not a model bundle")
+    if version != FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle format version {version} in {path}")
+    if verify and _file_digest(buffer, PREFIX.size) != checksum:
+        raise BundleError(f"Checksum mismatch in {path}, the file is corrupt")
+
+    header_start = PREFIX.size
+    header_end = header_start + header_length
+    header = json.loads(buffer[header_start:header_end])
+    data_start = _aligned(header_end)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    preprocessor = TextPreprocessor.from_config(header["preprocessor"])
+
+    settings = dict(header["vectorizer"])
+    kind = settings.pop("type")
+    settings["ngram_range"] = tuple(settings["ngram_range"])
+    vocabulary = None
+    if kind == "tfidf":
+        vocabulary = ArrayVocabulary(
+            arrays["vocabulary_offsets"], arrays["vocabulary_data"]
+        )
+        vectorizer = TfidfVectorizer(**settings)
+        vectorizer.idf_ = arrays["idf"]
+    else:
+        vectorizer = HashingVectorizer(**settings)
+
+    # Binary logistic models score alike, so one class serves both trainers
+    model = LogisticRegression()
+    model.classes_ = np.array(header["model"]["classes"])
+    model.coef_ = arrays["coef"].reshape(1, -1)
+    model.intercept_ = arrays["intercept"]
+    model.n_features_in_ = header["model"]["n_features"]
+
+    bundle = ModelBundle(vectorizer, model, preprocessor, header, checksum.hex())
+    bundle.vocabulary = vocabulary
+    bundle.idf = arrays.get("idf")
+    bundle.coef = arrays["coef"]
+    bundle.intercept = float(arrays["intercept"][0])
+    return bundle
@@ -0,0 +1,126 @@
+"""
+Prediction Cache for the Inference Endpoint
+
+Bounded LRU cache of class probabilities, addressed by a hash of the
+normalized input text and the version of the model artifacts
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache lookups
+
+    Leading and trailing whitespace is dropped and runs of whitespace are
+    collapsed, which never changes the preprocessed text. A run containing a
+    newline becomes a newline, since HTML tag removal does not cross lines.
+
+    Args:
+        text: Raw input text
+
+    Returns:
+        Normalized text
+    """
+    return WHITESPACE_PATTERN.sub(
+        lambda match: "\n" if "\n" in match.group() else " ", text.strip()
+    )
+
+
+def cache_key(text: str, artifact_version: str) -> str:
+    """
+    Content address of a text for a given model version
+
+    Args:
+        text: Raw input text
+        artifact_version: Version of the model artifacts
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    content = f"{artifact_version}\0{normalize_text(text)}"
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of prediction probabilities"""
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum number of cached predictions (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[float, ...]]:
+        """
+        Look up cached probabilities
+
+        Args:
+            key: Cache key from cache_key
+
+        Returns:
+            Class probabilities, or None on a miss
+        """
+        with self._lock:
+            probabilities = self._entries.get(key)
+            if probabilities is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return probabilities
+
+    def put(self, key: str, probabilities: Tuple[float, ...]):
+        """
+        Store probabilities, evicting the least recently used entries when full
+
+        Args:
+            key: Cache key from cache_key
+            probabilities: Class probabilities
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = probabilities
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Cache statistics
+
+        Returns:
+            Dictionary with size, counters and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,195 @@
+"""
+Chunked Training Data Preparation
+
+Streams a CSV in blocks, preprocesses the texts across a process pool and
+writes the results as Parquet shards. Shards are cached under a fingerprint
+of the input file and preprocessing config, so re-runs with unchanged
+inputs skip the work.
+"""
+
+import hashlib
+import json
+import shutil
+import tempfile
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from preprocess import TextPreprocessor
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Hash a file's contents
+
+    Args:
+        path: File path
+        block_size: Bytes read at a time
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(
+    data_path: str,
+    preprocessor: TextPreprocessor,
+    text_column: str = "text",
+    label_column: str = "label",
+) -> str:
+    """
+    Fingerprint of everything that determines the prepared shards
+
+    Args:
+        data_path: Path to the CSV file
+        preprocessor: Preprocessor that will be applied
+        text_column: Name of text column
+        label_column: Name of label column
+
+    Returns:
+        Hex digest identifying the prepared data
+    """
+    key = {
+        "input_sha256": file_sha256(data_path),
+        "text_column": text_column,
+        "label_column": label_column,
+        "preprocessor": preprocessor.get_config(),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def prepare_shards(
+    data_path: str,
+    cache_dir: str,
+    preprocessor: TextPreprocessor,
+    text_column: str = "text",
+    label_column: str = "label",
+    chunk_size: int = 100_000,
+    n_jobs: int = -1,
+) -> Path:
+    """
+    Preprocess a CSV into Parquet shards, reusing cached shards if present
+
+    The CSV is read chunk_size rows at a time and each block becomes one
+    shard with the preprocessed text and the label. Shards are written to a
+    temporary directory that is renamed into place once complete, so an
+    interrupted run never leaves a partial cache entry.
+
+    Args:
+        data_path: Path to the CSV file (local)
+        cache_dir: Directory holding prepared datasets
+        preprocessor: Preprocessor to apply
+        text_column: Name of text column
+        label_column: Name of label column
+        chunk_size: Rows per CSV block and per shard
+        n_jobs: Worker processes for preprocessing (-1 for all CPUs)
+
+    Returns:
+        Directory with the shards and their manifest
+    """
+    key = fingerprint(data_path, preprocessor, text_column, label_column)
+    output_dir = Path(cache_dir) / key
+
+    if (output_dir / MANIFEST_FILE).exists():
+        print(f"Using prepared data from {output_dir}")
+        return output_dir
+
+    print(f"Preparing {data_path} into {output_dir}")
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir))
+
+    try:
+        reader = pd.read_csv(
+            data_path, usecols=[text_column, label_column], chunksize=chunk_size
+        )
+        label_blocks: deque = deque()
+
+        def texts():
+            # Labels are queued in block order as the texts are handed out
+            for block in reader:
+                label_blocks.append(block[label_column].to_numpy())
+                yield from block[text_column].to_numpy()
+
+        processed = preprocessor.preprocess_stream(
+            texts(), n_jobs=n_jobs, chunk_size=max(1, min(chunk_size, 10_000))
+        )
+
+        shards: List[str] = []
+        rows = 0
+        for first in processed:
+            labels = label_blocks.popleft()
+            block = [first, *islice(processed, len(labels) - 1)]
+
+            shard = f"part-{len(shards):05d}.parquet"
+            pd.DataFrame({"text": block, "label": labels}).to_parquet(
+                tmp_dir / shard, index=False
+            )
+            shards.append(shard)
+            rows += len(block)
+            print(f"Wrote {shard} ({rows} rows)")
+
+        manifest = {
+            "fingerprint": key,
+            "data_path": str(data_path),
+            "rows": rows,
+            "shards": shards,
+        }
+        with open(tmp_dir / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        try:
+            tmp_dir.rename(output_dir)
+        except OSError:
+            # Another run finished the same dataset first
+            if not (output_dir / MANIFEST_FILE).exists():
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return output_dir
+
+
+def load_shards(shard_dir: Path) -> Tuple[List[str], np.ndarray]:
+    """
+    Read prepared shards back into memory
+
+    Args:
+        shard_dir: Directory returned by prepare_shards
+
+    Returns:
+        Preprocessed texts and labels
+    """
+    manifest = read_manifest(shard_dir)
+    frames = [pd.read_parquet(Path(shard_dir) / shard) for shard in manifest["shards"]]
+    if not frames:
+        return [], np.array([])
+
+    data = pd.concat(frames, ignore_index=True)
+    return data["text"].tolist(), data["label"].to_numpy()
+
+
+def read_manifest(shard_dir: Path) -> Dict:
+    """
+    Read the manifest of a prepared dataset
+
+    Args:
+        shard_dir: Directory returned by prepare_shards
+
+    Returns:
+        Manifest dictionary
+    """
+    with open(Path(shard_dir) / MANIFEST_FILE) as f:
+        return json.load(f)
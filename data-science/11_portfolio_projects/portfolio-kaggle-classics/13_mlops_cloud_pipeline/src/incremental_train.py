@@ -0,0 +1,366 @@
+"""
+Out-of-Core Incremental Training for Sentiment Analysis
+
+Trains a logistic-loss SGD classifier on hashed n-gram features with
+partial_fit, reading mini-batches from the Parquet shards written by
+data_prep.prepare_shards, so the corpus never has to fit in memory.
+Progress is checkpointed and training resumes from the last checkpoint.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+from bundle import save_artifacts
+from data_prep import read_manifest
+from preprocess import TextPreprocessor
+
+CHECKPOINT_FILE = "checkpoint.joblib"
+
+# (epoch, shard, batch) of a mini-batch
+Position = Tuple[int, int, int]
+
+
+class IncrementalSentimentTrainer:
+    """Train a sentiment model incrementally from prepared shards"""
+
+    def __init__(
+        self,
+        n_features=2**20,
+        ngram_range=(1, 2),
+        alpha=1e-5,
+        batch_size=10_000,
+        epochs=1,
+        validation_fraction=0.2,
+        random_state=42,
+        checkpoint_dir=None,
+        checkpoint_every=50,
+        preprocessor=None,
+    ):
+        """
+        Initialize trainer
+
+        Args:
+            n_features: Number of hashed features
+            ngram_range: N-gram range for the hashing vectorizer
+            alpha: L2 regularization strength for SGD
+            batch_size: Rows per partial_fit call
+            epochs: Passes over the training rows
+            validation_fraction: Share of each shard held out for evaluation
+            random_state: Random seed for hold-out, shuffling and SGD
+            checkpoint_dir: Directory for checkpoints (None disables them)
+            checkpoint_every: Mini-batches between checkpoints
+            preprocessor: Preprocessor the shards were prepared with, saved
+                with the model for inference (default: TextPreprocessor())
+        """
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.checkpoint_every = checkpoint_every
+        self.preprocessor = preprocessor or TextPreprocessor()
+
+        # Stateless, so it needs no fitting and no checkpointing
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=self.ngram_range,
+            alternate_sign=False,
+            norm="l2",
+        )
+        self.model = SGDClassifier(
+            loss="log_loss", alpha=alpha, random_state=random_state
+        )
+        self.classes = np.array([0, 1])
+        self.last_position: Optional[Position] = None
+        self.batches_seen = 0
+        self.samples_seen = 0
+
+    def get_config(self) -> Dict:
+        """
+        Settings a checkpoint must match to be resumed
+
+        Epochs are left out so a finished run can be resumed for more epochs.
+
+        Returns:
+            Dictionary of training settings
+        """
+        return {
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "alpha": self.alpha,
+            "batch_size": self.batch_size,
+            "validation_fraction": self.validation_fraction,
+            "random_state": self.random_state,
+        }
+
+    def holdout_mask(self, shard_index: int, n_rows: int) -> np.ndarray:
+        """
+        Rows of a shard held out for evaluation
+
+        Depends only on the seed and shard, so every pass, resumed run and
+        evaluation sees the same split.
+
+        Args:
+            shard_index: Index of the shard in the manifest
+            n_rows: Number of rows in the shard
+
+        Returns:
+            Boolean mask, True for hold-out rows
+        """
+        rng = np.random.default_rng([self.random_state, shard_index])
+        return rng.random(n_rows) < self.validation_fraction
+
+    def iter_batches(
+        self, shard_dir, after: Optional[Position] = None
+    ) -> Iterator[Tuple[Position, List[str], np.ndarray]]:
+        """
+        Stream shuffled training mini-batches from the shards
+
+        Args:
+            shard_dir: Directory written by prepare_shards
+            after: Skip batches up to and including this position
+
+        Yields:
+            Position, preprocessed texts and labels of each mini-batch
+        """
+        shards = read_manifest(shard_dir)["shards"]
+
+        for epoch in range(self.epochs):
+            for shard_index, shard in enumerate(shards):
+                if after is not None and (epoch, shard_index) < after[:2]:
+                    continue
+
+                data = pd.read_parquet(Path(shard_dir) / shard)
+                train = data[~self.holdout_mask(shard_index, len(data))]
+                rng = np.random.default_rng([self.random_state, epoch, shard_index])
+                order = rng.permutation(len(train))
+
+                for batch_index, start in enumerate(
+                    range(0, len(train), self.batch_size)
+                ):
+                    position = (epoch, shard_index, batch_index)
+                    if after is not None and position <= after:
+                        continue
+                    stop = start + self.batch_size
+                    rows = train.iloc[order[start:stop]]
+                    yield position, rows["text"].tolist(), rows["label"].to_numpy()
+
+    def fit(self, shard_dir):
+        """
+        Train on the shards, resuming from a checkpoint if one exists
+
+        Args:
+            shard_dir: Directory written by prepare_shards
+
+        Returns:
+            Trained model
+        """
+        fingerprint = read_manifest(shard_dir)["fingerprint"]
+        self.load_checkpoint(fingerprint)
+        if self.last_position is not None:
+            print(
+                f"Resuming after epoch {self.last_position[0]}, shard "
+                f"{self.last_position[1]}, batch {self.last_position[2]} "
+                f"({self.samples_seen} samples seen)"
+            )
+
+        print("Training SGD classifier on hashed features...")
+        for position, texts, labels in self.iter_batches(shard_dir, self.last_position):
+            X = self.vectorizer.transform(texts)
+            self.model.partial_fit(X, labels, classes=self.classes)
+
+            self.last_position = position
+            self.batches_seen += 1
+            self.samples_seen += len(labels)
+
+            if self.checkpoint_dir and self.batches_seen % self.checkpoint_every == 0:
+                self.save_checkpoint(fingerprint)
+                print(f"Checkpoint at {self.samples_seen} samples")
+
+        self.save_checkpoint(fingerprint)
+        print(f"Training complete! ({self.samples_seen} samples seen)")
+        return self.model
+
+    def evaluate(self, shard_dir) -> Dict:
+        """
+        Evaluate on the hold-out rows of every shard
+
+        Args:
+            shard_dir: Directory written by prepare_shards
+
+        Returns:
+            Dictionary of evaluation metrics
+        """
+        y_true = []
+        y_pred = []
+        for shard_index, shard in enumerate(read_manifest(shard_dir)["shards"]):
+            data = pd.read_parquet(Path(shard_dir) / shard)
+            val = data[self.holdout_mask(shard_index, len(data))]
+            if len(val):
+                X = self.vectorizer.transform(val["text"].tolist())
+                y_true.append(val["label"].to_numpy())
+                y_pred.append(self.model.predict(X))
+
+        if not y_true:
+            raise ValueError("No hold-out rows, set validation_fraction above 0")
+
+        y_true_all = np.concatenate(y_true)
+        y_pred_all = np.concatenate(y_pred)
+        metrics = {
+            "accuracy": accuracy_score(y_true_all, y_pred_all),
+            "f1_score": f1_score(y_true_all, y_pred_all, average="weighted"),
+        }
+
+        print(f"\nValidation Accuracy: {metrics['accuracy']:.4f}")
+        print(f"Validation F1 Score: {metrics['f1_score']:.4f}")
+        return metrics
+
+    def load_split(self, shard_dir):
+        """
+        Load the training and hold-out rows into memory
+
+        Uses the same split as fit and evaluate, for comparing against the
+        batch trainer on data that fits in memory.
+
+        Args:
+            shard_dir: Directory written by prepare_shards
+
+        Returns:
+            X_train, X_val, y_train, y_val
+        """
+        train_frames = []
+        val_frames = []
+        for shard_index, shard in enumerate(read_manifest(shard_dir)["shards"]):
+            data = pd.read_parquet(Path(shard_dir) / shard)
+            mask = self.holdout_mask(shard_index, len(data))
+            train_frames.append(data[~mask])
+            val_frames.append(data[mask])
+
+        train = pd.concat(train_frames, ignore_index=True)
+        val = pd.concat(val_frames, ignore_index=True)
+        return (
+            train["text"].tolist(),
+            val["text"].tolist(),
+            train["label"].to_numpy(),
+            val["label"].to_numpy(),
+        )
+
+    def compare_with_batch(self, shard_dir, max_features=5000) -> Dict:
+        """
+        Compare hold-out metrics with the in-memory TF-IDF + lbfgs trainer
+
+        Both models are scored on the same hold-out rows. The batch model is
+        trained on all training rows in memory, so use a sample that fits.
+
+        Args:
+            shard_dir: Directory written by prepare_shards
+            max_features: Maximum TF-IDF features for the batch trainer
+
+        Returns:
+            Metrics of both trainers and the accuracy gap (batch - incremental)
+        """
+        from train import SentimentModelTrainer
+
+        X_train, X_val, y_train, y_val = self.load_split(shard_dir)
+
+        print("Training batch baseline...")
+        baseline = SentimentModelTrainer(
+            max_features=max_features, random_state=self.random_state
+        )
+        baseline.train(X_train, y_train)
+        batch_metrics = baseline.evaluate(X_val, y_val)
+
+        print("Evaluating incremental model...")
+        incremental_metrics = self.evaluate(shard_dir)
+
+        comparison = {
+            "incremental": incremental_metrics,
+            "batch": batch_metrics,
+            "accuracy_gap": batch_metrics["accuracy"] - incremental_metrics["accuracy"],
+        }
+        print(f"Accuracy gap (batch - incremental): {comparison['accuracy_gap']:+.4f}")
+        return comparison
+
+    def save_checkpoint(self, fingerprint: str):
+        """
+        Write the model and training position
+
+        The file is replaced atomically, so a crash mid-write keeps the
+        previous checkpoint.
+
+        Args:
+            fingerprint: Fingerprint of the prepared dataset
+        """
+        if self.checkpoint_dir is None:
+            return
+
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        state = {
+            "fingerprint": fingerprint,
+            "config": self.get_config(),
+            "model": self.model,
+            "last_position": self.last_position,
+            "batches_seen": self.batches_seen,
+            "samples_seen": self.samples_seen,
+        }
+        path = self.checkpoint_dir / CHECKPOINT_FILE
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, fingerprint: str) -> bool:
+        """
+        Restore the model and training position from the checkpoint
+
+        Args:
+            fingerprint: Fingerprint of the prepared dataset
+
+        Returns:
+            True if a checkpoint was loaded
+        """
+        if self.checkpoint_dir is None:
+            return False
+
+        path = self.checkpoint_dir / CHECKPOINT_FILE
+        if not path.exists():
+            return False
+
+        state = joblib.load(path)
+        if state["fingerprint"] != fingerprint or state["config"] != self.get_config():
+            raise ValueError(
+                f"Checkpoint {path} was written for other data or settings; "
+                "remove it or use another checkpoint directory"
+            )
+
+        self.model = state["model"]
+        self.last_position = state["last_position"]
+        self.batches_seen = state["batches_seen"]
+        self.samples_seen = state["samples_seen"]
+        return True
+
+    def save_model(self, output_path, legacy_pickles=False):
+        """
+        Save model artifacts in the format the inference endpoint loads
+
+        Args:
+            output_path: Directory to save model files
+            legacy_pickles: Also write the pickles older endpoints load
+        """
+        save_artifacts(
+            output_path,
+            self.vectorizer,
+            self.model,
+            self.preprocessor,
+            legacy_pickles=legacy_pickles,
+        )
@@ -5,6 +5,7 @@ This script provides the Flask app for serving predictions
 via SageMaker endpoints.
 """
 
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -13,23 +14,57 @@ import joblib
 import numpy as np
 from flask import Flask, request, jsonify
 
+from bundle import BUNDLE_FILE, load_bundle
+from cache import PredictionCache, cache_key
 from preprocess import TextPreprocessor
+from scorer import LinearScorer
+
+ARTIFACT_FILES = ("model.pkl", "vectorizer.pkl", "preprocessor.pkl")
+
+
+def artifact_version(model_path):
+    """
+    Content hash of the legacy pickle artifacts
+
+    Args:
+        model_path: Path to model artifacts directory
+
+    Returns:
+        First 16 hex characters of the SHA-256 over all artifact files
+    """
+    digest = hashlib.sha256()
+    for name in ARTIFACT_FILES:
+        with open(Path(model_path) / name, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
 
 
 class SentimentPredictor:
     """Sentiment prediction handler"""
 
-    def __init__(self, model_path="/opt/ml/model"):
+    def __init__(self, model_path="/opt/ml/model", cache_size=None, fast_scorer=True):
         """
         Initialize predictor
 
         Args:
             model_path: Path to model artifacts directory
+            cache_size: Maximum cached predictions, 0 disables caching
+                (default: PREDICTION_CACHE_SIZE env var or 10000)
+            fast_scorer: Score linear models with LinearScorer instead of
+                building a sparse matrix, when the model supports it
         """
+        if cache_size is None:
+            cache_size = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+
         self.model_path = Path(model_path)
         self.model = None
         self.vectorizer = None
         self.preprocessor = None
+        self.fast_scorer = fast_scorer
+        self.scorer = None
+        self.artifact_version = None
+        self.cache = PredictionCache(max_entries=cache_size)
         self.loaded = False
 
     def load_model(self):
@@ -40,20 +75,31 @@ class SentimentPredictor:
         print(f"Loading model from {self.model_path}")
 
         try:
-            # Load model
-            model_file = self.model_path / "model.pkl"
-            self.model = joblib.load(model_file)
-            print(f"Loaded model from {model_file}")
+            bundle_file = self.model_path / BUNDLE_FILE
+            if bundle_file.exists():
+                # Load single-file bundle (checksum verified)
+                bundle = load_bundle(bundle_file)
+                self.model = bundle.model
+                self.preprocessor = bundle.preprocessor
+                self.artifact_version = bundle.checksum[:16]
+                print(f"Loaded bundle from {bundle_file}")
+                if self.fast_scorer:
+                    self.scorer = LinearScorer.from_bundle(bundle)
+                # The scorer reads the bundle's arrays directly; only the
+                # scikit-learn path needs the vectorizer's vocabulary dict
+                if self.scorer is None:
+                    self.vectorizer = bundle.vectorizer
+            else:
+                self.load_pickles()
+                if self.fast_scorer:
+                    self.scorer = LinearScorer.from_model(self.vectorizer, self.model)
 
-            # Load vectorizer
-            vectorizer_file = self.model_path / "vectorizer.pkl"
-            self.vectorizer = joblib.load(vectorizer_file)
-            print(f"Loaded vectorizer from {vectorizer_file}")
+            if self.fast_scorer:
+                print(f"Fast scorer {'enabled' if self.scorer else 'not supported'}")
 
-            # Load preprocessor
-            preprocessor_file = self.model_path / "preprocessor.pkl"
-            self.preprocessor = joblib.load(preprocessor_file)
-            print(f"Loaded preprocessor from {preprocessor_file}")
+            # Cached predictions are only valid for these exact artifacts
+            self.cache.clear()
+            print(f"Artifact version {self.artifact_version}")
 
             self.loaded = True
             print("Model loaded successfully!")
@@ -62,6 +108,25 @@ class SentimentPredictor:
             print(f"Error loading model: {e}")
             raise
 
+    def load_pickles(self):
+        """Load the per-component pickles written before the bundle format"""
+        # Load model
+        model_file = self.model_path / "model.pkl"
+        self.model = joblib.load(model_file)
+        print(f"Loaded model from {model_file}")
+
+        # Load vectorizer
+        vectorizer_file = self.model_path / "vectorizer.pkl"
+        self.vectorizer = joblib.load(vectorizer_file)
+        print(f"Loaded vectorizer from {vectorizer_file}")
+
+        # Load preprocessor
+        preprocessor_file = self.model_path / "preprocessor.pkl"
+        self.preprocessor = joblib.load(preprocessor_file)
+        print(f"Loaded preprocessor from {preprocessor_file}")
+
+        self.artifact_version = artifact_version(self.model_path)
+
     def predict(self, text):
         """
         Make prediction on input text
@@ -72,41 +137,17 @@ class SentimentPredictor:
         Returns:
             Dictionary with prediction and confidence
         """
-        # Ensure model is loaded
-        if not self.loaded:
-            self.load_model()
-
-        # Preprocess text
-        processed_text = self.preprocessor.preprocess(text)
-
-        # Vectorize
-        X = self.vectorizer.transform([processed_text])
-
-        # Predict
-        prediction = self.model.predict(X)[0]
-        probabilities = self.model.predict_proba(X)[0]
-
-        # Get confidence (probability of predicted class)
-        confidence = float(probabilities[prediction])
-
-        # Map prediction to label
-        label = "positive" if prediction == 1 else "negative"
-
-        result = {
-            "prediction": label,
-            "confidence": confidence,
-            "probabilities": {
-                "negative": float(probabilities[0]),
-                "positive": float(probabilities[1]),
-            },
-        }
-
-        return result
+        return self.predict_batch([text])[0]
 
     def predict_batch(self, texts):
         """
         Make predictions on batch of texts
 
+        Texts seen before with the same artifacts are answered from the
+        cache. The rest, without duplicates, are preprocessed, vectorized
+        and scored, with the fast scorer when available and otherwise in one
+        vectorizer/model call.
+
         Args:
             texts: List of input texts
 
@@ -117,33 +158,66 @@ class SentimentPredictor:
         if not self.loaded:
             self.load_model()
 
-        # Preprocess texts
-        processed_texts = [self.preprocessor.preprocess(text) for text in texts]
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        keys = [cache_key(text, self.artifact_version) for text in texts]
+
+        # Look up cache, collecting each missing text once
+        probabilities = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in probabilities or key in missing:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                missing[key] = text
+            else:
+                probabilities[key] = cached
 
-        # Vectorize
-        X = self.vectorizer.transform(processed_texts)
+        if missing:
+            # Preprocess texts
+            processed_texts = self.preprocessor.preprocess_batch(missing.values())
 
-        # Predict
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+            if self.scorer is not None:
+                # Score term weights directly, one pass per text
+                rows = self.scorer.predict_proba(processed_texts)
+            else:
+                # Vectorize and predict
+                X = self.vectorizer.transform(processed_texts)
+                rows = [
+                    tuple(float(p) for p in row) for row in self.model.predict_proba(X)
+                ]
 
-        # Format results
-        results = []
-        for i, pred in enumerate(predictions):
-            label = "positive" if pred == 1 else "negative"
-            confidence = float(probabilities[i][pred])
+            for key, row in zip(missing, rows):
+                probabilities[key] = row
+                self.cache.put(key, row)
 
-            result = {
-                "prediction": label,
-                "confidence": confidence,
-                "probabilities": {
-                    "negative": float(probabilities[i][0]),
-                    "positive": float(probabilities[i][1]),
-                },
-            }
-            results.append(result)
+        return [self._format_result(probabilities[key]) for key in keys]
 
-        return results
+    @staticmethod
+    def _format_result(probabilities):
+        """
+        Build the response for one text
+
+        Args:
+            probabilities: Class probabilities (negative, positive)
+
+        Returns:
+            Prediction dictionary
+        """
+        # Predicted class is the most probable one, as in model.predict
+        prediction = int(np.argmax(probabilities))
+
+        # Map prediction to label
+        label = "positive" if prediction == 1 else "negative"
+
+        return {
+            "prediction": label,
+            "confidence": probabilities[prediction],
+            "probabilities": {
+                "negative": probabilities[0],
+                "positive": probabilities[1],
+            },
+        }
 
 
 # ==================== Flask App for SageMaker ====================
@@ -168,7 +242,11 @@ def ping():
             predictor.load_model()
 
         status = 200
-        response = {"status": "healthy"}
+        response = {
+            "status": "healthy",
+            "artifact_version": predictor.artifact_version,
+            "cache": predictor.cache.stats(),
+        }
     except Exception as e:
         status = 500
         response = {"status": "unhealthy", "error": str(e)}
@@ -4,13 +4,158 @@ Text Preprocessing for Sentiment Analysis
 Handles cleaning, normalization, and preparation of text data
 """
 
+import os
 import re
 import string
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
 
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+
+# Bump when a change to the pipeline changes its output, to invalidate caches
+# of preprocessed data
+PREPROCESS_VERSION = 2
+
+# Patterns are compiled once at import instead of on every call
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+HTML_PATTERN = re.compile(r"<.*?>")
+MENTION_PATTERN = re.compile(r"@\w+")
+HASHTAG_PATTERN = re.compile(r"#\w+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+NUMBER_PATTERN = re.compile(r"\d+")
+
+# Mentions and hashtags removed in a single scan. This matches the two
+# sequential passes, as removing a mention never leaves a new hashtag behind.
+# URLs and HTML keep their own passes: a URL inside a tag attribute, or a tag
+# inside a hashtag, is cut differently when they are combined.
+MENTION_HASHTAG_PATTERN = re.compile(r"@\w+|#\w+")
+
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+PUNCTUATION_TABLE_KEEP_APOSTROPHES = str.maketrans(
+    "", "", string.punctuation.replace("'", "")
+)
+
+CONTRACTIONS = {
+    "ain't": "am not",
+    "aren't": "are not",
+    "can't": "cannot",
+    "can't've": "cannot have",
+    "could've": "could have",
+    "couldn't": "could not",
+    "didn't": "did not",
+    "doesn't": "does not",
+    "don't": "do not",
+    "hadn't": "had not",
+    "hasn't": "has not",
+    "haven't": "have not",
+    "he'd": "he would",
+    "he'll": "he will",
+    "he's": "he is",
+    "i'd": "i would",
+    "i'll": "i will",
+    "i'm": "i am",
+    "i've": "i have",
+    "isn't": "is not",
+    "it'd": "it would",
+    "it'll": "it will",
+    "it's": "it is",
+    "let's": "let us",
+    "shouldn't": "should not",
+    "that's": "that is",
+    "there's": "there is",
+    "they'd": "they would",
+    "they'll": "they will",
+    "they're": "they are",
+    "they've": "they have",
+    "wasn't": "was not",
+    "we'd": "we would",
+    "we'll": "we will",
+    "we're": "we are",
+    "we've": "we have",
+    "weren't": "were not",
+    "what's": "what is",
+    "won't": "will not",
+    "wouldn't": "would not",
+    "you'd": "you would",
+    "you'll": "you will",
+    "you're": "you are",
+    "you've": "you have",
+}
+
+# Without sentence-ending punctuation word_tokenize sees a single sentence, so
+# only the Treebank tokenizer applies. Apart from ASCII punctuation the only
+# characters it acts on are some Unicode quotes and dashes, which it splits off
+# as tokens (checked against the installed NLTK, as the set varies by version),
+# and the CONTRACTIONS2 words (cannot -> can not, ...), which never overlap and
+# so can be split in a single pass.
+TREEBANK_TOKENIZER = NLTKWordTokenizer()
+ASCII_PUNCTUATION_PATTERN = re.compile("[" + re.escape(string.punctuation) + "]")
+TREEBANK_ISOLATED = "".join(
+    char
+    for char in "«»“”‘’„\u2012\u2013\u2014\u2015"
+    if TREEBANK_TOKENIZER.tokenize(f"a{char}b") == ["a", char, "b"]
+)
+TREEBANK_ISOLATED_PATTERN = re.compile(
+    f"[{TREEBANK_ISOLATED}]" if TREEBANK_ISOLATED else "(?!)"
+)
+TREEBANK_SPLIT_PATTERN = re.compile(
+    "|".join(
+        regexp.pattern.replace("(?i)", "", 1)
+        for regexp in NLTKWordTokenizer.CONTRACTIONS2
+    ),
+    re.IGNORECASE,
+)
+
+
+def split_plain_text(text: str) -> Optional[List[str]]:
+    """
+    Tokenize text without ASCII punctuation the way word_tokenize would
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens, or None if the text has ASCII punctuation
+    """
+    if ASCII_PUNCTUATION_PATTERN.search(text):
+        return None
+    if TREEBANK_ISOLATED_PATTERN.search(text):
+        text = TREEBANK_ISOLATED_PATTERN.sub(r" \g<0> ", text)
+
+    # Same padding as the Treebank tokenizer, "wanna" needs whitespace after it
+    text = TREEBANK_SPLIT_PATTERN.sub(_split_contraction, f" {text} ")
+    return text.split()
+
+
+def _split_contraction(match: re.Match) -> str:
+    """Split a CONTRACTIONS2 match into its two groups"""
+    first, second = [group for group in match.groups() if group is not None]
+    return f" {first} {second} "
+
+
+def fast_tokenize(text: str) -> List[str]:
+    """
+    Tokenize text, matching NLTK's word_tokenize
+
+    Text without punctuation (the output of the cleaning steps in preprocess)
+    is split on whitespace after applying the Treebank contraction splits,
+    skipping sentence splitting. Anything else goes to word_tokenize, so the
+    result is always NLTK's.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    tokens = split_plain_text(text)
+    if tokens is None:
+        return word_tokenize(text)
+    return tokens
 
 
 class TextPreprocessor:
@@ -61,6 +206,50 @@ class TextPreprocessor:
         else:
             self.stopwords = set()
 
+    def get_config(self) -> Dict:
+        """
+        Settings that determine the preprocessed output
+
+        Returns:
+            Dictionary of pipeline version, options and stopwords
+        """
+        return {
+            "version": PREPROCESS_VERSION,
+            "lowercase": self.lowercase,
+            "remove_stopwords": self.remove_stopwords,
+            "remove_numbers": self.remove_numbers,
+            "stopwords": sorted(self.stopwords),
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "TextPreprocessor":
+        """
+        Rebuild a preprocessor from get_config output
+
+        The stopwords come from the config, so NLTK's corpora are not loaded.
+
+        Args:
+            config: Dictionary returned by get_config
+
+        Returns:
+            TextPreprocessor
+
+        Raises:
+            ValueError: If the config is from another pipeline version
+        """
+        if config["version"] != PREPROCESS_VERSION:
+            raise ValueError(
+                f"Preprocessing version {config['version']} does not match "
+                f"this code ({PREPROCESS_VERSION})"
+            )
+
+        preprocessor = cls.__new__(cls)
+        preprocessor.lowercase = config["lowercase"]
+        preprocessor.remove_stopwords = config["remove_stopwords"]
+        preprocessor.remove_numbers = config["remove_numbers"]
+        preprocessor.stopwords = set(config["stopwords"])
+        return preprocessor
+
     def remove_urls(self, text: str) -> str:
         """
         Remove URLs from text
@@ -71,8 +260,7 @@ class TextPreprocessor:
         Returns:
             Text with URLs removed
         """
-        url_pattern = r"https?://\S+|www\.\S+"
-        return re.sub(url_pattern, "", text)
+        return URL_PATTERN.sub("", text)
 
     def remove_html_tags(self, text: str) -> str:
         """
@@ -84,8 +272,7 @@ class TextPreprocessor:
         Returns:
             Text with HTML tags removed
         """
-        html_pattern = r"<.*?>"
-        return re.sub(html_pattern, "", text)
+        return HTML_PATTERN.sub("", text)
 
     def remove_mentions_hashtags(self, text: str) -> str:
         """
@@ -97,8 +284,8 @@ class TextPreprocessor:
         Returns:
             Text with mentions and hashtags removed
         """
-        text = re.sub(r"@\w+", "", text)
-        text = re.sub(r"#\w+", "", text)
+        text = MENTION_PATTERN.sub("", text)
+        text = HASHTAG_PATTERN.sub("", text)
         return text
 
     def remove_extra_whitespace(self, text: str) -> str:
@@ -111,7 +298,7 @@ class TextPreprocessor:
         Returns:
             Text with normalized whitespace
         """
-        text = re.sub(r"\s+", " ", text)
+        text = WHITESPACE_PATTERN.sub(" ", text)
         return text.strip()
 
     def remove_punctuation(self, text: str, keep_apostrophes=True) -> str:
@@ -127,11 +314,8 @@ class TextPreprocessor:
         """
         if keep_apostrophes:
             # Keep apostrophes for contractions (don't, isn't, etc.)
-            punct = string.punctuation.replace("'", "")
-        else:
-            punct = string.punctuation
-
-        return text.translate(str.maketrans("", "", punct))
+            return text.translate(PUNCTUATION_TABLE_KEEP_APOSTROPHES)
+        return text.translate(PUNCTUATION_TABLE)
 
     def expand_contractions(self, text: str) -> str:
         """
@@ -143,64 +327,7 @@ class TextPreprocessor:
         Returns:
             Text with contractions expanded
         """
-        contractions = {
-            "ain't": "am not",
-            "aren't": "are not",
-            "can't": "cannot",
-            "can't've": "cannot have",
-            "could've": "could have",
-            "couldn't": "could not",
-            "didn't": "did not",
-            "doesn't": "does not",
-            "don't": "do not",
-            "hadn't": "had not",
-            "hasn't": "has not",
-            "haven't": "have not",
-            "he'd": "he would",
-            "he'll": "he will",
-            "he's": "he is",
-            "i'd": "i would",
-            "i'll": "i will",
-            "i'm": "i am",
-            "i've": "i have",
-            "isn't": "is not",
-            "it'd": "it would",
-            "it'll": "it will",
-            "it's": "it is",
-            "let's": "let us",
-            "shouldn't": "should not",
-            "that's": "that is",
-            "there's": "there is",
-            "they'd": "they would",
-            "they'll": "they will",
-            "they're": "they are",
-            "they've": "they have",
-            "wasn't": "was not",
-            "we'd": "we would",
-            "we'll": "we will",
-            "we're": "we are",
-            "we've": "we have",
-            "weren't": "were not",
-            "what's": "what is",
-            "won't": "will not",
-            "wouldn't": "would not",
-            "you'd": "you would",
-            "you'll": "you will",
-            "you're": "you are",
-            "you've": "you have",
-        }
-
-        words = text.split()
-        expanded_words = []
-
-        for word in words:
-            word_lower = word.lower()
-            if word_lower in contractions:
-                expanded_words.append(contractions[word_lower])
-            else:
-                expanded_words.append(word)
-
-        return " ".join(expanded_words)
+        return " ".join(CONTRACTIONS.get(word.lower(), word) for word in text.split())
 
     def tokenize(self, text: str) -> List[str]:
         """
@@ -212,7 +339,7 @@ class TextPreprocessor:
         Returns:
             List of tokens
         """
-        return word_tokenize(text)
+        return fast_tokenize(text)
 
     def remove_stopwords_from_tokens(self, tokens: List[str]) -> List[str]:
         """
@@ -230,6 +357,63 @@ class TextPreprocessor:
         """
         Complete preprocessing pipeline
 
+        Produces the same output as preprocess_reference, with one regex scan
+        for mentions and hashtags and a whitespace split in place of NLTK
+        tokenization for plain text.
+
+        Args:
+            text: Raw input text
+
+        Returns:
+            Preprocessed text
+        """
+        if not isinstance(text, str):
+            text = str(text)
+
+        # Remove URLs, then HTML, then mentions and hashtags, in the
+        # reference order
+        text = URL_PATTERN.sub("", text)
+        text = HTML_PATTERN.sub("", text)
+        text = MENTION_HASHTAG_PATTERN.sub("", text)
+
+        # Expand contractions (every contraction has an apostrophe)
+        if "'" in text:
+            text = " ".join(
+                CONTRACTIONS.get(word.lower(), word) for word in text.split()
+            )
+
+        # Convert to lowercase
+        if self.lowercase:
+            text = text.lower()
+
+        # Remove punctuation
+        text = text.translate(PUNCTUATION_TABLE)
+
+        # Remove numbers if specified
+        if self.remove_numbers:
+            text = NUMBER_PATTERN.sub("", text)
+
+        # Tokenize (splitting on whitespace also normalizes it)
+        tokens = split_plain_text(text)
+        if tokens is None:
+            tokens = word_tokenize(self.remove_extra_whitespace(text))
+
+        # Remove stopwords
+        if self.remove_stopwords:
+            if self.lowercase:
+                tokens = [token for token in tokens if token not in self.stopwords]
+            else:
+                tokens = self.remove_stopwords_from_tokens(tokens)
+
+        # Join tokens back into string
+        return " ".join(tokens)
+
+    def preprocess_reference(self, text: str) -> str:
+        """
+        Step-by-step preprocessing pipeline using NLTK's word_tokenize
+
+        Kept as the reference preprocess is checked and benchmarked against.
+
         Args:
             text: Raw input text
 
@@ -258,34 +442,100 @@ class TextPreprocessor:
 
         # Remove numbers if specified
         if self.remove_numbers:
-            text = re.sub(r"\d+", "", text)
+            text = NUMBER_PATTERN.sub("", text)
 
         # Remove extra whitespace
         text = self.remove_extra_whitespace(text)
 
         # Tokenize
-        tokens = self.tokenize(text)
+        tokens = word_tokenize(text)
 
         # Remove stopwords
         if self.remove_stopwords:
             tokens = self.remove_stopwords_from_tokens(tokens)
 
         # Join tokens back into string
-        text = " ".join(tokens)
+        return " ".join(tokens)
 
-        return text
+    def preprocess_stream(
+        self, texts: Iterable[str], n_jobs: int = 1, chunk_size: int = 1000
+    ) -> Iterator[str]:
+        """
+        Preprocess texts lazily, in input order
+
+        With n_jobs > 1 chunks of texts are processed in worker processes.
+        At most two chunks per worker are in flight, so memory stays bounded
+        for inputs that do not fit in memory.
 
-    def preprocess_batch(self, texts: List[str]) -> List[str]:
+        Args:
+            texts: Iterable of raw texts
+            n_jobs: Number of worker processes (-1 for all CPUs)
+            chunk_size: Texts sent to a worker at a time
+
+        Yields:
+            Preprocessed texts
+        """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+
+        if n_jobs <= 1:
+            for text in texts:
+                yield self.preprocess(text)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            pending: deque = deque()
+            for chunk in _chunked(texts, chunk_size):
+                pending.append(executor.submit(_preprocess_chunk, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def preprocess_batch(
+        self, texts: Iterable[str], n_jobs: int = 1, chunk_size: int = 1000
+    ) -> List[str]:
         """
         Preprocess batch of texts
 
         Args:
-            texts: List of raw texts
+            texts: Iterable of raw texts
+            n_jobs: Number of worker processes (-1 for all CPUs)
+            chunk_size: Texts sent to a worker at a time
 
         Returns:
             List of preprocessed texts
         """
-        return [self.preprocess(text) for text in texts]
+        return list(self.preprocess_stream(texts, n_jobs=n_jobs, chunk_size=chunk_size))
+
+
+# ==================== Parallel batches ====================
+
+_worker_preprocessor: Optional["TextPreprocessor"] = None
+
+
+def _init_worker(preprocessor: "TextPreprocessor") -> None:
+    """Keep one preprocessor per worker process"""
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+
+
+def _preprocess_chunk(texts: List[str]) -> List[str]:
+    """Preprocess a chunk of texts in a worker process"""
+    assert _worker_preprocessor is not None
+    return [_worker_preprocessor.preprocess(text) for text in texts]
+
+
+def _chunked(texts: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Yield lists of up to chunk_size texts"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 
 # ==================== Testing ====================
@@ -0,0 +1,292 @@
+"""
+Fast Scorer for Linear Text Models
+
+Scores one preprocessed document at a time against a fitted TF-IDF or
+hashing vectorizer and a binary logistic model without building a sparse
+matrix. Terms are looked up in the vectorizer's vocabulary (or a bundle's
+memory-mapped sorted vocabulary) and weighted by coefficient arrays with
+the IDF folded in, so the logit, label and probability come from a single
+pass over the document's n-grams, and building a scorer does no per-term
+Python work.
+"""
+
+import math
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.special import expit
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.utils import murmurhash3_32
+
+# Terms -> column per term (None when not in the vocabulary)
+ColumnLookup = Callable[[Sequence[str]], List[Optional[int]]]
+
+
+class LinearScorer:
+    """Score documents with a binary linear model, one pass per document"""
+
+    def __init__(
+        self,
+        analyzer,
+        intercept: float,
+        classes,
+        vocabulary=None,
+        folded: Optional[Sequence[float]] = None,
+        idf: Optional[Sequence[float]] = None,
+        coef: Optional[List[float]] = None,
+        n_features: int = 0,
+        alternate_sign: bool = False,
+        binary: bool = False,
+        sublinear_tf: bool = False,
+        norm: Optional[str] = "l2",
+    ):
+        """
+        Initialize scorer
+
+        Use from_model to build one from fitted scikit-learn components, or
+        from_bundle to build one from a loaded model bundle.
+
+        Args:
+            analyzer: Callable turning a document into its n-grams
+            intercept: Model intercept
+            classes: The two class labels, negative first
+            vocabulary: Term -> column mapping with get(), or an object with
+                a columns(terms) batch lookup (TF-IDF vectorizers)
+            folded: Coefficient x IDF per column, a list or array (TF-IDF
+                vectorizers)
+            idf: IDF per column, a list or array (TF-IDF vectorizers)
+            coef: Coefficient per hashed feature (hashing vectorizers)
+            n_features: Number of hashed features
+            alternate_sign: Whether hashed features carry a sign
+            binary: Count each n-gram at most once
+            sublinear_tf: Use 1 + log(tf) in place of tf
+            norm: Row normalization ("l2", "l1" or None)
+        """
+        self.analyzer = analyzer
+        self.intercept = intercept
+        self.classes = list(classes)
+        self.vocabulary = vocabulary
+        self.folded = folded
+        self.idf = idf
+        self._columns: Optional[ColumnLookup] = None
+        if vocabulary is not None:
+            self._columns = getattr(vocabulary, "columns", None) or (
+                lambda terms: [vocabulary.get(term) for term in terms]
+            )
+        self.coef = coef
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+    @classmethod
+    def from_model(cls, vectorizer, model) -> Optional["LinearScorer"]:
+        """
+        Build a scorer from a fitted vectorizer and model
+
+        Args:
+            vectorizer: Fitted TfidfVectorizer or HashingVectorizer
+            model: Fitted binary LogisticRegression, or SGDClassifier with log loss
+
+        Returns:
+            LinearScorer, or None if the components are not supported and
+            must be scored through scikit-learn
+        """
+        if not _is_binary_logistic(model) or vectorizer.dtype != np.float64:
+            return None
+        if vectorizer.norm not in ("l2", "l1", None):
+            return None
+
+        coef = np.asarray(model.coef_, dtype=np.float64)[0]
+        settings = {
+            "analyzer": vectorizer.build_analyzer(),
+            "intercept": float(model.intercept_[0]),
+            "classes": model.classes_,
+            "binary": vectorizer.binary,
+            "norm": vectorizer.norm,
+        }
+
+        if isinstance(vectorizer, TfidfVectorizer):
+            if vectorizer.use_idf:
+                idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+            else:
+                idf = np.ones(len(vectorizer.vocabulary_))
+            return cls(
+                vocabulary=vectorizer.vocabulary_,
+                folded=(coef * idf).tolist(),
+                idf=idf.tolist(),
+                sublinear_tf=vectorizer.sublinear_tf,
+                **settings,
+            )
+
+        if isinstance(vectorizer, HashingVectorizer):
+            # Binary features with signs can cancel to explicit zeros that
+            # scikit-learn then counts, which a term table cannot mirror
+            if vectorizer.binary and vectorizer.alternate_sign:
+                return None
+            return cls(
+                coef=coef.tolist(),
+                n_features=vectorizer.n_features,
+                alternate_sign=vectorizer.alternate_sign,
+                **settings,
+            )
+
+        return None
+
+    @classmethod
+    def from_bundle(cls, bundle) -> Optional["LinearScorer"]:
+        """
+        Build a scorer from a loaded model bundle
+
+        Scores straight from the bundle's memory-mapped arrays: terms are
+        looked up in its sorted vocabulary, so the scikit-learn vocabulary
+        dict is never built.
+
+        Args:
+            bundle: ModelBundle from load_bundle
+
+        Returns:
+            LinearScorer, or None if the bundle must be scored through
+            scikit-learn
+        """
+        settings = bundle.header["vectorizer"]
+        if settings["norm"] not in ("l2", "l1", None):
+            return None
+
+        # Bundles only hold binary logistic models (see save_bundle)
+        coef = np.asarray(bundle.coef, dtype=np.float64)
+        common = {
+            "analyzer": bundle.build_analyzer(),
+            "intercept": bundle.intercept,
+            "classes": bundle.header["model"]["classes"],
+            "binary": settings["binary"],
+            "norm": settings["norm"],
+        }
+
+        if settings["type"] == "tfidf":
+            idf = np.asarray(bundle.idf, dtype=np.float64)
+            return cls(
+                vocabulary=bundle.vocabulary,
+                folded=coef * idf,
+                idf=idf,
+                sublinear_tf=settings["sublinear_tf"],
+                **common,
+            )
+
+        if settings["binary"] and settings["alternate_sign"]:
+            return None
+        return cls(
+            coef=coef.tolist(),
+            n_features=settings["n_features"],
+            alternate_sign=settings["alternate_sign"],
+            **common,
+        )
+
+    def features(self, document: str) -> Tuple[List[float], List[float]]:
+        """
+        Non-zero feature values of a document before normalization
+
+        Args:
+            document: Preprocessed text
+
+        Returns:
+            Feature values and the matching (folded) coefficients
+        """
+        counts = Counter(self.analyzer(document))
+        values = []
+        weights = []
+
+        if self._columns is not None:
+            folded, idf = self.folded, self.idf
+            for count, column in zip(counts.values(), self._columns(list(counts))):
+                if column is None:
+                    continue
+                tf = 1.0 if self.binary else float(count)
+                if self.sublinear_tf:
+                    tf = math.log(tf) + 1.0
+                values.append(tf * idf[column])
+                weights.append(tf * folded[column])
+            return values, weights
+
+        # Hashed features: n-grams colliding in one column are summed first
+        coef = self.coef or []
+        columns: Dict[int, float] = {}
+        for term, count in counts.items():
+            h = murmurhash3_32(term, seed=0)
+            if h == -(2**31):
+                column = (2**31 - 1 - (self.n_features - 1)) % self.n_features
+            else:
+                column = abs(h) % self.n_features
+            sign = -1.0 if self.alternate_sign and h < 0 else 1.0
+            columns[column] = columns.get(column, 0.0) + sign * count
+
+        for column, value in columns.items():
+            if self.binary:
+                value = 1.0
+            values.append(value)
+            weights.append(value * coef[column])
+        return values, weights
+
+    def decision(self, document: str) -> float:
+        """
+        Logit of the positive class
+
+        Args:
+            document: Preprocessed text
+
+        Returns:
+            Decision function value, as model.decision_function
+        """
+        values, weights = self.features(document)
+        dot = math.fsum(weights)
+        if self.norm == "l2":
+            scale = math.sqrt(math.fsum(value * value for value in values))
+        elif self.norm == "l1":
+            scale = math.fsum(abs(value) for value in values)
+        else:
+            scale = 1.0
+        if scale > 0.0:
+            dot /= scale
+        return dot + self.intercept
+
+    def score(self, document: str) -> Tuple[object, Tuple[float, float]]:
+        """
+        Label and class probabilities of one document
+
+        Args:
+            document: Preprocessed text
+
+        Returns:
+            Predicted class label and (negative, positive) probabilities
+        """
+        decision = self.decision(document)
+        positive = float(expit(decision))
+        label = self.classes[1] if decision > 0 else self.classes[0]
+        return label, (1.0 - positive, positive)
+
+    def predict_proba(self, documents) -> List[Tuple[float, float]]:
+        """
+        Class probabilities of preprocessed documents
+
+        Args:
+            documents: Iterable of preprocessed texts
+
+        Returns:
+            (negative, positive) probabilities per document
+        """
+        return [self.score(document)[1] for document in documents]
+
+
+def _is_binary_logistic(model) -> bool:
+    """Whether predict_proba is expit of a single linear decision function"""
+    if len(getattr(model, "classes_", ())) != 2:
+        return False
+    if isinstance(model, SGDClassifier):
+        return model.loss == "log_loss"
+    if isinstance(model, LogisticRegression):
+        # Binary multinomial fits put a softmax over (-logit, logit) instead
+        return getattr(model, "multi_class", "auto") != "multinomial"
+    return False
@@ -0,0 +1,337 @@
+"""
+S3 Transfers for Training Data and Model Artifacts
+
+Wraps boto3 managed transfers for the training jobs:
+- Concurrent multipart uploads and downloads
+- Uploads skipped when the object already holds the file's SHA-256
+- CSV and Parquet objects read in chunks through ranged GETs
+- An optional local read-through cache keyed by the object's ETag
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import boto3
+import pandas as pd
+import pyarrow.parquet as pq
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from data_prep import file_sha256
+
+# Object metadata holding the SHA-256 of the uploaded file
+HASH_METADATA = "sha256"
+ARTIFACT_PATTERNS = ("*.bundle", "*.pkl")
+
+
+def parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """
+    Split an S3 URI into bucket and key
+
+    Args:
+        uri: URI of the form s3://bucket/key
+
+    Returns:
+        Bucket and key
+    """
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Not an S3 URI: {uri}")
+    bucket, _, key = uri.split("://", 1)[1].partition("/")
+    return bucket, key
+
+
+class S3ObjectReader(io.RawIOBase):
+    """Seekable, read-only file over an S3 object, fetched with ranged GETs"""
+
+    def __init__(self, client, bucket: str, key: str):
+        """
+        Initialize reader
+
+        Args:
+            client: boto3 S3 client
+            bucket: Bucket name
+            key: Object key
+        """
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        head = client.head_object(Bucket=bucket, Key=key)
+        self.size = head["ContentLength"]
+        self.etag = head["ETag"]
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size or not len(buffer):
+            return 0
+
+        stop = min(self.position + len(buffer), self.size) - 1
+        # IfMatch fails the read if the object is replaced mid-stream
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Range=f"bytes={self.position}-{stop}",
+            IfMatch=self.etag,
+        )
+        data = response["Body"].read()
+        n = len(data)
+        buffer[:n] = data
+        self.position += n
+        return n
+
+
+class S3Storage:
+    """Transfer training data and model artifacts to and from S3"""
+
+    def __init__(
+        self,
+        client=None,
+        cache_dir=None,
+        max_concurrency=8,
+        multipart_chunksize=16 * 1024 * 1024,
+        read_block_size=8 * 1024 * 1024,
+    ):
+        """
+        Initialize storage
+
+        Args:
+            client: boto3 S3 client (default: boto3.client("s3"))
+            cache_dir: Local read-through cache for downloaded objects
+                (None streams reads straight from S3)
+            max_concurrency: Threads for parts of one transfer, and for
+                files uploaded together
+            multipart_chunksize: Part size, and the size above which
+                transfers are multipart
+            read_block_size: Bytes fetched per ranged GET when streaming
+        """
+        self.client = client or boto3.client("s3")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_concurrency = max_concurrency
+        self.read_block_size = read_block_size
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_chunksize,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+        )
+
+    def remote_sha256(self, uri: str) -> Optional[str]:
+        """
+        SHA-256 recorded on an object by upload_file
+
+        Args:
+            uri: S3 URI of the object
+
+        Returns:
+            Hex digest, or None if the object or its hash does not exist
+        """
+        bucket, key = parse_s3_uri(uri)
+        try:
+            head = self.client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head.get("Metadata", {}).get(HASH_METADATA)
+
+    def upload_file(self, local_path, uri: str) -> bool:
+        """
+        Upload a file unless the object already has the same contents
+
+        Args:
+            local_path: Local file path
+            uri: Destination S3 URI
+
+        Returns:
+            True if the file was uploaded, False if it was unchanged
+        """
+        digest = file_sha256(local_path)
+        if self.remote_sha256(uri) == digest:
+            return False
+
+        bucket, key = parse_s3_uri(uri)
+        self.client.upload_file(
+            str(local_path),
+            bucket,
+            key,
+            ExtraArgs={"Metadata": {HASH_METADATA: digest}},
+            Config=self.transfer_config,
+        )
+        return True
+
+    def upload_dir(
+        self, local_dir, uri: str, patterns: Sequence[str] = ARTIFACT_PATTERNS
+    ) -> Dict[str, bool]:
+        """
+        Upload the matching files of a directory concurrently
+
+        Args:
+            local_dir: Local directory
+            uri: Destination S3 URI prefix
+            patterns: Glob patterns of files to upload
+
+        Returns:
+            File name -> whether it was uploaded (False if unchanged)
+        """
+        files = sorted(
+            {path for pattern in patterns for path in Path(local_dir).glob(pattern)}
+        )
+        prefix = uri.rstrip("/")
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            uploaded = executor.map(
+                lambda path: self.upload_file(path, f"{prefix}/{path.name}"), files
+            )
+            return {path.name: changed for path, changed in zip(files, uploaded)}
+
+    def download_file(self, uri: str, local_path) -> Path:
+        """
+        Download an object with concurrent ranged parts
+
+        Args:
+            uri: S3 URI of the object
+            local_path: Destination file path
+
+        Returns:
+            Destination path
+        """
+        bucket, key = parse_s3_uri(uri)
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        self.client.download_file(
+            bucket, key, str(local_path), Config=self.transfer_config
+        )
+        return local_path
+
+    def local_copy(self, uri: str) -> Path:
+        """
+        Local copy of an object through the read-through cache
+
+        The object is downloaded on the first call and again only when its
+        ETag changes. Downloads land in a temporary file that is renamed
+        into place, so readers never see a partial copy.
+
+        Args:
+            uri: S3 URI of the object
+
+        Returns:
+            Path of the cached copy
+        """
+        if self.cache_dir is None:
+            raise ValueError("local_copy needs a cache_dir")
+
+        bucket, key = parse_s3_uri(uri)
+        etag = self.client.head_object(Bucket=bucket, Key=key)["ETag"]
+        entry_dir = (
+            self.cache_dir / hashlib.sha256(uri.encode("utf-8")).hexdigest()[:24]
+        )
+        path = entry_dir / (Path(key).name or "object")
+        etag_path = path.with_name(path.name + ".etag")
+
+        if path.exists() and etag_path.exists() and etag_path.read_text() == etag:
+            return path
+
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=entry_dir, prefix=".download-")
+        os.close(fd)
+        try:
+            self.download_file(uri, tmp_name)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        etag_path.write_text(etag)
+        return path
+
+    def open(self, uri: str):
+        """
+        Open an object for reading
+
+        Args:
+            uri: S3 URI of the object
+
+        Returns:
+            Binary file object, the cached copy if a cache_dir is set and a
+            buffered ranged-GET stream otherwise
+        """
+        if self.cache_dir is not None:
+            return open(self.local_copy(uri), "rb")
+
+        bucket, key = parse_s3_uri(uri)
+        return io.BufferedReader(
+            S3ObjectReader(self.client, bucket, key), buffer_size=self.read_block_size
+        )
+
+    def read_csv(self, uri: str, **kwargs) -> pd.DataFrame:
+        """
+        Read a CSV object into a DataFrame
+
+        Args:
+            uri: S3 URI of the CSV
+            **kwargs: Passed to pandas.read_csv
+
+        Returns:
+            DataFrame
+        """
+        with self.open(uri) as f:
+            return pd.read_csv(f, **kwargs)
+
+    def iter_csv(
+        self, uri: str, chunksize: int = 100_000, **kwargs
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV object in chunks of rows
+
+        Args:
+            uri: S3 URI of the CSV
+            chunksize: Rows per chunk
+            **kwargs: Passed to pandas.read_csv
+
+        Yields:
+            DataFrame per chunk
+        """
+        with self.open(uri) as f:
+            yield from pd.read_csv(f, chunksize=chunksize, **kwargs)
+
+    def iter_parquet(
+        self, uri: str, batch_size: int = 100_000, columns=None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read a Parquet object in batches of rows
+
+        Only the footer and the row groups being read are fetched.
+
+        Args:
+            uri: S3 URI of the Parquet file
+            batch_size: Maximum rows per batch
+            columns: Columns to read (default: all)
+
+        Yields:
+            DataFrame per batch
+        """
+        with self.open(uri) as f:
+            for batch in pq.ParquetFile(f).iter_batches(
+                batch_size=batch_size, columns=columns
+            ):
+                yield batch.to_pandas()
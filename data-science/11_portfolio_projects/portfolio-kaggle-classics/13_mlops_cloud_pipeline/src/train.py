@@ -9,10 +9,7 @@ import argparse
 import os
 import pickle
 import sys
-from pathlib import Path
 
-import boto3
-import joblib
 import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -20,7 +17,11 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report, f1_score
 from sklearn.model_selection import train_test_split
 
+from bundle import save_artifacts
+from data_prep import load_shards, prepare_shards
+from incremental_train import IncrementalSentimentTrainer
 from preprocess import TextPreprocessor
+from storage import S3Storage
 
 
 class SentimentModelTrainer:
@@ -40,12 +41,14 @@ class SentimentModelTrainer:
         self.vectorizer = None
         self.model = None
 
-    def load_data(self, data_path):
+    def load_data(self, data_path, s3_cache_dir=None):
         """
         Load training data from CSV or S3
 
         Args:
             data_path: Local path or S3 URI to CSV file
+            s3_cache_dir: Local read-through cache for S3 objects (None
+                streams the object with ranged reads)
 
         Returns:
             DataFrame with text and label columns
@@ -54,11 +57,7 @@ class SentimentModelTrainer:
 
         if data_path.startswith("s3://"):
             # Load from S3
-            s3_client = boto3.client("s3")
-            bucket, key = data_path.replace("s3://", "").split("/", 1)
-
-            obj = s3_client.get_object(Bucket=bucket, Key=key)
-            data = pd.read_csv(obj["Body"])
+            data = S3Storage(cache_dir=s3_cache_dir).read_csv(data_path)
         else:
             # Load from local file
             data = pd.read_csv(data_path)
@@ -85,9 +84,61 @@ class SentimentModelTrainer:
         labels = data[label_column].values
 
         # Preprocess texts
-        processed_texts = [self.preprocessor.preprocess(text) for text in texts]
+        processed_texts = self.preprocessor.preprocess_batch(texts)
+
+        return self.split_data(processed_texts, labels)
+
+    def prepare_data_chunked(
+        self,
+        data_path,
+        cache_dir="data/prepared",
+        text_column="text",
+        label_column="label",
+        chunk_size=100_000,
+        n_jobs=-1,
+    ):
+        """
+        Prepare data from a local CSV in chunks, caching preprocessed shards
+
+        The CSV is streamed in blocks and preprocessed across a process pool
+        into Parquet shards under cache_dir. Re-runs with the same input file
+        and preprocessing config reuse the shards.
 
-        # Split into train and validation
+        Args:
+            data_path: Path to local CSV file
+            cache_dir: Directory for prepared Parquet shards
+            text_column: Name of text column
+            label_column: Name of label column
+            chunk_size: Rows per CSV block and per shard
+            n_jobs: Worker processes for preprocessing (-1 for all CPUs)
+
+        Returns:
+            X_train, X_val, y_train, y_val
+        """
+        shard_dir = prepare_shards(
+            data_path,
+            cache_dir,
+            self.preprocessor,
+            text_column=text_column,
+            label_column=label_column,
+            chunk_size=chunk_size,
+            n_jobs=n_jobs,
+        )
+        processed_texts, labels = load_shards(shard_dir)
+
+        return self.split_data(processed_texts, labels)
+
+    def split_data(self, processed_texts, labels):
+        """
+        Split preprocessed texts into training and validation sets
+
+        Args:
+            processed_texts: Preprocessed texts
+            labels: Labels
+
+        Returns:
+            X_train, X_val, y_train, y_val
+        """
         X_train, X_val, y_train, y_val = train_test_split(
             processed_texts,
             labels,
@@ -177,53 +228,105 @@ class SentimentModelTrainer:
 
         return metrics
 
-    def save_model(self, output_path):
+    def save_model(self, output_path, legacy_pickles=False):
         """
         Save model artifacts
 
         Args:
             output_path: Directory to save model files
+            legacy_pickles: Also write the pickles older endpoints load
         """
-        print(f"Saving model to {output_path}")
-
-        # Create output directory
-        output_dir = Path(output_path)
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save vectorizer
-        vectorizer_path = output_dir / "vectorizer.pkl"
-        joblib.dump(self.vectorizer, vectorizer_path)
-        print(f"Saved vectorizer to {vectorizer_path}")
-
-        # Save model
-        model_path = output_dir / "model.pkl"
-        joblib.dump(self.model, model_path)
-        print(f"Saved model to {model_path}")
-
-        # Save preprocessor
-        preprocessor_path = output_dir / "preprocessor.pkl"
-        joblib.dump(self.preprocessor, preprocessor_path)
-        print(f"Saved preprocessor to {preprocessor_path}")
+        save_artifacts(
+            output_path,
+            self.vectorizer,
+            self.model,
+            self.preprocessor,
+            legacy_pickles=legacy_pickles,
+        )
 
-    def upload_to_s3(self, local_path, s3_path):
+    @staticmethod
+    def upload_to_s3(local_path, s3_path):
         """
         Upload model artifacts to S3
 
+        Files are uploaded concurrently, large ones in parallel parts, and
+        files whose contents are already in S3 are skipped.
+
         Args:
             local_path: Local directory with model files
             s3_path: S3 URI for upload destination
         """
         print(f"Uploading model to {s3_path}")
 
-        s3_client = boto3.client("s3")
-        bucket, prefix = s3_path.replace("s3://", "").split("/", 1)
+        uploaded = S3Storage().upload_dir(local_path, s3_path)
+
+        for name, changed in uploaded.items():
+            status = "Uploaded" if changed else "Unchanged, skipped"
+            print(f"{status} {name} ({s3_path.rstrip('/')}/{name})")
 
-        local_dir = Path(local_path)
 
-        for file_path in local_dir.glob("*.pkl"):
-            key = f"{prefix}/{file_path.name}"
-            s3_client.upload_file(str(file_path), bucket, key)
-            print(f"Uploaded {file_path.name} to s3://{bucket}/{key}")
+def local_data_path(data_path, s3_cache_dir):
+    """
+    Local path of the training CSV, downloading S3 data through the cache
+
+    Args:
+        data_path: Local path or S3 URI to CSV file
+        s3_cache_dir: Local read-through cache for S3 objects
+            (default: data/s3-cache)
+
+    Returns:
+        Local file path
+    """
+    if not data_path.startswith("s3://"):
+        return data_path
+
+    s3_cache_dir = s3_cache_dir or "data/s3-cache"
+    print(f"Fetching {data_path} into {s3_cache_dir}")
+    return str(S3Storage(cache_dir=s3_cache_dir).local_copy(data_path))
+
+
+def train_incremental(args):
+    """
+    Out-of-core training from prepared shards
+
+    Args:
+        args: Parsed command line arguments
+    """
+    trainer = IncrementalSentimentTrainer(
+        batch_size=args.batch_size,
+        epochs=args.epochs,
+        random_state=42,
+        checkpoint_dir=args.checkpoint_dir,
+    )
+
+    # Prepare data in chunks (S3 data via the local cache, shards cached across runs)
+    shard_dir = prepare_shards(
+        local_data_path(args.data_path, args.s3_cache_dir),
+        args.cache_dir,
+        trainer.preprocessor,
+        chunk_size=args.chunk_size,
+        n_jobs=args.n_jobs,
+    )
+
+    # Train model
+    trainer.fit(shard_dir)
+
+    # Evaluate model, optionally against the in-memory trainer
+    if args.compare_batch:
+        comparison = trainer.compare_with_batch(shard_dir, args.max_features)
+        metrics = comparison["incremental"]
+    else:
+        metrics = trainer.evaluate(shard_dir)
+
+    # Save model
+    trainer.save_model(args.output_path, legacy_pickles=args.legacy_pickles)
+
+    # Upload to S3 if running in cloud
+    if args.cloud and args.s3_output:
+        SentimentModelTrainer.upload_to_s3(args.output_path, args.s3_output)
+
+    print("\nTraining complete!")
+    print(f"Final metrics: {metrics}")
 
 
 def main():
@@ -269,6 +372,67 @@ def main():
         default=100,
         help="Sample size for local testing",
     )
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="Stream the CSV in chunks and cache preprocessed Parquet shards",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="Rows per chunk in chunked mode",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=-1,
+        help="Preprocessing worker processes in chunked mode (-1 for all CPUs)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="data/prepared",
+        help="Directory for preprocessed shards in chunked mode",
+    )
+    parser.add_argument(
+        "--s3-cache-dir",
+        type=str,
+        help="Local read-through cache for S3 training data "
+        "(default: stream in batch mode, data/s3-cache in chunked modes)",
+    )
+    parser.add_argument(
+        "--legacy-pickles",
+        action="store_true",
+        help="Also save the per-component pickles older endpoints load",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Train out-of-core with hashed features and SGD (implies --chunked)",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=1,
+        help="Passes over the training data in incremental mode",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Rows per mini-batch in incremental mode",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        help="Checkpoint directory in incremental mode (resumes if present)",
+    )
+    parser.add_argument(
+        "--compare-batch",
+        action="store_true",
+        help="Also train the in-memory model and report accuracy parity",
+    )
 
     args = parser.parse_args()
 
@@ -278,22 +442,35 @@ def main():
         args.output_path = os.environ.get("SM_MODEL_DIR", "/opt/ml/model")
         args.cloud = True
 
+    if args.incremental:
+        train_incremental(args)
+        return
+
     # Initialize trainer
     trainer = SentimentModelTrainer(
         max_features=args.max_features,
         random_state=42,
     )
 
-    # Load data
-    data = trainer.load_data(args.data_path)
+    if args.chunked:
+        # Prepare data in chunks (S3 data via the local cache, shards cached across runs)
+        X_train, X_val, y_train, y_val = trainer.prepare_data_chunked(
+            local_data_path(args.data_path, args.s3_cache_dir),
+            cache_dir=args.cache_dir,
+            chunk_size=args.chunk_size,
+            n_jobs=args.n_jobs,
+        )
+    else:
+        # Load data
+        data = trainer.load_data(args.data_path, s3_cache_dir=args.s3_cache_dir)
 
-    # Sample data for local testing
-    if args.local and len(data) > args.sample_size:
-        print(f"Sampling {args.sample_size} rows for local testing")
-        data = data.sample(n=args.sample_size, random_state=42)
+        # Sample data for local testing
+        if args.local and len(data) > args.sample_size:
+            print(f"Sampling {args.sample_size} rows for local testing")
+            data = data.sample(n=args.sample_size, random_state=42)
 
-    # Prepare data
-    X_train, X_val, y_train, y_val = trainer.prepare_data(data)
+        # Prepare data
+        X_train, X_val, y_train, y_val = trainer.prepare_data(data)
 
     # Train model
     trainer.train(X_train, y_train)
@@ -302,7 +479,7 @@ def main():
     metrics = trainer.evaluate(X_val, y_val)
 
     # Save model
-    trainer.save_model(args.output_path)
+    trainer.save_model(args.output_path, legacy_pickles=args.legacy_pickles)
 
     # Upload to S3 if running in cloud
     if args.cloud and args.s3_output:
@@ -114,6 +114,56 @@ class TestTextPreprocessor:
         assert all(isinstance(r, str) for r in results)
         assert all(len(r) > 0 for r in results)
 
+    def test_matches_reference_pipeline(self, preprocessor):
+        """Test fast pipeline gives the same output as the step-by-step one"""
+        texts = [
+            "This is AMAZING! I can't believe how GOOD this is!!! 😍",
+            "I'm gonna say it: you CANNOT miss this, wanna bet?",
+            "<br /><br />Don't waste your money... 2/10 #fail @store",
+            "See https://example.com/review?id=1 or www.example.com “later”",
+            "Café — naïve — but it’s “fine”, gimme more",
+            "   Multiple    spaces\tand\nnewlines   ",
+            '<a href="http://imdb.com/title">link</a> good film',
+            "#<i>tag</i> and @user<b>name</b> #a@b",
+            "",
+        ]
+
+        for text in texts:
+            assert preprocessor.preprocess(text) == preprocessor.preprocess_reference(
+                text
+            )
+
+    def test_url_inside_tag_matches_reference(self, preprocessor):
+        """Test URLs are removed before tags, as in the step-by-step pipeline"""
+        text = '<a href="http://imdb.com/title">link</a> good film'
+
+        assert preprocessor.preprocess(text) == preprocessor.preprocess_reference(text)
+        assert "link" not in preprocessor.preprocess(text)
+
+    def test_tokenize_matches_nltk(self, preprocessor):
+        """Test tokenizer gives the same tokens as NLTK's word_tokenize"""
+        from nltk.tokenize import word_tokenize
+
+        texts = [
+            "you cannot wanna gotta lemme",
+            "plain words with emoji 😍 and 123 numbers",
+            "Punctuation, quotes and 'contractions' aren't plain.",
+        ]
+
+        for text in texts:
+            assert preprocessor.tokenize(text) == word_tokenize(text)
+
+    def test_preprocess_batch_parallel(self, preprocessor):
+        """Test parallel batch preprocessing keeps input order"""
+        texts = (f"Review {i}: this is great, isn't it?" for i in range(50))
+
+        results = preprocessor.preprocess_batch(texts, n_jobs=2, chunk_size=7)
+
+        assert results == [
+            preprocessor.preprocess(f"Review {i}: this is great, isn't it?")
+            for i in range(50)
+        ]
+
     def test_empty_string(self, preprocessor):
         """Test handling of empty string"""
         result = preprocessor.preprocess("")
@@ -154,6 +204,546 @@ class TestModelTraining:
         assert trainer.model is None  # Not initialized yet
 
 
+class TestChunkedPreparation:
+    """Test cases for chunked data preparation"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        """Write a small review CSV"""
+        import pandas as pd
+
+        texts = [f"Review {i}: I can't say it's <b>great</b>!" for i in range(25)]
+        path = tmp_path / "reviews.csv"
+        pd.DataFrame({"text": texts, "label": [i % 2 for i in range(25)]}).to_csv(
+            path, index=False
+        )
+        return path
+
+    def test_shards_match_in_memory(self, csv_path, tmp_path):
+        """Test shards hold the same texts and labels as in-memory preprocessing"""
+        import pandas as pd
+
+        from data_prep import load_shards, prepare_shards, read_manifest
+
+        preprocessor = TextPreprocessor()
+        shard_dir = prepare_shards(
+            str(csv_path),
+            str(tmp_path / "prepared"),
+            preprocessor,
+            chunk_size=10,
+            n_jobs=2,
+        )
+        texts, labels = load_shards(shard_dir)
+
+        data = pd.read_csv(csv_path)
+        assert texts == preprocessor.preprocess_batch(data["text"])
+        assert labels.tolist() == data["label"].tolist()
+        assert len(read_manifest(shard_dir)["shards"]) == 3
+
+    def test_rerun_uses_cache(self, csv_path, tmp_path):
+        """Test unchanged inputs reuse the shards and changed config does not"""
+        from data_prep import prepare_shards
+
+        cache_dir = str(tmp_path / "prepared")
+        first = prepare_shards(str(csv_path), cache_dir, TextPreprocessor(), n_jobs=1)
+        modified = (first / "part-00000.parquet").stat().st_mtime_ns
+
+        again = prepare_shards(str(csv_path), cache_dir, TextPreprocessor(), n_jobs=1)
+        other = prepare_shards(
+            str(csv_path), cache_dir, TextPreprocessor(remove_numbers=True), n_jobs=1
+        )
+
+        assert again == first
+        assert (again / "part-00000.parquet").stat().st_mtime_ns == modified
+        assert other != first
+
+
+class TestIncrementalTraining:
+    """Test cases for out-of-core incremental training"""
+
+    @pytest.fixture
+    def shard_dir(self, tmp_path):
+        """Prepare shards from a small synthetic review CSV"""
+        import pandas as pd
+
+        from data_prep import prepare_shards
+
+        rng = np.random.default_rng(0)
+        positive = ["great", "loved", "excellent", "wonderful", "fun"]
+        negative = ["awful", "hated", "boring", "terrible", "waste"]
+        filler = ["movie", "plot", "acting", "story", "film", "really"]
+        texts, labels = [], []
+        for i in range(400):
+            words = list(rng.choice(positive if i % 2 else negative, 2))
+            words += list(rng.choice(filler, 4))
+            texts.append(" ".join(rng.permutation(words)))
+            labels.append(i % 2)
+
+        path = tmp_path / "reviews.csv"
+        pd.DataFrame({"text": texts, "label": labels}).to_csv(path, index=False)
+        return prepare_shards(
+            str(path), str(tmp_path / "prepared"), TextPreprocessor(), chunk_size=150
+        )
+
+    def test_fit_and_evaluate(self, shard_dir):
+        """Test the streaming model learns a separable corpus"""
+        from incremental_train import IncrementalSentimentTrainer
+
+        trainer = IncrementalSentimentTrainer(n_features=2**12, batch_size=32, epochs=3)
+        trainer.fit(shard_dir)
+        metrics = trainer.evaluate(shard_dir)
+
+        assert metrics["accuracy"] > 0.9
+        assert 0 < trainer.samples_seen < 3 * 400
+
+    def test_resume_matches_uninterrupted(self, shard_dir, tmp_path):
+        """Test resuming from a checkpoint gives the same model as one run"""
+        from incremental_train import IncrementalSentimentTrainer
+
+        settings = {"n_features": 2**12, "batch_size": 32, "checkpoint_every": 2}
+        uninterrupted = IncrementalSentimentTrainer(epochs=2, **settings)
+        uninterrupted.fit(shard_dir)
+
+        checkpoint_dir = tmp_path / "checkpoints"
+        IncrementalSentimentTrainer(
+            epochs=1, checkpoint_dir=checkpoint_dir, **settings
+        ).fit(shard_dir)
+        resumed = IncrementalSentimentTrainer(
+            epochs=2, checkpoint_dir=checkpoint_dir, **settings
+        )
+        resumed.fit(shard_dir)
+
+        assert resumed.samples_seen == uninterrupted.samples_seen
+        np.testing.assert_allclose(resumed.model.coef_, uninterrupted.model.coef_)
+
+    def test_checkpoint_settings_must_match(self, shard_dir, tmp_path):
+        """Test a checkpoint is not resumed with different settings"""
+        from incremental_train import IncrementalSentimentTrainer
+
+        IncrementalSentimentTrainer(
+            n_features=2**12, checkpoint_dir=tmp_path / "checkpoints"
+        ).fit(shard_dir)
+
+        with pytest.raises(ValueError):
+            IncrementalSentimentTrainer(
+                n_features=2**10, checkpoint_dir=tmp_path / "checkpoints"
+            ).fit(shard_dir)
+
+    def test_parity_with_batch_trainer(self, shard_dir):
+        """Test accuracy is close to the in-memory TF-IDF trainer"""
+        from incremental_train import IncrementalSentimentTrainer
+
+        trainer = IncrementalSentimentTrainer(n_features=2**12, batch_size=32, epochs=5)
+        trainer.fit(shard_dir)
+        comparison = trainer.compare_with_batch(shard_dir, max_features=100)
+
+        assert comparison["accuracy_gap"] < 0.05
+
+
+class TestModelBundle:
+    """Test cases for the single-file model bundle"""
+
+    TEXTS = ["great movie", "loved it", "terrible film", "hated it", "great fun"] * 4
+    LABELS = [1, 1, 0, 0, 1] * 4
+
+    @pytest.fixture
+    def preprocessor(self):
+        """Create preprocessor instance"""
+        return TextPreprocessor()
+
+    def fit(self, vectorizer, model, preprocessor):
+        """Fit vectorizer and model on the toy corpus"""
+        texts = preprocessor.preprocess_batch(self.TEXTS)
+        model.fit(vectorizer.fit_transform(texts), self.LABELS)
+        return vectorizer, model
+
+    def test_tfidf_round_trip(self, preprocessor, tmp_path):
+        """Test a TF-IDF + logistic regression bundle predicts like the original"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        from bundle import load_bundle, save_bundle
+
+        vectorizer, model = self.fit(
+            TfidfVectorizer(ngram_range=(1, 2)), LogisticRegression(), preprocessor
+        )
+        checksum = save_bundle(
+            tmp_path / "model.bundle", vectorizer, model, preprocessor
+        )
+        bundle = load_bundle(tmp_path / "model.bundle")
+
+        texts = ["what a great film", "hated the movie", "unknown words"]
+        expected = model.predict_proba(vectorizer.transform(texts))
+        actual = bundle.model.predict_proba(bundle.vectorizer.transform(texts))
+        np.testing.assert_allclose(actual, expected, rtol=1e-5)
+        assert bundle.checksum == checksum
+        assert bundle.preprocessor.get_config() == preprocessor.get_config()
+        assert bundle.vocabulary.get("great") == bundle.vectorizer.vocabulary_["great"]
+        assert bundle.vocabulary.get("missing") is None
+        assert not bundle.coef.flags.writeable
+
+    def test_hashing_round_trip(self, preprocessor, tmp_path):
+        """Test a hashing + SGD bundle predicts like the original"""
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        from bundle import load_bundle, save_bundle
+
+        vectorizer, model = self.fit(
+            HashingVectorizer(n_features=2**10, alternate_sign=False),
+            SGDClassifier(loss="log_loss", random_state=0),
+            preprocessor,
+        )
+        save_bundle(tmp_path / "model.bundle", vectorizer, model, preprocessor)
+        bundle = load_bundle(tmp_path / "model.bundle")
+
+        X = vectorizer.transform(["great fun", "terrible"])
+        np.testing.assert_allclose(
+            bundle.model.predict_proba(
+                bundle.vectorizer.transform(["great fun", "terrible"])
+            ),
+            model.predict_proba(X),
+            rtol=1e-5,
+        )
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"ngram_range": (1, 2)},
+            {"sublinear_tf": True, "norm": "l1"},
+            {"binary": True, "norm": None},
+        ],
+    )
+    def test_scorer_from_bundle(self, preprocessor, tmp_path, options):
+        """Test the bundle scorer matches scikit-learn without building a vocabulary dict"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        from bundle import load_bundle, save_bundle
+        from scorer import LinearScorer
+
+        vectorizer, model = self.fit(
+            TfidfVectorizer(**options), LogisticRegression(), preprocessor
+        )
+        save_bundle(tmp_path / "model.bundle", vectorizer, model, preprocessor)
+        bundle = load_bundle(tmp_path / "model.bundle")
+        scorer = LinearScorer.from_bundle(bundle)
+
+        texts = ["what a great film", "hated hated the movie", "unknown words", ""]
+        expected = model.predict_proba(vectorizer.transform(texts))
+        np.testing.assert_allclose(scorer.predict_proba(texts), expected, rtol=1e-6)
+        assert not hasattr(bundle._vectorizer, "vocabulary_")
+
+    def test_vocabulary_terms_sharing_a_prefix(self):
+        """Test lookups of terms whose first 8 bytes are equal"""
+        from bundle import ArrayVocabulary
+
+        terms = sorted(
+            ["a", "ab", "abcdefgh", "abcdefgh ij", "abcdefghij", "caf\u00e9", "z"],
+            key=lambda term: term.encode("utf-8"),
+        )
+        vocabulary = ArrayVocabulary.from_terms(terms)
+        queries = terms + ["abcdefgh i", "abcdefghijk", "", "b"]
+
+        assert vocabulary.columns(queries) == [
+            terms.index(query) if query in terms else None for query in queries
+        ]
+        assert vocabulary.to_dict() == {term: i for i, term in enumerate(terms)}
+
+    def test_corrupt_bundle_rejected(self, preprocessor, tmp_path):
+        """Test the checksum catches a modified file"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        from bundle import BundleError, load_bundle, save_bundle
+
+        path = tmp_path / "model.bundle"
+        save_bundle(
+            path,
+            *self.fit(TfidfVectorizer(), LogisticRegression(), preprocessor),
+            preprocessor,
+        )
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(BundleError):
+            load_bundle(path)
+
+    def test_predictor_loads_bundle(self, preprocessor, tmp_path):
+        """Test the endpoint predictor loads a bundle and versions it by checksum"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        from bundle import save_artifacts
+        from inference import SentimentPredictor
+
+        vectorizer, model = self.fit(
+            TfidfVectorizer(), LogisticRegression(), preprocessor
+        )
+        save_artifacts(tmp_path, vectorizer, model, preprocessor)
+
+        predictor = SentimentPredictor(model_path=str(tmp_path))
+        result = predictor.predict("great movie")
+
+        assert result["prediction"] == "positive"
+        assert not (tmp_path / "model.pkl").exists()
+        assert len(predictor.artifact_version) == 16
+
+
+class TestLinearScorer:
+    """Test cases for the sparse-matrix-free linear scorer"""
+
+    TEXTS = [
+        "great movie great acting",
+        "loved it loved every minute",
+        "terrible film boring plot",
+        "hated it awful acting",
+        "great fun not boring",
+        "boring boring boring",
+    ] * 3
+    LABELS = [1, 1, 0, 0, 1, 0] * 3
+    QUERIES = [
+        "great great movie",
+        "boring terrible acting plot",
+        "loved the fun film not awful",
+        "words never seen",
+        "",
+    ]
+
+    def assert_parity(self, vectorizer, model):
+        """Fit, then check scorer labels and probabilities against scikit-learn"""
+        from scorer import LinearScorer
+
+        model.fit(vectorizer.fit_transform(self.TEXTS), self.LABELS)
+        scorer = LinearScorer.from_model(vectorizer, model)
+        assert scorer is not None
+
+        X = vectorizer.transform(self.QUERIES)
+        expected_labels = model.predict(X)
+        expected = model.predict_proba(X)
+        for query, label, row in zip(self.QUERIES, expected_labels, expected):
+            actual_label, actual = scorer.score(query)
+            assert actual_label == label
+            np.testing.assert_allclose(actual, row, rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(
+            scorer.decision(self.QUERIES[0]),
+            model.decision_function(X[:1])[0],
+            rtol=1e-12,
+        )
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"ngram_range": (1, 2)},
+            {"ngram_range": (1, 2), "sublinear_tf": True},
+            {"binary": True, "norm": "l1"},
+            {"use_idf": False, "norm": None},
+        ],
+    )
+    def test_tfidf_parity(self, options):
+        """Test TF-IDF + logistic regression scores match scikit-learn"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        self.assert_parity(TfidfVectorizer(**options), LogisticRegression())
+
+    @pytest.mark.parametrize("alternate_sign", [False, True])
+    def test_hashing_parity(self, alternate_sign):
+        """Test hashing + log-loss SGD scores match scikit-learn, collisions included"""
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        self.assert_parity(
+            HashingVectorizer(
+                n_features=8, ngram_range=(1, 2), alternate_sign=alternate_sign
+            ),
+            SGDClassifier(loss="log_loss", random_state=0),
+        )
+
+    def test_unsupported_model(self):
+        """Test models without a logistic predict_proba fall back to scikit-learn"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        from scorer import LinearScorer
+
+        vectorizer = TfidfVectorizer()
+        model = SGDClassifier(loss="modified_huber", random_state=0)
+        model.fit(vectorizer.fit_transform(self.TEXTS), self.LABELS)
+
+        assert LinearScorer.from_model(vectorizer, model) is None
+
+    def test_predictor_parity(self, tmp_path):
+        """Test the predictor gives the same results with and without the scorer"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        from bundle import save_artifacts
+        from inference import SentimentPredictor
+
+        preprocessor = TextPreprocessor()
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        model = LogisticRegression()
+        texts = preprocessor.preprocess_batch(self.TEXTS)
+        model.fit(vectorizer.fit_transform(texts), self.LABELS)
+        save_artifacts(tmp_path, vectorizer, model, preprocessor)
+
+        fast = SentimentPredictor(model_path=str(tmp_path), cache_size=0)
+        slow = SentimentPredictor(
+            model_path=str(tmp_path), cache_size=0, fast_scorer=False
+        )
+        fast_results = fast.predict_batch(self.QUERIES)
+        slow_results = slow.predict_batch(self.QUERIES)
+
+        assert fast.scorer is not None and slow.scorer is None
+        for fast_result, slow_result in zip(fast_results, slow_results):
+            assert fast_result["prediction"] == slow_result["prediction"]
+            np.testing.assert_allclose(
+                fast_result["confidence"], slow_result["confidence"], rtol=1e-12
+            )
+
+
+class TestS3Storage:
+    """Test cases for S3 transfers, against moto's in-memory S3"""
+
+    BUCKET = "test-artifacts"
+
+    @pytest.fixture
+    def s3(self, monkeypatch):
+        """Mocked S3 client with an empty bucket"""
+        import boto3
+        from moto import mock_s3
+
+        for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+            monkeypatch.setenv(name, "testing")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+        # Newer botocore sends aws-chunked checksummed bodies moto 4 cannot decode
+        monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+
+        with mock_s3():
+            client = boto3.client("s3")
+            client.create_bucket(Bucket=self.BUCKET)
+            yield client
+
+    @pytest.fixture
+    def reviews(self):
+        """Small labelled review table"""
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "text": [
+                    f"review number {i}, {'great' if i % 2 else 'bad'}"
+                    for i in range(1000)
+                ],
+                "label": [i % 2 for i in range(1000)],
+            }
+        )
+
+    def test_upload_skips_unchanged(self, s3, tmp_path):
+        """Test only new or changed artifacts are uploaded"""
+        from storage import S3Storage
+
+        (tmp_path / "model.bundle").write_bytes(b"bundle v1")
+        (tmp_path / "model.pkl").write_bytes(b"pickle v1")
+        (tmp_path / "notes.txt").write_text("not an artifact")
+        storage = S3Storage(client=s3)
+        uri = f"s3://{self.BUCKET}/models/v1/"
+
+        assert storage.upload_dir(tmp_path, uri) == {
+            "model.bundle": True,
+            "model.pkl": True,
+        }
+        assert storage.upload_dir(tmp_path, uri) == {
+            "model.bundle": False,
+            "model.pkl": False,
+        }
+
+        (tmp_path / "model.bundle").write_bytes(b"bundle v2")
+        assert storage.upload_dir(tmp_path, uri) == {
+            "model.bundle": True,
+            "model.pkl": False,
+        }
+        body = s3.get_object(Bucket=self.BUCKET, Key="models/v1/model.bundle")["Body"]
+        assert body.read() == b"bundle v2"
+
+    def test_multipart_round_trip(self, s3, tmp_path):
+        """Test large files are transferred in parts and arrive intact"""
+        from storage import S3Storage
+
+        data = np.random.default_rng(0).bytes(11 * 1024 * 1024)
+        (tmp_path / "large.bundle").write_bytes(data)
+        storage = S3Storage(client=s3, multipart_chunksize=5 * 1024 * 1024)
+        uri = f"s3://{self.BUCKET}/models/large.bundle"
+
+        assert storage.upload_file(tmp_path / "large.bundle", uri)
+        etag = s3.head_object(Bucket=self.BUCKET, Key="models/large.bundle")["ETag"]
+        assert etag.strip('"').endswith("-3")
+
+        downloaded = storage.download_file(uri, tmp_path / "copy" / "large.bundle")
+        assert downloaded.read_bytes() == data
+
+    def test_chunked_reads(self, s3, reviews, tmp_path):
+        """Test CSV and Parquet objects stream in chunks with ranged reads"""
+        import pandas as pd
+
+        from storage import S3Storage
+
+        reviews.to_parquet(tmp_path / "reviews.parquet", row_group_size=250)
+        s3.put_object(
+            Bucket=self.BUCKET, Key="data/reviews.csv", Body=reviews.to_csv(index=False)
+        )
+        s3.upload_file(
+            str(tmp_path / "reviews.parquet"), self.BUCKET, "data/reviews.parquet"
+        )
+        storage = S3Storage(client=s3, read_block_size=4096)
+
+        csv_chunks = list(storage.iter_csv(f"s3://{self.BUCKET}/data/reviews.csv", 300))
+        parquet_chunks = list(
+            storage.iter_parquet(f"s3://{self.BUCKET}/data/reviews.parquet", 250)
+        )
+
+        assert [len(chunk) for chunk in csv_chunks] == [300, 300, 300, 100]
+        assert len(parquet_chunks) == 4
+        pd.testing.assert_frame_equal(pd.concat(csv_chunks, ignore_index=True), reviews)
+        pd.testing.assert_frame_equal(
+            pd.concat(parquet_chunks, ignore_index=True), reviews
+        )
+
+    def test_read_through_cache(self, s3, reviews, tmp_path):
+        """Test cached copies are reused until the object changes"""
+        from storage import S3Storage
+
+        uri = f"s3://{self.BUCKET}/data/reviews.csv"
+        s3.put_object(
+            Bucket=self.BUCKET, Key="data/reviews.csv", Body=b"text,label\na,1\n"
+        )
+        storage = S3Storage(client=s3, cache_dir=tmp_path / "cache")
+
+        first = storage.local_copy(uri)
+        modified = first.stat().st_mtime_ns
+        assert storage.local_copy(uri) == first
+        assert first.stat().st_mtime_ns == modified
+
+        s3.put_object(
+            Bucket=self.BUCKET, Key="data/reviews.csv", Body=b"text,label\nb,0\n"
+        )
+        assert storage.read_csv(uri)["text"].tolist() == ["b"]
+
+    def test_trainer_loads_from_s3(self, s3, reviews):
+        """Test the trainer reads S3 training data through the storage module"""
+        from train import SentimentModelTrainer
+
+        s3.put_object(
+            Bucket=self.BUCKET, Key="data/reviews.csv", Body=reviews.to_csv(index=False)
+        )
+        data = SentimentModelTrainer().load_data(f"s3://{self.BUCKET}/data/reviews.csv")
+
+        assert len(data) == len(reviews)
+
+
 class TestModelInference:
     """Test cases for model inference"""
 
@@ -185,6 +775,83 @@ class TestModelInference:
         assert "positive" in result["probabilities"]
 
 
+class TestPredictionCache:
+    """Test cases for the prediction cache"""
+
+    @pytest.fixture
+    def model_dir(self, tmp_path):
+        """Train a tiny model and save its artifacts"""
+        import joblib
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        preprocessor = TextPreprocessor()
+        texts = preprocessor.preprocess_batch(
+            ["great movie", "loved it", "terrible film", "hated it"] * 5
+        )
+        vectorizer = TfidfVectorizer()
+        model = LogisticRegression().fit(
+            vectorizer.fit_transform(texts), [1, 1, 0, 0] * 5
+        )
+
+        joblib.dump(model, tmp_path / "model.pkl")
+        joblib.dump(vectorizer, tmp_path / "vectorizer.pkl")
+        joblib.dump(preprocessor, tmp_path / "preprocessor.pkl")
+        return tmp_path
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        from cache import PredictionCache
+
+        cache = PredictionCache(max_entries=2)
+        cache.put("a", (0.1, 0.9))
+        cache.put("b", (0.2, 0.8))
+        cache.get("a")
+        cache.put("c", (0.3, 0.7))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == (0.1, 0.9)
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    def test_key_normalization(self):
+        """Test whitespace variants share a key and versions do not"""
+        from cache import cache_key
+
+        assert cache_key("  Great   movie\t", "v1") == cache_key("Great movie", "v1")
+        assert cache_key("<b\n>x", "v1") != cache_key("<b >x", "v1")
+        assert cache_key("Great movie", "v1") != cache_key("Great movie", "v2")
+
+    def test_predictor_hits(self, model_dir):
+        """Test repeated texts are served from the cache with the same result"""
+        from inference import SentimentPredictor
+
+        predictor = SentimentPredictor(model_path=str(model_dir))
+        first = predictor.predict("What a great movie!")
+        batch = predictor.predict_batch(
+            ["What a great movie!", "Terrible film", "Terrible  film"]
+        )
+
+        assert batch[0] == first
+        assert batch[1] == batch[2]
+        assert first["prediction"] == "positive"
+        stats = predictor.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_disabled_cache(self, model_dir):
+        """Test a zero-size cache still predicts"""
+        from inference import SentimentPredictor
+
+        predictor = SentimentPredictor(model_path=str(model_dir), cache_size=0)
+        results = predictor.predict_batch(["great movie", "great movie"])
+
+        assert results[0] == results[1]
+        assert predictor.cache.stats()["entries"] == 0
+
+
 class TestDataValidation:
     """Test cases for data validation"""
 